@@ -1,67 +1,120 @@
-from tkinter import *
-import os
-
-def CargarImagen(nombre):
-    root = os.path.join('Imagenes',nombre)
-    image = PhotoImage(file=root)
-    return image
-def about():#Funcion para la ventana creditos
-    ventanabout.deiconify()
-
-def VentanaSalonFama():
-    ventanaFama.deiconify()
-
-PantallaIncial = Tk()
-PantallaIncial.title("Battle Ship")
-PantallaIncial.geometry("600x600")
-PantallaIncial.resizable(height=NO, width=NO)
-C_menu=Canvas(PantallaIncial, width=1200, height=900, bg='black')
-C_menu.place(x=0, y=0)
-C_menu.fondo=CargarImagen('FondoPrincipal.png')
-imgCanvas= C_menu.create_image(0,0, anchor=NW, image= C_menu.fondo)
-"""
-FondoPrincipal = CargarImagen("FondoPrincipal.png")
-Fondo = Label(PantallaIncial, image=FondoPrincipal)
-Fondo.place(x=0, y=0)"""
-
-NombreLabel = Label(PantallaIncial, text= "Ingrese el nombre de marine", bg="white")
-NombreLabel.place(x=225, y=230)
-NombreJugador = Entry(PantallaIncial, bg="white", fg="black", justify="center")
-NombreJugador.place(x=240, y=260)
-
-ventanabout=Toplevel(PantallaIncial)#Ventanda de creditos
-ventanabout.title("About")
-ventanabout.geometry("1200x900+390+40")
-ventanabout.resizable(width= NO, height=NO)
-C_about=Canvas(ventanabout,width=1200, height=900,bg="Pink")
-C_about.place(x=0, y=0)
-C_about.fondo=CargarImagen("About.png")
-imgAbout=C_about.create_image(0,0, anchor=NW, image=C_about.fondo)
-ventanabout.withdraw()
-
-ventanaFama=Toplevel(PantallaIncial)#Ventanda de creditos
-ventanaFama.title("About")
-ventanaFama.geometry("1200x900+390+40")
-ventanaFama.resizable(width= NO, height=NO)
-C_fama=Canvas(ventanaFama,width=1200, height=900,bg="Pink")
-C_fama.place(x=0, y=0)
-C_fama.fondo=CargarImagen("About.png")
-imgFama=C_fama.create_image(0,0, anchor=NW, image=C_fama.fondo)
-ventanaFama.withdraw()
-
-
-
-
-
-
-
-
-
-
-PlayAbout=Button(C_menu,width=6,height=2,bg="Pink",text="Crèditos",command=about).place(x=200, y=300)
-SalonFamaButton=Button(C_menu,width=6,height=2,bg="Pink",text="TopScores",command=VentanaSalonFama).place(x=500, y=300)
-
-
-
-
-PantallaIncial.mainloop()
+from tkinter import *
+import os
+import time
+
+from scores import ScoreStore
+
+# dias de los mejores puntajes recientes
+DIAS_RECIENTES = 7
+
+Puntajes = None
+
+# imagenes ya cargadas, cada archivo se lee una sola vez
+ImagenesCargadas = {}
+
+# las ventanas secundarias se crean la primera vez que se abren
+ventanabout = None
+ventanaFama = None
+
+def CargarImagen(nombre):
+    if nombre not in ImagenesCargadas:
+        root = os.path.join('Imagenes',nombre)
+        ImagenesCargadas[nombre] = PhotoImage(file=root)
+    return ImagenesCargadas[nombre]
+
+def CrearVentana(titulo, imagen):#Ventana de 1200x900 con una imagen de fondo
+    ventana=Toplevel(PantallaIncial)
+    ventana.title(titulo)
+    ventana.geometry("1200x900+390+40")
+    ventana.resizable(width= NO, height=NO)
+    # al cerrarla solo se oculta, para abrirla de nuevo sin crearla otra vez
+    ventana.protocol("WM_DELETE_WINDOW", ventana.withdraw)
+    canvas=Canvas(ventana,width=1200, height=900,bg="Pink")
+    canvas.place(x=0, y=0)
+    canvas.fondo=CargarImagen(imagen)
+    canvas.create_image(0,0, anchor=NW, image=canvas.fondo)
+    return ventana, canvas
+
+def about():#Funcion para la ventana creditos
+    global ventanabout
+    if ventanabout is None:
+        ventanabout = CrearVentana("About", "About.png")[0]
+    ventanabout.deiconify()
+
+def ObtenerPuntajes():#Abre los puntajes guardados por battleships.py
+    global Puntajes
+    if Puntajes is None:
+        Puntajes = ScoreStore()
+    return Puntajes
+
+def FormatoPuntaje(puesto, puntaje):
+    fecha = time.strftime("%d/%m/%Y", time.localtime(puntaje.played))
+    return f"{puesto}. {puntaje.player}  {puntaje.shots} disparos  " \
+           f"{puntaje.accuracy:.0%} de acierto  {fecha}"
+
+def MostrarPuntajes():
+    puntajes = ObtenerPuntajes()
+    lineas = ["TOP SCORES", ""]
+    mejores = puntajes.top_scores(10)
+    lineas += [FormatoPuntaje(i + 1, p) for i, p in enumerate(mejores)]
+    if not mejores:
+        lineas.append("Aun no hay partidas ganadas")
+
+    lineas += ["", f"Ultimos {DIAS_RECIENTES} dias", ""]
+    recientes = puntajes.top_scores(5, since=time.time() - DIAS_RECIENTES * 24 * 60 * 60)
+    lineas += [FormatoPuntaje(i + 1, p) for i, p in enumerate(recientes)]
+
+    nombre = NombreJugador.get().strip()
+    if nombre:
+        mejor = puntajes.player_best(nombre)
+        lineas += ["", f"Mejor puntaje de {nombre}", ""]
+        lineas.append(FormatoPuntaje(1, mejor) if mejor else "Aun no ha ganado")
+
+    C_fama.itemconfig(textoFama, text="\n".join(lineas))
+
+def VentanaSalonFama():
+    global ventanaFama, C_fama, textoFama
+    if ventanaFama is None:
+        ventanaFama, C_fama = CrearVentana("TopScores", "About.png")
+        textoFama=C_fama.create_text(600, 450, fill="white", font=("Arial", 16), justify=CENTER)
+    MostrarPuntajes()
+    ventanaFama.deiconify()
+
+PantallaIncial = Tk()
+PantallaIncial.title("Battle Ship")
+PantallaIncial.geometry("600x600")
+PantallaIncial.resizable(height=NO, width=NO)
+C_menu=Canvas(PantallaIncial, width=1200, height=900, bg='black')
+C_menu.place(x=0, y=0)
+C_menu.fondo=CargarImagen('FondoPrincipal.png')
+imgCanvas= C_menu.create_image(0,0, anchor=NW, image= C_menu.fondo)
+"""
+FondoPrincipal = CargarImagen("FondoPrincipal.png")
+Fondo = Label(PantallaIncial, image=FondoPrincipal)
+Fondo.place(x=0, y=0)"""
+
+NombreLabel = Label(PantallaIncial, text= "Ingrese el nombre de marine", bg="white")
+NombreLabel.place(x=225, y=230)
+NombreJugador = Entry(PantallaIncial, bg="white", fg="black", justify="center")
+NombreJugador.place(x=240, y=260)
+
+
+
+
+
+
+
+
+
+
+
+PlayAbout=Button(C_menu,width=6,height=2,bg="Pink",text="Crèditos",command=about).place(x=200, y=300)
+SalonFamaButton=Button(C_menu,width=6,height=2,bg="Pink",text="TopScores",command=VentanaSalonFama).place(x=500, y=300)
+
+
+
+
+PantallaIncial.mainloop()
+
+if Puntajes is not None:
+    Puntajes.close()
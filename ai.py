@@ -0,0 +1,680 @@
+"""
+Computer opponents for the Battleships game
+
+A computer opponent controls one Player of a GameLogic. It only looks at
+what a human player could know too: the shots fired at the opponent's
+playing field, which of the opponent's ships have been sunk and the sizes
+of the ships still afloat.
+
+A headless game between two computer opponents:
+    bots = {player1: ProbabilityBot(player1), player2: MonteCarloBot(player2)}
+    game = GameLogic(False, player1, player2)
+    game.start_game()
+    play_game(game, bots)
+
+Each bot chooses shots with choose_shot, which blocks until the shot is
+chosen, or with request_shot, which returns a concurrent.futures.Future
+of the shot so a gui can keep running meanwhile. The probability density
+bot needs NumPy, the Monte Carlo bot samples on a process pool.
+"""
+
+import os
+import random
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from placement import placement_masks, RANDOM_TRIES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RandomBot:
+    """
+    A computer opponent that fires at random fields, a baseline for
+    comparing the other bots
+    """
+
+    def __init__(self, player, rng=random):
+        """
+        Constructor, creates a computer opponent
+        :param player:  Player,         player the bot fires shots for
+        :param rng:     random.Random,  random number generator to use
+        """
+
+        self.__player = player
+        self.__rng = rng
+
+        # fields in the order they are fired at, built on the first shot
+        self.__fields = None
+
+    def get_player(self):
+        """
+        Returns the player this bot fires shots for
+        :return:    Player, player object
+        """
+
+        return self.__player
+
+    def play_turn(self, game):
+        """
+        Fires the bot's shot of the turn
+        :param game:    GameLogic,  game being played
+        :return:        bool,       True  = hit
+                                    False = miss
+        """
+
+        x, y = self.choose_shot(game)
+        return game.fire_shot(x, y, self.__player)
+
+    def choose_shot(self, game):
+        """
+        Chooses a random field not fired at yet
+        :param game:    GameLogic,  game being played
+        :return:        tuple,      x and y coordinates of the field
+        """
+
+        opponent = game.get_opponent(self.__player)
+        if self.__fields is None:
+            self.__fields = [(x, y) for y in range(opponent.get_height())
+                             for x in range(opponent.get_width())]
+            self.__rng.shuffle(self.__fields)
+
+        # ships sinking from one hit mark fields hit without a shot
+        while True:
+            x, y = self.__fields.pop()
+            if opponent.field_state(x, y) <= 1:
+                return x, y
+
+    def request_shot(self, game):
+        """
+        Chooses the field to fire the next shot at right away
+        :param game:    GameLogic,  game being played
+        :return:        Future,     completed future of the x and y
+                                    coordinates of the field
+        """
+
+        shot = Future()
+        shot.set_result(self.choose_shot(game))
+        return shot
+
+    def shutdown(self):
+        """
+        Releases the resources of the bot, nothing to release
+        """
+
+
+class ProbabilityBot:
+    """
+    A computer opponent that fires at the field most likely to hold a ship
+
+    Every placement of every ship still afloat that is consistent with the
+    shots fired so far is counted, and each field gets the count of the
+    placements covering it. Placements through unsunk hits are weighted
+    heavily, so the bot finishes off the ships it has found. The counting
+    is done for whole rows of placements at once with NumPy.
+
+    Placements can't cover misses, sunk ships or the fields next to sunk
+    ships. Ships can't touch, so a placement with an unsunk hit right next
+    to it isn't counted either, that hit would belong to a touching ship.
+    """
+
+    # how much more a placement counts for each unsunk hit it covers
+    HIT_WEIGHT = 50.0
+
+    def __init__(self, player, rng=random):
+        """
+        Constructor, creates a computer opponent
+        :param player:  Player,         player the bot fires shots for
+        :param rng:     random.Random,  random number generator for
+                                        breaking ties between fields
+        """
+
+        if numpy is None:
+            raise ImportError("ProbabilityBot needs NumPy")
+
+        self.__player = player
+        self.__rng = rng
+
+    def request_shot(self, game):
+        """
+        Chooses the field to fire the next shot at, the density is counted
+        so quickly that it's done right away
+        :param game:    GameLogic,  game being played
+        :return:        Future,     completed future of the x and y
+                                    coordinates of the field
+        """
+
+        shot = Future()
+        shot.set_result(self.choose_shot(game))
+        return shot
+
+    def shutdown(self):
+        """
+        Releases the resources of the bot, nothing to release
+        """
+
+    def get_player(self):
+        """
+        Returns the player this bot fires shots for
+        :return:    Player, player object
+        """
+
+        return self.__player
+
+    def play_turn(self, game):
+        """
+        Fires the bot's shot of the turn
+        :param game:    GameLogic,  game being played
+        :return:        bool,       True  = hit
+                                    False = miss
+        """
+
+        x, y = self.choose_shot(game)
+        return game.fire_shot(x, y, self.__player)
+
+    def choose_shot(self, game):
+        """
+        Chooses the field to fire the next shot at
+        :param game:    GameLogic,  game being played
+        :return:        tuple,      x and y coordinates of the field
+        """
+
+        density = self.probability_density(game)
+
+        # ties are broken randomly, so the bot can't be read
+        best = numpy.flatnonzero(density == density.max())
+        y, x = divmod(int(best[int(self.__rng.random() * len(best))]),
+                      density.shape[1])
+        return x, y
+
+    def probability_density(self, game):
+        """
+        Counts the placements of the opponent's remaining ships covering
+        each field of the opponent's playing field, see the class docstring
+        :param game:    GameLogic,      game being played
+        :return:        numpy.ndarray,  weighted placement counts,
+                                        indexed [y, x], 0 for fields already
+                                        fired at
+        """
+
+        opponent = game.get_opponent(self.__player)
+        width = opponent.get_width()
+        height = opponent.get_height()
+
+        hits = rows_to_array(opponent.hit_rows(), width)
+        misses = rows_to_array(opponent.miss_rows(), width)
+
+        sunk_coords, sizes = remaining_ships(opponent)
+        sunk = numpy.zeros((height, width), dtype=bool)
+        for x, y in sunk_coords:
+            sunk[y, x] = True
+
+        # fields next to sunk ships are water
+        near_sunk = sunk.copy()
+        near_sunk[1:, :] |= sunk[:-1, :]
+        near_sunk[:-1, :] |= sunk[1:, :]
+        near_sunk[:, 1:] |= sunk[:, :-1]
+        near_sunk[:, :-1] |= sunk[:, 1:]
+
+        free = ~(misses | near_sunk)
+        pending = hits & ~sunk
+
+        density = numpy.zeros((height, width))
+        for size in set(sizes):
+            count = sizes.count(size)
+            density += count * row_density(free, pending, size,
+                                           self.HIT_WEIGHT)
+            # ships of size one are only placed "vertically"
+            if size > 1:
+                density += count * row_density(free.T, pending.T, size,
+                                               self.HIT_WEIGHT).T
+
+        density[hits | misses] = 0.0
+
+        # nothing consistent left shouldn't happen, fire anywhere
+        # not fired at yet
+        if not density.any():
+            density = (~(hits | misses)).astype(float)
+
+        return density
+
+
+class MonteCarloBot:
+    """
+    A computer opponent that samples whole fleets fitting the shots fired
+    so far and fires at the field covered by the most sampled ships
+
+    Each sample first covers the unsunk hits with ships through them, then
+    places the rest of the ships still afloat anywhere legal. Sampling is
+    spread over a process pool and runs for a fixed time per move, so the
+    bot gets stronger with more cores.
+    """
+
+    def __init__(self, player, time_budget=0.5, workers=None, rng=random,
+                 samples=None):
+        """
+        Constructor, creates a computer opponent
+        :param player:      Player,         player the bot fires shots for
+        :param time_budget: float,          seconds of sampling per move
+        :param workers:     int,            processes to sample in,
+                                            defaults to the cpu count,
+                                            0 = sample in this process
+        :param rng:         random.Random,  random number generator for
+                                            seeding the samplers
+        :param samples:     int,            fleets sampled per move by each
+                                            process instead of sampling for
+                                            the time budget, for moves that
+                                            only depend on the seed
+        """
+
+        self.__player = player
+        self.__time_budget = time_budget
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.__workers = workers
+        self.__rng = rng
+        self.__samples = samples
+
+        # started on the first move
+        self.__executor = None
+
+    def get_player(self):
+        """
+        Returns the player this bot fires shots for
+        :return:    Player, player object
+        """
+
+        return self.__player
+
+    def play_turn(self, game):
+        """
+        Fires the bot's shot of the turn
+        :param game:    GameLogic,  game being played
+        :return:        bool,       True  = hit
+                                    False = miss
+        """
+
+        x, y = self.choose_shot(game)
+        return game.fire_shot(x, y, self.__player)
+
+    def choose_shot(self, game):
+        """
+        Chooses the field to fire the next shot at, blocks for about
+        the time budget
+        :param game:    GameLogic,  game being played
+        :return:        tuple,      x and y coordinates of the field
+        """
+
+        return self.request_shot(game).result()
+
+    def request_shot(self, game):
+        """
+        Starts sampling for the next shot on the process pool
+        :param game:    GameLogic,  game being played
+        :return:        Future,     future of the x and y coordinates of
+                                    the field, completed once every
+                                    process has used up the time budget
+        """
+
+        opponent = game.get_opponent(self.__player)
+        width = opponent.get_width()
+        height = opponent.get_height()
+        shot, forbidden, pending, sizes = opponent_knowledge(opponent)
+
+        shot_future = Future()
+
+        # e.g. in the processes of a tournament, which already keeps
+        # every core busy
+        if not self.__workers:
+            total = [0] * (width * height)
+            coverage = sample_coverage(width, height, sizes, forbidden,
+                                       pending, self.__rng.getrandbits(64),
+                                       self.__time_budget, self.__samples)
+            for index, count in coverage.items():
+                total[index] = count
+            shot_future.set_result(pick_shot(width, height, total, shot,
+                                             forbidden, self.__rng))
+            return shot_future
+
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.__workers)
+        coverages = []
+
+        def collect(sampling):
+            """
+            Adds up the coverages of the processes as they finish,
+            the shot is chosen once all of them have
+            """
+
+            if sampling.cancelled():
+                coverages.append(None)
+            elif sampling.exception() is not None:
+                coverages.append(sampling.exception())
+            else:
+                coverages.append(sampling.result())
+            if len(coverages) < self.__workers:
+                return
+
+            if not any(isinstance(coverage, dict) for coverage in coverages):
+                errors = [coverage for coverage in coverages
+                          if coverage is not None]
+                shot_future.set_exception(
+                    errors[0] if errors else RuntimeError("Sampling was "
+                                                          "cancelled"))
+                return
+
+            total = [0] * (width * height)
+            for coverage in coverages:
+                if isinstance(coverage, dict):
+                    for index, count in coverage.items():
+                        total[index] += count
+
+            shot_future.set_result(pick_shot(width, height, total, shot,
+                                             forbidden, self.__rng))
+
+        for _ in range(self.__workers):
+            sampling = self.__executor.submit(
+                sample_coverage, width, height, sizes, forbidden, pending,
+                self.__rng.getrandbits(64), self.__time_budget,
+                self.__samples)
+            sampling.add_done_callback(collect)
+
+        return shot_future
+
+    def shutdown(self):
+        """
+        Shuts down the process pool without waiting for running samplers
+        """
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+
+
+def sample_coverage(width, height, sizes, forbidden, pending, seed,
+                    time_budget, samples=None):
+    """
+    Samples fleets fitting the shots fired at a playing field until the
+    time budget runs out, run in the processes of MonteCarloBot
+    Bit y * width + x of the masks is the field at x, y.
+    :param width:       int,    playing field width
+    :param height:      int,    playing field height
+    :param sizes:       list,   sizes of the ships still afloat
+    :param forbidden:   int,    mask of fields no ship afloat can cover:
+                                misses, sunk ships and the fields next to
+                                sunk ships
+    :param pending:     int,    mask of the unsunk hits
+    :param seed:        int,    random seed
+    :param time_budget: float,  seconds to sample for
+    :param samples:     int,    how many fleets to sample instead,
+                                None = sample for the time budget
+    :return:            dict,   field index as key, how many sampled ships
+                                covered the field as value
+    """
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_budget
+    sizes = sorted(sizes, reverse=True)
+    masks = {size: placement_masks(width, height, size) for size in sizes}
+
+    # placements of each size through each field
+    through = {}
+    for size in set(sizes):
+        through[size] = {}
+        for mask in masks[size]:
+            ship = mask[0]
+            while ship:
+                field = ship & -ship
+                through[size].setdefault(field.bit_length() - 1,
+                                         []).append(mask)
+                ship ^= field
+
+    pending_fields = []
+    fields = pending
+    while fields:
+        field = fields & -fields
+        pending_fields.append(field.bit_length() - 1)
+        fields ^= field
+
+    # how many times each placement was sampled
+    sampled = {}
+
+    attempts = 0
+    while time.perf_counter() < deadline if samples is None \
+            else attempts < samples:
+        # a hundred samples between looking at the clock
+        for _ in range(100 if samples is None else samples):
+            attempts += 1
+            fleet = sample_fleet(sizes, masks, through, forbidden, pending,
+                                 pending_fields, rng)
+            if fleet is not None:
+                for mask in fleet:
+                    sampled[mask[2]] = sampled.get(mask[2], 0) + 1
+
+    coverage = {}
+    for (x, y, size, vertical), count in sampled.items():
+        for part in range(size):
+            index = (y + part) * width + x if vertical \
+                else y * width + x + part
+            coverage[index] = coverage.get(index, 0) + count
+
+    return coverage
+
+
+def sample_fleet(sizes, masks, through, forbidden, pending, pending_fields,
+                 rng):
+    """
+    Samples one fleet for sample_coverage
+    :return:    list,   the placement masks of the fleet,
+                        None if the sample ran into a dead end
+    """
+
+    sizes = list(sizes)
+    blocked = forbidden
+    covered = 0
+    fleet = []
+
+    # cover the unsunk hits first, each with a ship through it
+    while covered != pending:
+        field = rng.choice([field for field in pending_fields
+                            if not covered >> field & 1])
+        candidates = []
+        for size in set(sizes):
+            for mask in through[size].get(field, ()):
+                ship, halo = mask[0], mask[1]
+                # a hit next to the ship would be a touching ship
+                if not ship & blocked and not (halo & ~ship) & pending:
+                    candidates.append(mask)
+        if not candidates:
+            return None
+
+        mask = candidates[int(rng.random() * len(candidates))]
+        sizes.remove(mask[2][2])
+        blocked |= mask[1]
+        covered |= mask[0] & pending
+        fleet.append(mask)
+
+    # the rest of the ships can't touch the hits, their halos are blocked
+    for size in sizes:
+        size_masks = masks[size]
+        picked = None
+        for _ in range(RANDOM_TRIES):
+            mask = size_masks[int(rng.random() * len(size_masks))]
+            if not mask[0] & (blocked | pending):
+                picked = mask
+                break
+
+        if picked is None:
+            legal = [mask for mask in size_masks
+                     if not mask[0] & (blocked | pending)]
+            if not legal:
+                return None
+            picked = legal[int(rng.random() * len(legal))]
+
+        blocked |= picked[1]
+        fleet.append(picked)
+
+    return fleet
+
+
+def pick_shot(width, height, coverage, shot, forbidden, rng):
+    """
+    Picks the field not fired at yet covered by the most sampled ships,
+    any field that may still hold a ship if no fleet was sampled
+    :param width:       int,            playing field width
+    :param height:      int,            playing field height
+    :param coverage:    list,           sampled ships covering each field,
+                                        index is y * width + x
+    :param shot:        int,            mask of the fields fired at
+    :param forbidden:   int,            see sample_coverage
+    :param rng:         random.Random,  random number generator for
+                                        breaking ties
+    :return:            tuple,          x and y coordinates of the field
+    """
+
+    open_fields = [index for index in range(width * height)
+                   if not (shot | forbidden) >> index & 1]
+    if not open_fields:
+        open_fields = [index for index in range(width * height)
+                       if not shot >> index & 1]
+
+    best = max(coverage[index] for index in open_fields)
+    best_fields = [index for index in open_fields
+                   if coverage[index] == best]
+    y, x = divmod(best_fields[int(rng.random() * len(best_fields))], width)
+    return x, y
+
+
+def remaining_ships(opponent):
+    """
+    Returns what's known about the ships of a player: sunk ships are
+    announced, the sizes of the others are known from the fleet
+    :param opponent:    Player, player whose ships to look at
+    :return:            tuple,  list of the coordinates of sunk ship parts
+                                and list of the sizes of the ships afloat
+    """
+
+    sunk_coords = []
+    sizes = []
+    for ships in opponent.get_battleships().values():
+        for ship in ships:
+            if ship.parts_left() == 0:
+                sunk_coords += ship.get_coords()
+            else:
+                sizes.append(ship.get_size())
+
+    return sunk_coords, sizes
+
+
+def opponent_knowledge(opponent):
+    """
+    Returns what's known about a player's playing field as masks,
+    bit y * width + x is the field at x, y
+    :param opponent:    Player, player whose playing field to look at
+    :return:            tuple,  masks of the fields fired at, the fields
+                                no ship afloat can cover and the unsunk
+                                hits, and list of the sizes of the ships
+                                afloat, see sample_coverage
+    """
+
+    width = opponent.get_width()
+    height = opponent.get_height()
+    hits = opponent.hit_mask()
+    misses = opponent.miss_mask()
+
+    sunk_coords, sizes = remaining_ships(opponent)
+    sunk = 0
+    near_sunk = 0
+    for x, y in sunk_coords:
+        sunk |= 1 << (y * width + x)
+        for near_x, near_y in ((x, y), (x - 1, y), (x + 1, y),
+                               (x, y - 1), (x, y + 1)):
+            if 0 <= near_x < width and 0 <= near_y < height:
+                near_sunk |= 1 << (near_y * width + near_x)
+
+    return hits | misses, misses | near_sunk, hits & ~sunk, sizes
+
+
+def row_density(free, pending, size, hit_weight):
+    """
+    Counts the horizontal placements of a ship covering each field
+    :param free:        numpy.ndarray,  bool [y, x], True = field can hold
+                                        a part of a ship still afloat
+    :param pending:     numpy.ndarray,  bool [y, x], True = unsunk hit
+    :param size:        int,            size of the ship
+    :param hit_weight:  float,          weight factor of each covered
+                                        unsunk hit
+    :return:            numpy.ndarray,  weighted placement count [y, x]
+    """
+
+    height, width = free.shape
+    if size > width:
+        return numpy.zeros((height, width))
+
+    # placements by origin, [y, x] for x in 0..width - size
+    legal = window_sum(free, size) == size
+    covered_hits = window_sum(pending, size)
+
+    # unsunk hits orthogonally next to a placement
+    padded = numpy.pad(pending, 1).astype(numpy.int64)
+    next_hits = padded[1:-1, :width - size + 1] \
+        + padded[1:-1, size + 1:] \
+        + window_sum(padded[:-2, 1:-1], size) \
+        + window_sum(padded[2:, 1:-1], size)
+    legal &= next_hits == 0
+
+    weights = numpy.where(legal, hit_weight ** covered_hits, 0.0)
+
+    # each placement counts for all the fields it covers
+    return window_sum(numpy.pad(weights, ((0, 0), (size - 1, size - 1))),
+                      size)
+
+
+def window_sum(values, size):
+    """
+    Sums each horizontal window of the specified size
+    :param values:  numpy.ndarray,  values [y, x]
+    :param size:    int,            window size
+    :return:        numpy.ndarray,  sums [y, x] of the windows starting
+                                    at x, width - size + 1 columns
+    """
+
+    sums = numpy.zeros((values.shape[0], values.shape[1] + 1),
+                       dtype=numpy.float64 if values.dtype.kind == "f"
+                       else numpy.int64)
+    numpy.cumsum(values, axis=1, out=sums[:, 1:])
+    return sums[:, size:] - sums[:, :-size]
+
+
+def rows_to_array(rows, width):
+    """
+    Converts a row bitboard of a playing field to an array
+    :param rows:    list,           ints, bit x of row y set for field x, y
+    :param width:   int,            playing field width
+    :return:        numpy.ndarray,  bool [y, x]
+    """
+
+    if width < 64:
+        return ((numpy.array(rows, dtype=numpy.uint64)[:, None]
+                 >> numpy.arange(width, dtype=numpy.uint64)) & 1) \
+            .astype(bool)
+
+    return numpy.array([[row >> x & 1 for x in range(width)]
+                        for row in rows], dtype=bool)
+
+
+def play_game(game, bots):
+    """
+    Plays a started game between computer opponents until it ends
+    :param game:    GameLogic,  started game
+    :param bots:    dict,       computer opponent of each player
+    :return:        Player,     the winner
+    """
+
+    while not game.game_ended():
+        bots[game.current_player()].play_turn(game)
+
+    return game.winner()
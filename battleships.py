@@ -13,21 +13,25 @@ in mind, but ran I out of time.
 Still, this is a fully functional first version of the game
 
 Start off by naming both players and choosing if you want ships to sink
-from one hit.
+from one hit. Player 2 can also be the computer, which needs NumPy.
 By default ships sink once each part (size = parts) of them is hit.
 
 
 Then the first player starts placing in their battleships.
 The second player stands by meanwhile.
-Number of battleships, and their size, is hardcoded for now:
+By default the fleet of battleships is:
     1x Carrier      (size 5)
     1x Battleship   (size 4)
     2x Cruiser      (size 3)
     2x Destroyer    (size 2)
     2x Submarine    (size 1)
+A different fleet can be entered in the settings window,
+e.g. "Carrier:5x1, Cruiser:3x3". The game checks that the fleet fits on
+the playing field before anyone starts placing ships.
 
 Ships are placed by clicking a corresponding button on the play field.
-Start from the top left corner of the ship.
+Start from the top left corner of the ship. The Auto-place button places
+the ships not placed yet at random.
 
 Ship can be placed horizontally and vertically.
 Ships can't overlap or touch, but you don't have to worry about this, the game
@@ -62,32 +66,42 @@ Winner is the first person to destroy all each of the opponent's ships.
 Or a player can also forfeit.
 
 Enjoy the game!
+
+The rules of the game live in engine.py, which doesn't depend on tkinter and
+can be used to play games without the gui.
 """
 
+import time
+
+# when the imports of this module started, see StartupProfile
+IMPORTS_STARTED = time.perf_counter()
+
 from tkinter import *
 from tkinter import messagebox
-from tkinter import scrolledtext
 
-from random import randrange
+import collections
+import importlib.util
 from functools import partial
-import webbrowser
 import os.path
+import sys
 
+from engine import Player, GameLogic, Fleet, RecorderGroup, DEFAULT_FLEET, \
+    DEFAULT_FIELD_WIDTH, DEFAULT_FIELD_HEIGHT
+from placement import PlacementTable, find_fleet_placement
+from boards import WidgetBoard, BOARD_BACKENDS
+from replay import ReplayWriter
+from gamelog import GameLog, LogHistory, format_entry
 
-# global constants:
-X_FIELDS = list("ABCDEFGHIJ")
+# the computer opponents (ai.py, which imports NumPy), online play
+# (client.py, which imports asyncio), the score store (sqlite3), saved games,
+# the web browser and the dialogs are imported when they're first used, so
+# the settings window opens quickly and headless users of this module don't
+# pay for them
 
-SHIP_PLACE_ORDER = ("Carrier,Battleship" + ",Cruiser" * 2 + ",Destroyer" * 2 +
-                    ",Submarine" * 2).split(",")
+IMPORTS_DONE = time.perf_counter()
 
-BATTLESHIP_SIZES = {
-    "Carrier": 5,
-    "Battleship": 4,
-    "Cruiser": 3,
-    "Destroyer": 2,
-    "Submarine": 1
-}
 
+# global constants:
 PLAYING_FIELD_COLORS = {
     "water": "#3eb2fa",
     "ship": "green",
@@ -95,290 +109,343 @@ PLAYING_FIELD_COLORS = {
     "miss": "#d9c532"
 }
 
-EXIT_APPLICATION = False
+# smallest and largest playing field width and height selectable in the gui
+FIELD_SIZE_LIMITS = (10, 100)
 
-ICON_MISSING = False
+# larger playing fields are always drawn on a canvas,
+# a widget for each field would be too slow
+MAX_WIDGET_BOARD_SIZE = 20
 
-# to be set
-GAME_LOGIC = None
+# milliseconds the computer waits before firing, so its shots can be seen
+COMPUTER_MOVE_DELAY = 400
 
-# contain the Player objects for both players
-PLAYERS = []
+# seconds the stronger computer opponent thinks about each shot, and
+# milliseconds between checks whether it's done
+COMPUTER_TIME_BUDGET = 0.5
+COMPUTER_POLL_INTERVAL = 50
 
+# milliseconds between checks for messages of the game server
+NETWORK_POLL_INTERVAL = 50
 
-class Player:
-    """
-    Models a player for this game
-    """
+# game server offered when playing online, see server.py
+DEFAULT_SERVER = "localhost:8765"
 
-    def __init__(self, name):
-        """
-        Constructor, creates a player object
-        :param name: str, player's name
-        """
+# how many times auto-placing the remaining ships is tried before giving up
+AUTO_PLACE_ATTEMPTS = 100
 
-        self.__name = name
-        self.__battleships = {}
-        self.__shots_fired = 0
-        self.__shots_hit = 0
-        self.__hits_taken = 0
-        self.__ships_left = 8
+# every game played is recorded to this file, see replay.py
+REPLAY_FILE = "replays.bsr"
 
-        # to be set
-        self.__game_window = None
+# the game windows show the last messages of the game log, the whole log
+# of every game is appended to this file, see gamelog.py
+LOG_CAPACITY = 500
+LOG_HISTORY_FILE = "game_logs.txt"
 
-        # 10x10 matrix intialized with zeros
-        # 0 = water
-        # 1 = ship part
-        # 2 = hit ship
-        # 3 = missed shot
-        self.__playing_field = [[0 for _ in range(10)] for _ in range(10)]
+# the winners of the games are stored here for the top scores of Main.py,
+# see scores.py
+SCORES_FILE = "scores.db"
 
-    def increment_shots(self):
-        """
-        Increments the amount of shots this player has fired
-        """
+# file types offered for saved games, see snapshot.py
+SAVED_GAME_TYPES = [("Battleships saved games", "*.bss"), ("All files", "*")]
+
+ICON_MISSING = False
 
-        self.__shots_fired += 1
+# records the games, to be set
+REPLAY_WRITER = None
+
+# writes the game logs, to be set
+LOG_HISTORY = None
+
+# stores the winners, opened when first needed, see score_store
+SCORE_STORE = None
+
+# modules whose import is deferred, reported by the startup profile
+DEFERRED_MODULES = ("numpy", "ai", "asyncio", "client", "sqlite3", "scores",
+                    "webbrowser", "snapshot")
+
+# times the startup when started with --profile-startup, None otherwise
+STARTUP_PROFILE = None
+
+# measures the callbacks when started with --profile-latency, None otherwise
+LATENCY_MONITOR = None
 
-    def increment_hits(self):
-        """
-        Increments the amount of shots this player has hit
-        """
 
-        self.__shots_hit += 1
+class StartupProfile:
+    """
+    Times the phases from starting the program until the settings window
+    handles its first event
+    """
 
-    def increment_hits_taken(self):
+    def __init__(self):
         """
-        Increments the amount of hits this player has taken
+        Constructor, starts timing from the imports of this module
         """
 
-        self.__hits_taken += 1
+        # phases as (name, seconds since the previous phase)
+        self.__phases = [("imports", IMPORTS_DONE - IMPORTS_STARTED)]
+        self.__previous = time.perf_counter()
+        self.__phases.append(("module setup", self.__previous - IMPORTS_DONE))
 
-    def decrease_ship_count(self):
+    def mark(self, phase):
         """
-        Decreases the amount of ships this player has left and returns
-        the new count of ships
-        :return:    int, count of ships left
+        Ends a phase of the startup
+        :param phase:   str,    what was done since the previous phase
         """
 
-        self.__ships_left -= 1
-        return self.__ships_left
+        now = time.perf_counter()
+        self.__phases.append((phase, now - self.__previous))
+        self.__previous = now
 
-    def add_battleship(self, battleship, vertical, coords):
+    def report(self):
         """
-        Adds a battleship to this player's battleships
-        :param battleship:  str,    name of battleship to add
-        :param vertical:    bool,   True  = placed vertically
-                                    False = placed horizontally
-        :param coords:      tuple,  tuple of the x and y coordinates
-                                    for ship's origin
+        Prints the phases and which deferred modules got loaded to stderr
         """
 
-        # set or append depending on if a the player already has
-        # the type of battleship
-        if battleship not in self.__battleships:
-            self.__battleships[battleship] = [Battleship(battleship, vertical,
-                                                         coords)]
-        else:
-            self.__battleships[battleship].append(
-                Battleship(battleship, vertical, coords))
+        print("Startup profile:", file=sys.stderr)
+        for phase, seconds in self.__phases:
+            print(f"  {phase:<28}{seconds * 1000:8.1f} ms", file=sys.stderr)
+        total = self.__previous - IMPORTS_STARTED
+        print(f"  {'total':<28}{total * 1000:8.1f} ms", file=sys.stderr)
 
-        x = coords[0]
-        y = coords[1]
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+        print(f"  deferred modules loaded: {', '.join(loaded) or 'none'}",
+              file=sys.stderr)
 
-        # mark all the ship's parts to the player's playing field object
-        for i in range(BATTLESHIP_SIZES[battleship]):
-            if vertical:
-                self.__playing_field[y + i][x] = 1
-            else:
-                self.__playing_field[y][x + i] = 1
-
-    def get_battleships(self):
-        """
-        Returns this player's battleships
-        :return:    dict, dict of battleship objects
-        """
 
-        return self.__battleships
+class GameSession:
+    """
+    A game played in the gui: its players, their game windows and the game
+    logic. Each window works on its own session, so any number of games can
+    be played in the same process.
+    """
 
-    def set_game_window(self, game_window):
+    def __init__(self, recorder=None, history=None):
         """
-        Assigns a GameWindow object to this player
-        :param game_window: GameWindow, game window object
+        Constructor, creates a session without players
+        :param recorder:    object,     recorder of the game, see GameLogic
+        :param history:     LogHistory, gets the whole game log
         """
 
-        self.__game_window = game_window
+        self.__recorder = recorder
 
-    def update_playing_field(self, x, y, hit):
-        """
-        Updates hits and misses to this player's playing field
-        :param x:       int,    playing field x coordinate
-        :param y:       int,    playing field y coordinate
-        :param hit:     bool,   True  = ship was hit here
-                                False = missed shot here
-        """
+        # shown by the game windows of both players
+        self.__log = GameLog(LOG_CAPACITY, history)
+
+        # players who have placed their ships
+        self.__players = []
 
-        self.__playing_field[y][x] = 2 if hit else 3
+        # to be set once both players are ready
+        self.__game = None
 
-    def get_game_window(self):
+    def add_player(self, player):
         """
-        Returns this player's game window object
-        :return: GameWindow, game window object
+        Adds a player who has placed their ships
+        :param player:  Player, the player
         """
 
-        return self.__game_window
+        self.__players.append(player)
 
-    def get_playing_field(self):
+    def get_players(self):
         """
-        Returns this player's playing field object
-        :return:    2d array, the playing field
+        Returns the players who have placed their ships
+        :return:    list,   Player objects in the order they were added
         """
 
-        return self.__playing_field
+        return self.__players
 
-    def ships_left(self):
+    def start_game(self, sink_from_one):
         """
-        Returns the amount of ships this player has left
-        :return:    int, count
+        Creates the game logic of both players, the game windows are set to
+        the players before the game is started
+        :param sink_from_one:   bool,       True = ships sink from one hit
+        :return:                GameLogic,  the game
         """
 
-        return self.__ships_left
+        self.__game = GameLogic(sink_from_one, *self.__players,
+                                recorder=self.__recorder, log=self.__log)
+        return self.__game
 
-    def shots_fired(self):
+    def set_game(self, game):
         """
-        Returns the amount of shots this player has fired
-        :return:    int, count
+        Sets a game created elsewhere, e.g. a restored one
+        :param game:    GameLogic,  the game
         """
 
-        return self.__shots_fired
+        self.__game = game
+        self.__players[:] = game.get_players()
+        game.set_log(self.__log)
 
-    def shots_hit(self):
+    def get_game(self):
         """
-        Returns the amount of shots this player has hit
-        :return:    int, count
+        Returns the game logic
+        :return:    GameLogic,  None until the game is started
         """
 
-        return self.__shots_hit
+        return self.__game
 
-    def hits_taken(self):
+    def get_log(self):
         """
-        Returns the amount of hits this player has taken
-        :return:    int, count
+        Returns the log of the game
+        :return:    GameLog,    the last messages of the game
         """
 
-        return self.__hits_taken
+        return self.__log
 
-    def __str__(self):
+    def get_windows(self):
         """
-        Returns the string representation of this object (player's name)
-        :return: str, player's name
+        Returns the game windows of the players
+        :return:    list,   GameWindow objects
         """
 
-        return self.__name
+        return [player.get_game_window() for player in self.__players
+                if player.get_game_window() is not None]
 
 
-class Battleship:
+class Application:
     """
-    Models a battleship
+    The gui: a single Tk root window for the whole program, which shows one
+    screen at a time. The settings, ship arrangement and game screens are
+    built into a frame of the root, which is replaced by the next screen's,
+    so returning to the main menu any number of times never nests windows or
+    mainloops.
     """
 
-    def __init__(self, ship_type, vertical, coords):
+    def __init__(self):
         """
-        Constructor, creates a battleship object
-        :param ship_type:   str,    type of battleship to create
-        :param vertical:    bool,   True  = placed vertically
-                                    False = placed horizontally
-        :param coords:      tuple,  tuple of the x and y coordinates
-                                    for ship's origin
+        Constructor, creates the root window
         """
 
-        self.__ship_type = ship_type
-        self.__size = BATTLESHIP_SIZES[ship_type]
-        self.__vertical = vertical
-        self.__hits_taken = 0
+        self.__root = Tk()
+        watch_latency(self.__root)
+        self.__root.resizable(False, False)
+        if not ICON_MISSING:
+            self.__root.iconbitmap("icon.ico")
 
-        # array of tuples containing all the ship's part's coordinates
-        self.__coords = []
+        # frame and menu of the current screen
+        self.__frame = None
+        self.__menu = None
 
-        # which parts of the ship haven't been hit
-        # same as above at start
-        self.__parts_left = []
+        # windows opened next to the current screen, e.g. the second game
+        # window of a game, and the callbacks run when the screen is closed
+        self.__windows = []
+        self.__closed_callbacks = []
 
-        # generate all of the ship's parts
-        x = coords[0]
-        y = coords[1]
-        for i in range(self.__size):
-            if vertical:
-                self.__coords.append((x, y + i))
-                self.__parts_left.append((x, y + i))
-            else:
-                self.__coords.append((x + i, y))
-                self.__parts_left.append((x + i, y))
+    def get_root(self):
+        """
+        Returns the root window
+        :return:    Tk,     the root window
+        """
+
+        return self.__root
 
-    def assign_hit(self, x, y, sink_from_one):
+    def show_screen(self, title, geometry="", on_close=None, closed=None):
         """
-        Marks a part of this ship hit and returns
-        how many parts left it has
-        :param x:               int,   playing field x coordinate
-        :param y:               int,   playing field y coordiante
-        :param sink_from_one:   bool,  True  = ships sink from one hit
-                                       False = ships sink once each part is hit
-        :return:                int,   amount of parts left in ship
+        Replaces the current screen, and the windows opened with it, with an
+        empty frame for a new screen
+        :param title:       str,        title of the root window
+        :param geometry:    str,        size of the root window, e.g.
+                                        "250x260", "" = fit the screen
+        :param on_close:    function,   run when the user closes the root
+                                        window, defaults to quit
+        :param closed:      function,   run when the screen is replaced or
+                                        the application quits
+        :return:            Frame,      frame to build the screen into
         """
 
-        self.__hits_taken += 1
+        self.close_screen()
 
-        # whole ship is gone from one hit
-        if sink_from_one:
-            self.__parts_left.clear()
+        self.__root.title(title)
+        self.__root.geometry(geometry)
+        self.__root.protocol("WM_DELETE_WINDOW", on_close or self.quit)
 
-        # ship no longer has this part
-        else:
-            self.__parts_left.remove((x, y))
+        self.__frame = Frame(self.__root)
+        self.__frame.pack(fill=BOTH, expand=True)
+        if closed is not None:
+            self.__closed_callbacks.append(closed)
+        return self.__frame
 
-        # return amount of parts left in ship
-        return len(self.__parts_left)
+    def open_window(self, title, geometry="", on_close=None, closed=None):
+        """
+        Opens a window next to the current screen, it's closed with it
+        :param title:       str,        title of the window
+        :param geometry:    str,        size of the window, "" = fit the
+                                        contents
+        :param on_close:    function,   run when the user closes the window,
+                                        defaults to destroying it
+        :param closed:      function,   run when the screen is replaced or
+                                        the application quits
+        :return:            Toplevel,   the window
+        """
 
-    def get_coords(self):
+        window = Toplevel(self.__root)
+        window.title(title)
+        window.geometry(geometry)
+        window.resizable(False, False)
+        if not ICON_MISSING:
+            window.iconbitmap("icon.ico")
+        window.protocol("WM_DELETE_WINDOW", on_close or window.destroy)
+
+        self.__windows.append(window)
+        if closed is not None:
+            self.__closed_callbacks.append(closed)
+        return window
+
+    def set_menu(self, window, menu):
         """
-        Returs this battleship's coordinates
-        :return:    array, array of tuples
+        Sets the menu of the root window or of a window opened next to the
+        screen, a menu of the root window is destroyed with the screen
+        :param window:  Tk,     the root window or a window from open_window
+        :param menu:    Menu,   the menu
         """
 
-        return self.__coords
+        window.config(menu=menu)
+        if window is self.__root:
+            self.__menu = menu
 
-    def parts_left(self):
+    def close_screen(self):
         """
-        Returns the amount of parts this battleship has left
-        :return:    int, count
+        Destroys the current screen and the windows opened with it
         """
 
-        return len(self.__parts_left)
+        callbacks, self.__closed_callbacks = self.__closed_callbacks, []
+        for callback in callbacks:
+            callback()
+
+        for window in self.__windows:
+            window.destroy()
+        self.__windows.clear()
+
+        if self.__menu is not None:
+            self.__root.config(menu="")
+            self.__menu.destroy()
+            self.__menu = None
 
-    def get_size(self):
+        if self.__frame is not None:
+            self.__frame.destroy()
+            self.__frame = None
+
+    def show_settings(self):
         """
-        Returns the size of this battleship
-        :return:    int, size
+        Shows the settings screen, i.e. the main menu
         """
 
-        return self.__size
+        SettingsWindow(self)
 
-    def hits_taken(self):
+    def quit(self):
         """
-        Returns the amount of hits this battleship has taken
-        :return:    int, count
+        Closes the current screen and the root window, which ends mainloop
         """
 
-        return self.__hits_taken
+        self.close_screen()
+        self.__root.destroy()
 
-    def __str__(self):
+    def mainloop(self):
         """
-        Returns the string representation of this object (battleships's type)
-        :return: str, battleship's type
+        Shows the main menu and runs the gui until the application quits
         """
 
-        return self.__ship_type
+        self.show_settings()
+        self.__root.mainloop()
 
 
 class SettingsWindow:
@@ -386,27 +453,47 @@ class SettingsWindow:
     A class to model the settings gui that appears on program startup
     """
 
-    def __init__(self):
+    def __init__(self, app):
         """
         Constructor, creates the settings gui and its controls
+        :param app: Application,    the gui, whose screen this replaces
         """
 
-        self.__main_window = Tk()
+        self.__app = app
 
-        # 250x150 non-resizeable window
-        self.__main_window.geometry("250x155")
-        self.__main_window.resizable(False, False)
+        # 250x260 window
+        self.__main_window = app.show_screen("Battleships", "250x260")
 
-        # set title and icon
-        self.__main_window.title("Battleships")
-        if not ICON_MISSING:
-            self.__main_window.iconbitmap("icon.ico")
+        # set once the game is started, for the screens that follow
+        self.__session = None
+        self.__board_class = None
+        self.__sink = False
+        self.__player2 = None
+        self.__computer = None
+
+        # the computer's ship placement running in the background, None
+        # once its screen is closed
+        self.__computer_placement = None
 
         # create a menu
-        menu = Menu(self.__main_window)
+        menu = Menu(app.get_root())
         options_menu = Menu(menu, tearoff=0)
+        # draw playing fields on a canvas instead of a widget per field
+        self.__canvas_boards = IntVar(self.__main_window)
+        options_menu.add_checkbutton(label="Draw Fields On Canvas",
+                                     variable=self.__canvas_boards)
+        # sample whole fleets on all cores instead of counting placements
+        self.__stronger_computer = IntVar(self.__main_window)
+        options_menu.add_checkbutton(label="Stronger Computer Opponent",
+                                     variable=self.__stronger_computer)
+        options_menu.add_separator()
+        options_menu.add_command(label="Load Game...",
+                                 command=self.load_game)
+        options_menu.add_command(label="Play Online...",
+                                 command=self.play_online)
+        options_menu.add_separator()
         options_menu.add_command(label="Exit Application",
-                                 command=self.__main_window.destroy)
+                                 command=app.quit)
         menu.add_cascade(label="Options", menu=options_menu)
 
         helpmenu = Menu(menu, tearoff=0)
@@ -415,7 +502,7 @@ class SettingsWindow:
         helpmenu.add_command(label="About...", command=about)
         menu.add_cascade(label="Help", menu=helpmenu)
 
-        self.__main_window.config(menu=menu)
+        app.set_menu(app.get_root(), menu)
 
         # player 1 name input
         self.__player1_entry = Entry(self.__main_window)
@@ -434,6 +521,37 @@ class SettingsWindow:
                                   variable=self.__sink_from_one)
         sink_option.pack(pady=(5, 0))
 
+        # checkbox to play against the computer
+        self.__computer_opponent = IntVar(self.__main_window)
+        computer_option = Checkbutton(self.__main_window,
+                                      text="Player 2 is the computer",
+                                      variable=self.__computer_opponent)
+        computer_option.pack()
+
+        # playing field width and height inputs
+        field_size_frame = Frame(self.__main_window)
+        field_size_frame.pack(pady=(5, 0))
+        field_size_label = Label(field_size_frame, text="Field size:")
+        field_size_label.grid(row=0, column=0, padx=(0, 5))
+        self.__width_entry = Spinbox(field_size_frame, width=4,
+                                     from_=FIELD_SIZE_LIMITS[0],
+                                     to=FIELD_SIZE_LIMITS[1])
+        self.__width_entry.grid(row=0, column=1)
+        times_label = Label(field_size_frame, text="x")
+        times_label.grid(row=0, column=2)
+        self.__height_entry = Spinbox(field_size_frame, width=4,
+                                      from_=FIELD_SIZE_LIMITS[0],
+                                      to=FIELD_SIZE_LIMITS[1])
+        self.__height_entry.grid(row=0, column=3)
+
+        # fleet input, e.g. "Carrier:5x1, Cruiser:3x2"
+        fleet_label = Label(self.__main_window,
+                            text="Fleet (type:sizexcount):")
+        fleet_label.pack(pady=(5, 0))
+        self.__fleet_entry = Entry(self.__main_window, width=36)
+        self.__fleet_entry.pack()
+        self.__fleet_entry.insert(END, str(DEFAULT_FLEET))
+
         # frame to contain next two buttons
         button_frame = Frame(self.__main_window)
         button_frame.pack(pady=(10, 0))
@@ -447,16 +565,157 @@ class SettingsWindow:
         # quit button
         quit_button = Button(button_frame,
                              text="Quit",
-                             command=self.__main_window.destroy)
+                             command=app.quit)
         quit_button.grid(row=0, column=1, padx=(5, 0))
 
-        self.__main_window.mainloop()
+        if STARTUP_PROFILE is not None:
+            STARTUP_PROFILE.mark("settings window built")
+            self.__main_window.after_idle(self.report_startup)
+
+    def report_startup(self):
+        """
+        Reports the startup profile once the settings window is idle, i.e.
+        ready for the user
+        """
+
+        global STARTUP_PROFILE
+        STARTUP_PROFILE.mark("first idle event")
+        STARTUP_PROFILE.report()
+        STARTUP_PROFILE = None
 
     def start_game(self):
         """
         Starts the Battleships game based off the settings set in the gui
         """
 
+        settings = self.read_settings()
+        if settings is None:
+            return
+        p1_name, p2_name, width, height, fleet, board_class = settings
+
+        computer_opponent = self.__computer_opponent.get() == 1
+        stronger_computer = self.__stronger_computer.get() == 1
+        if computer_opponent and not stronger_computer \
+                and not numpy_available():
+            messagebox.showerror("Error", "Playing against the computer "
+                                          "needs NumPy!")
+            return
+
+        # the widgets of this screen are gone once the ship placements
+        # screen replaces it, keep what the following screens need
+        self.__session = GameSession(RecorderGroup(REPLAY_WRITER,
+                                                   score_store()),
+                                     LOG_HISTORY)
+        self.__board_class = board_class
+        self.__sink = self.__sink_from_one.get() == 1
+        self.__player2 = Player(p2_name, width, height, fleet)
+        if computer_opponent:
+            self.__computer = "montecarlo" if stronger_computer \
+                else "density"
+
+        # player 1 places their ships first, cancelling returns to the
+        # main menu
+        ArrangeShipsWindow(self.__app, Player(p1_name, width, height, fleet),
+                           self.__session, board_class,
+                           self.first_player_placed)
+
+    def first_player_placed(self):
+        """
+        Continues the game once player 1 has placed their ships
+        """
+
+        # the computer places its ships at random, in the background as
+        # that can take a while on a large playing field
+        if self.__computer is not None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            frame = self.__app.show_screen(
+                "Battleships", closed=self.computer_placement_closed)
+            Label(frame, text="The computer is placing its battleships..."
+                  ).pack(padx=20, pady=20)
+
+            executor = ThreadPoolExecutor(1)
+            self.__computer_placement = executor.submit(
+                self.__player2.place_fleet_randomly)
+            executor.shutdown(wait=False)
+            self.poll_computer_placement(self.__computer_placement)
+            return
+
+        ArrangeShipsWindow(self.__app, self.__player2, self.__session,
+                           self.__board_class, self.open_game_windows)
+
+    def poll_computer_placement(self, placement):
+        """
+        Starts the game once the computer has placed its ships,
+        otherwise checks again later
+        :param placement:   Future, the computer's ship placement
+        """
+
+        # the user left the screen
+        if placement is not self.__computer_placement:
+            return
+
+        if not placement.done():
+            self.__app.get_root().after(COMPUTER_POLL_INTERVAL,
+                                        self.poll_computer_placement,
+                                        placement)
+            return
+
+        if placement.exception() is not None:
+            messagebox.showerror("Error", "Couldn't place the computer's "
+                                          "battleships, try a smaller "
+                                          "fleet!")
+            self.__app.show_settings()
+            return
+
+        self.__session.add_player(self.__player2)
+        self.open_game_windows(create_computer(self.__computer,
+                                               self.__player2))
+
+    def computer_placement_closed(self):
+        """
+        Stops waiting for the computer's ship placement,
+        runs when its screen is closed
+        """
+
+        self.__computer_placement = None
+
+    def open_game_windows(self, bot=None):
+        """
+        Starts the game once both players have placed their ships
+        :param bot: object, computer opponent of player 1, see ai.py,
+                            None if player 2 is human
+        """
+
+        player1, player2 = self.__session.get_players()
+
+        # initialize the game logic of the session
+        game = self.__session.start_game(self.__sink)
+
+        # player 1's game window replaces the ship placements screen
+        game_window1 = GameWindow(self.__app, player1, self.__session,
+                                  self.__board_class)
+        # assign a game window to player
+        player1.set_game_window(game_window1)
+
+        # player 2's game window opens next to it
+        game_window2 = GameWindow(self.__app, player2, self.__session,
+                                  self.__board_class, bot, own_window=True)
+        player2.set_game_window(game_window2)
+
+        # start the game, the starter's turn starts
+        starter = game.start_game()
+        starter.get_game_window().enable_buttons()
+
+    def read_settings(self):
+        """
+        Reads and checks the settings set in the gui, shows an error if they
+        aren't valid
+        :return:    tuple,  names of both players, playing field width and
+                            height, the Fleet and the board class,
+                            None if the settings aren't valid
+        """
+
         # empty names default to Player X
         p1_name = self.__player1_entry.get()
         if not p1_name:
@@ -472,49 +731,160 @@ class SettingsWindow:
             messagebox.showerror("Error", "Players can't have the same name!")
             return
 
-        self.__main_window.destroy()
+        # playing field size
+        try:
+            width = int(self.__width_entry.get())
+            height = int(self.__height_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Field size must be a number!")
+            return
 
-        # create ship placements window for player 1 and wait for it to exit
-        ArrangeShipsWindow(Player(p1_name))
+        if not FIELD_SIZE_LIMITS[0] <= width <= FIELD_SIZE_LIMITS[1] \
+                or not FIELD_SIZE_LIMITS[0] <= height <= FIELD_SIZE_LIMITS[1]:
+            messagebox.showerror("Error", "Field size must be between "
+                                          f"{FIELD_SIZE_LIMITS[0]} and "
+                                          f"{FIELD_SIZE_LIMITS[1]}!")
+            return
 
-        # if window was terminanted without finishing ship placements
-        # return to the settings window as opposed to continuing to
-        # player 2's ship placements
-        if not PLAYERS:
-            # if exit application was chosen by the user
-            if not EXIT_APPLICATION:
-                SettingsWindow()
+        # fleet composition, check that it can be placed at all so nobody
+        # gets stuck halfway through placing their ships
+        try:
+            fleet = Fleet.parse(self.__fleet_entry.get())
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
             return
 
-        # create ship placements window for player 2 and wait for it to exit
-        ArrangeShipsWindow(Player(p2_name))
-        
-        # if player 2's window was closed without finishing ship placements
-        # clear the PLAYERS global and return to settings screen
-        if len(PLAYERS) == 1:
-            if EXIT_APPLICATION:
-                return 
-            PLAYERS.clear()
-            SettingsWindow()
-
-        player1 = PLAYERS[0]
-        player2 = PLAYERS[1]
-
-        global GAME_LOGIC
-        # initialize game logic and store the object to the GAME_LOGIC global
-        GAME_LOGIC = GameLogic(self.__sink_from_one.get(), player1, player2)
-
-        # create player 1's game window
-        game_window1 = GameWindow(player1)
-        # assign a game window to player
-        player1.set_game_window(game_window1)
+        sizes = [fleet.get_sizes()[ship_type]
+                 for ship_type in fleet.get_place_order()]
+        try:
+            fits = find_fleet_placement(width, height, sizes) is not None
+        except RuntimeError:
+            messagebox.showerror("Error", "Couldn't tell if the fleet fits "
+                                          "on the playing field, try a "
+                                          "smaller fleet!")
+            return
 
-        # Create player 1's game window
-        game_window2 = GameWindow(player2)
-        player2.set_game_window(game_window2)
+        if not fits:
+            messagebox.showerror("Error", "The fleet doesn't fit on the "
+                                          "playing field!")
+            return
+
+        if self.__canvas_boards.get() or width > MAX_WIDGET_BOARD_SIZE \
+                or height > MAX_WIDGET_BOARD_SIZE:
+            board_class = BOARD_BACKENDS["canvas"]
+        else:
+            board_class = BOARD_BACKENDS["widgets"]
+
+        return p1_name, p2_name, width, height, fleet, board_class
+
+    def load_game(self):
+        """
+        Resumes a game saved from a game window
+        """
+
+        from tkinter import filedialog
+        from snapshot import load_snapshot
+
+        path = filedialog.askopenfilename(parent=self.__main_window,
+                                          title="Load Game",
+                                          filetypes=SAVED_GAME_TYPES)
+        if not path:
+            return
+
+        try:
+            game, log, controllers = load_snapshot(path,
+                                                   recorder=score_store())
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", f"Couldn't load the game!\n{error}")
+            return
+
+        if "density" in controllers and not numpy_available():
+            messagebox.showerror("Error", "Playing against the computer "
+                                          "needs NumPy!")
+            return
+
+        player1, player2 = game.get_players()
+        if self.__canvas_boards.get() \
+                or player1.get_width() > MAX_WIDGET_BOARD_SIZE \
+                or player1.get_height() > MAX_WIDGET_BOARD_SIZE:
+            board_class = BOARD_BACKENDS["canvas"]
+        else:
+            board_class = BOARD_BACKENDS["widgets"]
+
+        session = GameSession(history=LOG_HISTORY)
+        session.set_game(game)
+        session.get_log().load(log)
+
+        # the game windows are built from the restored players, player 1's
+        # replaces this screen and player 2's opens next to it
+        for player, controller in zip((player1, player2), controllers):
+            game_window = GameWindow(self.__app, player, session,
+                                     board_class,
+                                     create_computer(controller, player),
+                                     own_window=player is player2)
+            player.set_game_window(game_window)
+
+        # report to the new windows, the player in turn continues
+        turn = game.current_player()
+        game.resume_game(turn, game.winner())
+        if game.game_ended():
+            for game_window in session.get_windows():
+                game_window.disable_buttons()
+        else:
+            game.append_log(f"Game resumed, it's {turn}'s turn.")
+            turn.get_game_window().enable_buttons()
+
+    def play_online(self):
+        """
+        Plays player 1 against the next player asking a game server for a
+        match with the same settings, see server.py
+        """
+
+        settings = self.read_settings()
+        if settings is None:
+            return
+        p1_name, _, width, height, fleet, board_class = settings
+
+        from tkinter import simpledialog
+        from client import RemoteGame, parse_address
+
+        address = simpledialog.askstring("Play Online", "Game server:",
+                                         initialvalue=DEFAULT_SERVER,
+                                         parent=self.__main_window)
+        if not address:
+            return
 
-        # start the game
-        GAME_LOGIC.start_game()
+        try:
+            remote = RemoteGame(*parse_address(address))
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", "Couldn't connect to the game "
+                                          f"server!\n{error}")
+            return
+
+        self.__session = GameSession(history=LOG_HISTORY)
+        self.__board_class = board_class
+        self.__sink = self.__sink_from_one.get() == 1
+
+        # the match is requested once the ships are placed, cancelling
+        # closes the connection
+        ArrangeShipsWindow(self.__app, Player(p1_name, width, height, fleet),
+                           self.__session, board_class,
+                           partial(self.request_match, remote),
+                           remote.close)
+
+    def request_match(self, remote):
+        """
+        Asks the game server for a match once player 1 has placed their
+        ships, and shows the game window of the match
+        :param remote:  RemoteGame, connection to the game server
+        """
+
+        player = self.__session.get_players()[0]
+        remote.request_match(player, self.__sink)
+
+        game_window = GameWindow(self.__app, player, self.__session,
+                                 self.__board_class, remote=remote)
+        player.set_game_window(game_window)
 
 
 class ArrangeShipsWindow:
@@ -522,44 +892,76 @@ class ArrangeShipsWindow:
     A class to model the gui where a player arranges their playing field
     """
 
-    def __init__(self, player):
+    def __init__(self, app, player, session, board_class=WidgetBoard,
+                 on_placed=None, on_cancel=None):
         """
         Constructor, creates the gui and controls for arranging ships on your
         playing field
-        :param player: Player, Player object for the player arranging ships
-        """
-
+        :param app:         Application,    the gui, whose screen this
+                                            replaces
+        :param player:      Player,         Player object for the player
+                                            arranging ships
+        :param session:     GameSession,    session the player is added to
+                                            once their ships are placed
+        :param board_class: class,          board renderer for the playing
+                                            field, one of BOARD_BACKENDS
+        :param on_placed:   function,       run once the player is added to
+                                            the session, shows the next
+                                            screen
+        :param on_cancel:   function,       run if the player exits without
+                                            placing their ships
+        """
+
+        self.__app = app
         self.__player = player
-
-        # matrix to contain all the buttons for selecting battleship placements
-        # initialize 10 empty rows
-        self.__field_buttons = [[] for _ in range(10)]
+        self.__session = session
+        self.__board_class = board_class
+        self.__on_placed = on_placed
+        self.__on_cancel = on_cancel
+        width = player.get_width()
+        height = player.get_height()
+
+        # ship types in placing order and their sizes
+        fleet = player.get_fleet()
+        self.__place_order = fleet.get_place_order()
+        self.__ship_sizes = fleet.get_sizes()
 
         # which battleship type is being placed and which part of it
-        self.__placing_ship = SHIP_PLACE_ORDER[0]
+        self.__placing_ship = self.__place_order[0]
         self.__choosing_orientation = False
         self.__ships_placed = 0
 
+        # set once this window has been replaced by a new one
+        self.__cleared = False
+
         # a tuple for the origin of ship that's being placed
         self.__current_ship_origin = (0, 0)
 
-        # 10x10 matrix for ship parts in the playing field
-        # initialize with false (no battleship part placed here)
-        self.__ship_parts = [[False for _ in range(10)] for _ in range(10)]
-
-        self.__main_window = Tk()
-
-        # 500x615 non-resizeable window
-        self.__main_window.geometry("500x615")
-        self.__main_window.resizable(False, False)
-
-        # set title and icon
-        self.__main_window.title(f"{self.__player} Arrange Field")
-        if not ICON_MISSING:
-            self.__main_window.iconbitmap("icon.ico")
+        # legal placements of each ship size, updated as ships are placed
+        self.__placement_table = PlacementTable(width, height,
+                                                self.__ship_sizes.values())
+
+        # what the buttons show, so an update only looks at the buttons
+        # that may change: the legal origins of the ship size they were
+        # last updated for, the buttons shown enabled, whether they show
+        # the orientation choice and the ships placed since the update
+        self.__legal_fields = set()
+        self.__legal_size = None
+        self.__enabled_fields = {(x, y) for y in range(height)
+                                 for x in range(width)}
+        self.__showing_orientations = False
+        self.__placed_since_update = []
+
+        # 500x615 window for the default 10x10 buttons, other playing
+        # fields size the window themselves, closing it returns to the
+        # main menu
+        geometry = "500x615" if default_layout(width, height, board_class) \
+            else ""
+        self.__main_window = app.show_screen(f"{self.__player} Arrange Field",
+                                             geometry, self.cancel)
 
         # create a menu
-        menu = Menu(self.__main_window)
+        menu = Menu(app.get_root())
         options_menu = Menu(menu, tearoff=0)
         options_menu.add_command(label="Exit To Main Menu",
                                  command=self.exit_main_menu)
@@ -574,12 +976,14 @@ class ArrangeShipsWindow:
         helpmenu.add_command(label="About...", command=about)
         menu.add_cascade(label="Help", menu=helpmenu)
 
-        self.__main_window.config(menu=menu)
+        app.set_menu(app.get_root(), menu)
 
+        placing_size = self.__ship_sizes[self.__placing_ship]
         self.__now_placing_label = Label(self.__main_window,
                                          text=f"{self.__player}, place "
                                               "your battleships!\nNow placing:"
-                                              " Carrier (size 5)",
+                                              f" {self.__placing_ship} (size "
+                                              f"{placing_size})",
                                          justify=LEFT,
                                          font=("Arial", 15))
         self.__now_placing_label.pack(padx=(20, 0), pady=(10, 0), anchor="w")
@@ -592,23 +996,15 @@ class ArrangeShipsWindow:
                            font=("Arial", 10))
         info_label.pack(padx=(20, 0), pady=(10, 20), anchor="w")
 
-        # 10x10 matrix of buttons
+        # board of buttons
         # one button for each playing field spot
-        # associate each button with a function and
-        # predetermined arguments (x, y)
+        # a click on a button places a ship part at its x and y coordinates
         button_frame = Frame(self.__main_window)
         button_frame.pack(padx=10)
-        for y in range(10):
-            for x in range(10):
-                # store each button for future configuration
-                self.__field_buttons[y].append(
-                    Button(button_frame,
-                           text=field_name(x, y),
-                           command=partial(self.field_button, x, y),
-                           bg=PLAYING_FIELD_COLORS["water"],
-                           width=4))
-                self.__field_buttons[y][x].grid(row=y, column=x, padx=2,
-                                                pady=2)
+        self.__board = board_class(button_frame, width, height,
+                                   PLAYING_FIELD_COLORS["water"],
+                                   self.field_button)
+        self.__board.grid(row=0, column=0)
 
         # frame to contain color code labels
         color_codes_frame = Frame(self.__main_window)
@@ -639,12 +1035,10 @@ class ArrangeShipsWindow:
         bottom_frame = Frame(self.__main_window)
         bottom_frame.pack(padx=(20, 0), pady=(10, 20))
         ship_list_label = Label(bottom_frame,
-                                text="Ship List:\n"
-                                     "1x Carrier (size 5)\n"
-                                     "1x Battleship (size 4)\n"
-                                     "2x Cruiser (size 3)\n"
-                                     "2x Destroyer (size 2)\n"
-                                     "2x Submarine (size 1)",
+                                text="Ship List:\n" + "\n".join(
+                                    f"{count}x {ship_type} (size {size})"
+                                    for ship_type, size, count
+                                    in fleet.get_ships()),
                                 justify=LEFT,
                                 font=("Arial", 10))
         ship_list_label.grid(row=0, column=0, sticky=W)
@@ -662,17 +1056,23 @@ class ArrangeShipsWindow:
                                   font=("Arial", 10))
         instruction_label.grid(row=0)
 
-        clear_placements_button = Button(bottom_right_frame,
+        # frame to contain the placement buttons
+        placement_buttons_frame = Frame(bottom_right_frame)
+        placement_buttons_frame.grid(row=1, pady=(10, 0))
+
+        clear_placements_button = Button(placement_buttons_frame,
                                          text="Clear Ship Placements",
                                          command=self.clear_everything)
-        clear_placements_button.grid(row=1, pady=(10, 0))
+        clear_placements_button.grid(row=0, column=0, padx=(0, 5))
+
+        auto_place_button = Button(placement_buttons_frame,
+                                   text="Auto-place",
+                                   command=self.auto_place)
+        auto_place_button.grid(row=0, column=1)
 
         # color all buttons appropriately
         self.update_button_states()
 
-        # start mainloop
-        self.__main_window.mainloop()
-
     def field_button(self, coord_x, coord_y):
         """
         A ship consists of 1-5 parts, this command gets ran when a part
@@ -682,19 +1082,16 @@ class ArrangeShipsWindow:
         """
 
         # turn the corresponding button to ship color
-        self.__field_buttons[coord_y][coord_x]\
-            .config(bg=PLAYING_FIELD_COLORS["ship"], state=DISABLED)
+        self.__board.set_field(coord_x, coord_y, PLAYING_FIELD_COLORS["ship"],
+                               False)
 
         # check orientations
         self.ship_orientation_check(coord_x, coord_y)
 
-        # if we just placed the last ship, we're done
-        if self.__ships_placed == len(SHIP_PLACE_ORDER):
+        # if we just placed the last ship or started over, we're done
+        if self.__ships_placed == len(self.__place_order) or self.__cleared:
             return
 
-        # Set a ship part as existing
-        self.__ship_parts[coord_y][coord_x] = True
-
         self.update_button_states()
 
     def ship_orientation_check(self, coord_x, coord_y):
@@ -707,7 +1104,7 @@ class ArrangeShipsWindow:
         :param coord_y: int, playing field y-coordinate
         """
 
-        ship_size = BATTLESHIP_SIZES[self.__placing_ship]
+        ship_size = self.__ship_sizes[self.__placing_ship]
 
         # if placing the first part of a ship
         if not self.__choosing_orientation:
@@ -715,8 +1112,9 @@ class ArrangeShipsWindow:
             self.__current_ship_origin = (coord_x, coord_y)
 
             # get possible placement orientations at coords
-            placement = self.check_placement(coord_x, coord_y, ship_size)
-            orientations = placement["valid_orientations"]
+            orientations = self.__placement_table.orientations(coord_x,
+                                                               coord_y,
+                                                               ship_size)
 
             # if both orientations are available we're done
             # processing in this function
@@ -724,60 +1122,47 @@ class ArrangeShipsWindow:
                 self.__choosing_orientation = True
                 return
 
-            # if only horizontal orientation is available,
+            # if only one orientation is available,
             # place the ship right away
-            elif orientations & 0b10:
-                for i in range(ship_size):
-                    # mark each ship part and config buttons
-                    self.__ship_parts[coord_y][coord_x + i] = True
-                    self.__field_buttons[coord_y][coord_x + i].config(
-                        bg=PLAYING_FIELD_COLORS["ship"],
-                        state=DISABLED)
-
-            # same for vertical
-            else:
-                for i in range(ship_size):
-                    self.__ship_parts[coord_y + i][coord_x] = True
-                    self.__field_buttons[coord_y + i][coord_x].config(
-                        bg=PLAYING_FIELD_COLORS["ship"],
-                        state=DISABLED)
-
-            self.__choosing_orientation = False
-
-            # finished placing, add the ship to the player
-            self.__player.add_battleship(self.__placing_ship,
-                                         orientations & 0b01 == 1,
-                                         self.__current_ship_origin)
-            # start placing the next ship
-            self.place_next_ship()
+            self.place_ship(orientations & 0b01 == 1)
 
         # choosing orientation
         else:
             # if origin y is smaller than current y
             # vertical orientation was chosen
-            is_vertical = self.__current_ship_origin[1] < coord_y
-            if is_vertical:
-                for i in range(ship_size - 1):
-                    # add all ship parts
-                    self.__ship_parts[coord_y + i][coord_x] = True
-                    # color all buttons corresponding to added ship parts
-                    self.__field_buttons[coord_y + i][coord_x].config(
-                        bg=PLAYING_FIELD_COLORS["ship"],
-                        state=DISABLED)
-
-            # horizontal orientation chosen
+            self.place_ship(self.__current_ship_origin[1] < coord_y)
+
+    def place_ship(self, vertical):
+        """
+        Places the ship being placed at the current ship origin
+        :param vertical:    bool,   True  = placed vertically
+                                    False = placed horizontally
+        """
+
+        ship_size = self.__ship_sizes[self.__placing_ship]
+        origin_x = self.__current_ship_origin[0]
+        origin_y = self.__current_ship_origin[1]
+
+        self.__placement_table.place(origin_x, origin_y, ship_size, vertical)
+        self.__placed_since_update.append((origin_x, origin_y, ship_size,
+                                           vertical))
+
+        # color all buttons corresponding to the ship's parts
+        for i in range(ship_size):
+            if vertical:
+                self.__board.set_field(origin_x, origin_y + i,
+                                       PLAYING_FIELD_COLORS["ship"], False)
             else:
-                for i in range(ship_size - 1):
-                    self.__ship_parts[coord_y][coord_x + i] = True
-                    self.__field_buttons[coord_y][coord_x + i].config(
-                        bg=PLAYING_FIELD_COLORS["ship"],
-                        state=DISABLED)
+                self.__board.set_field(origin_x + i, origin_y,
+                                       PLAYING_FIELD_COLORS["ship"], False)
 
-            self.__choosing_orientation = False
-            self.__player.add_battleship(self.__placing_ship,
-                                         is_vertical,
-                                         self.__current_ship_origin)
-            self.place_next_ship()
+        self.__choosing_orientation = False
+
+        # finished placing, add the ship to the player
+        self.__player.add_battleship(self.__placing_ship, vertical,
+                                     self.__current_ship_origin)
+        # start placing the next ship
+        self.place_next_ship()
 
     def place_next_ship(self):
         """
@@ -787,79 +1172,176 @@ class ArrangeShipsWindow:
         self.__ships_placed += 1
 
         # if all ships have been placed
-        if self.__ships_placed == len(SHIP_PLACE_ORDER):
+        if self.__ships_placed == len(self.__place_order):
             if messagebox.askyesno("Proceed?", "All battleships placed.\n"
                                                "Do you wish to proceed?\n\n"
                                                "Choosing no clears all your "
                                                "ship placements"):
-                self.__main_window.destroy()
-
                 # add player is now all set
-                # add them to the global
-                PLAYERS.append(self.__player)
+                # add them to the session
+                self.__session.add_player(self.__player)
+                if self.__on_placed is not None:
+                    self.__on_placed()
                 return
             else:
                 # player chose to not accept his ship placements
                 # start all over again
                 self.clear_everything()
                 return
-        self.__placing_ship = SHIP_PLACE_ORDER[self.__ships_placed]
+        self.__placing_ship = self.__place_order[self.__ships_placed]
         self.__choosing_orientation = False
 
         self.__now_placing_label.config(text=f"{self.__player}, place your "
                                              "battleships!\nNow placing: "
                                              f"{self.__placing_ship} (size "
-                                             f"{BATTLESHIP_SIZES[self.__placing_ship]})")
+                                             f"{self.__ship_sizes[self.__placing_ship]})")
+
+        # the ships placed so far may leave no room for this one,
+        # start over instead of getting stuck
+        if not self.__placement_table.placement_count(
+                self.__ship_sizes[self.__placing_ship]):
+            messagebox.showinfo("No room left", "There's no room left for "
+                                                f"the {self.__placing_ship}."
+                                                "\nShip placements are "
+                                                "cleared.")
+            self.clear_everything()
 
     def update_button_states(self):
         """
         Enables and disables buttons based on where the user is allowed
-        to place a part of a ship or choose a rotation.
-        """
+        to place a part of a ship or choose a rotation. Only the buttons
+        around the ships placed since the last update and the ones the
+        orientation choice toggles are looked at, every button only for
+        a new ship size.
+        """
+
+        table = self.__placement_table
+        width = self.__player.get_width()
+        height = self.__player.get_height()
+        size = self.__ship_sizes[self.__placing_ship]
+        origin = self.__current_ship_origin
+        orientation_buttons = ((origin[0] + 1, origin[1]),
+                               (origin[0], origin[1] + 1))
+        legal = self.__legal_fields
+        enabled = self.__enabled_fields
+
+        # a new ship size may have legal origins anywhere, a placed ship
+        # only removes the origins of ships that would touch it
+        if size != self.__legal_size:
+            self.__legal_size = size
+            changed = {(x, y) for y in range(height) for x in range(width)}
+        else:
+            changed = set()
+            for ship_x, ship_y, ship_size, vertical in \
+                    self.__placed_since_update:
+                end_x = ship_x + (0 if vertical else ship_size - 1)
+                end_y = ship_y + (ship_size - 1 if vertical else 0)
+                changed.update((x, y)
+                               for y in range(max(0, ship_y - size),
+                                              min(height, end_y + 2))
+                               for x in range(max(0, ship_x - size),
+                                              min(width, end_x + 2)))
+        self.__placed_since_update = []
+
+        for field in changed:
+            if table.orientations(field[0], field[1], size):
+                legal.add(field)
+            else:
+                legal.discard(field)
+
+        # if not starting to place new ship, we're choosing orientation,
+        # allow only orientation choosing buttons
+        if self.__choosing_orientation:
+            if not self.__showing_orientations:
+                self.__showing_orientations = True
+                for field in list(enabled):
+                    # the origin has already been colored
+                    if field != origin and field not in orientation_buttons:
+                        self.__board.set_field(field[0], field[1],
+                                               PLAYING_FIELD_COLORS["hit"],
+                                               False)
+                    enabled.discard(field)
+            for field in orientation_buttons:
+                # past the edge for an origin on the last column or row
+                if field[0] < width and field[1] < height \
+                        and field not in enabled:
+                    enabled.add(field)
+                    self.__board.set_field(field[0], field[1],
+                                           PLAYING_FIELD_COLORS["water"],
+                                           True)
+            return
 
-        # always reset every non-ship-part button
-        for x in range(10):
-            for y in range(10):
-                if not self.__ship_parts[y][x]:
-                    self.__field_buttons[y][x].config(state=NORMAL,
-                                                      bg=PLAYING_FIELD_COLORS[
-                                                          "water"])
+        # if we're starting to place a new ship, allow all valid
+        # placements, after choosing an orientation all of them again
+        if self.__showing_orientations:
+            self.__showing_orientations = False
+            changed = legal | enabled | {origin}
+
+        for field in changed:
+            # ship part buttons have already been colored
+            if table.is_ship_part(field[0], field[1]):
+                enabled.discard(field)
+                continue
+
+            allowed = field in legal
+            if allowed == (field in enabled):
+                continue
+
+            if allowed:
+                enabled.add(field)
+                self.__board.set_field(field[0], field[1],
+                                       PLAYING_FIELD_COLORS["water"], True)
+            else:
+                # color and disable all invalid placements buttons
+                enabled.discard(field)
+                self.__board.set_field(field[0], field[1],
+                                       PLAYING_FIELD_COLORS["hit"], False)
 
-        # if we're starting to place a new ship
-        if not self.__choosing_orientation:
-            size = BATTLESHIP_SIZES[self.__placing_ship]
-
-            for x in range(10):
-                for y in range(10):
-                    # color and disable all invalid placements buttons
-                    if not self.__ship_parts[y][x] \
-                            and not self.check_placement(x, y, size)[
-                            "valid_placement"]:
-                        self.__field_buttons[y][x]\
-                            .config(state=DISABLED,
-                                    bg=PLAYING_FIELD_COLORS["hit"])
-
-        # if not starting to place new ship, we're choosing orientation
+    def auto_place(self):
+        """
+        Places the ships not placed yet at random legal placements
+        """
+
+        # give up on the orientation being chosen,
+        # its origin gets recolored below
+        if self.__choosing_orientation:
+            self.__choosing_orientation = False
+            self.update_button_states()
+
+        # find placements for all the remaining ships on a copy of the
+        # table first, so a dead end doesn't leave only some of them placed
+        remaining = sorted(self.__place_order[self.__ships_placed:],
+                           key=self.__ship_sizes.get, reverse=True)
+        for _ in range(AUTO_PLACE_ATTEMPTS):
+            table = self.__placement_table.copy()
+            placements = {}
+            for ship_type in remaining:
+                size = self.__ship_sizes[ship_type]
+                legal = table.random_placement(size)
+                if legal is None:
+                    break
+
+                table.place(legal[0], legal[1], size, legal[2])
+                placements.setdefault(size, []).append(legal)
+            else:
+                break
         else:
-            origin_x = self.__current_ship_origin[0]
-            origin_y = self.__current_ship_origin[1]
-            for x in range(10):
-                for y in range(10):
-                    # color and disable all buttons, but orientation
-                    # choosing buttons and ship part buttons
-                    if not self.__ship_parts[y][x] \
-                            and (x, y) != (origin_x + 1, origin_y) \
-                            and (x, y) != (origin_x, origin_y + 1):
-                        self.__field_buttons[y][x]\
-                            .config(state=DISABLED,
-                                    bg=PLAYING_FIELD_COLORS["hit"])
+            messagebox.showinfo("No room left", "The remaining ships don't "
+                                                "fit around the ships "
+                                                "placed so far.")
+            return
+
+        # place the ships in their usual order
+        for ship_type in self.__place_order[self.__ships_placed:]:
+            x, y, vertical = placements[self.__ship_sizes[ship_type]].pop()
+            self.__current_ship_origin = (x, y)
+            self.place_ship(vertical)
 
     def check_placement(self, x, y, size):
         """
         Checks if the placement for the specified ship size at the specified
         coordinates is possible both horizontally and vertically.
         Ships can't overlap or touch
-        TODO: come up with better/clearer logic for this
         :param x:       int,    x-coordinate
         :param y:       int,    y-coordinate
         :param size:    int,    size of battleship to be placed
@@ -874,62 +1356,37 @@ class ArrangeShipsWindow:
                                                             vertical placement
         """
 
-        parts = self.__ship_parts
-        placement = {
-            "valid_placement": False,
-            "valid_orientations": 0
-        }
+        orientations = self.__placement_table.orientations(x, y, size)
 
-        # first check if a vertical placement is possible
-
-        # last element to check on the middle check
-        # +1 if the ship's last part isnt on the on the last row
-        middle_end = y + size - 1 + (1 if y + size < 10 else 0)
-        # on the middle check, check an extra element above if there is one
-        one = 1 if y > 0 else 0
-
-        # if statement short circuted to the max
-        # first check if ship can fit vertically
-        # then check the column left of x (if needed)
-        # then check the column x is on
-        # then check the column right of x (if needed)
-        # we're looking for occurences of already placed ship parts
-        # if one is found, the placement is invalid
-        if y + size <= 10 \
-                and (
-                x == 0 or not any(get_column(parts, x - 1, y, y + size - 1))) \
-                and not any(get_column(parts, x, y - one, middle_end)) \
-                and (
-                x == 9 or not any(get_column(parts, x + 1, y, y + size - 1))):
-            placement["valid_placement"] = True
-            placement["valid_orientations"] = 0b01  # low bit
-
-        # if ship is of size one, we're good to return already
-        if size == 1:
-            return placement
-
-        # check if horizontal placement is possible
-        # same logic as in the vertical check, just done horizonally
-        middle_end = x + size + (1 if x + size < 9 else 0)
-        one = 1 if x > 0 else 0
-
-        if x + size <= 10 \
-                and (y == 0 or not any(parts[y - 1][x:x + size])) \
-                and not any(parts[y][x - one:middle_end]) \
-                and (y == 9 or not any(parts[y + 1][x:x + size])):
-            placement["valid_placement"] = True
-            placement["valid_orientations"] |= 0b10  # high bit
-
-        return placement
+        return {
+            "valid_placement": orientations != 0,
+            "valid_orientations": orientations
+        }
 
     def clear_everything(self):
         """
         Clears everything related to the current player's ship placements by
-        just destroying the gui and starting from the beginning with a new gui
+        just replacing the screen with a new one starting from the beginning
+        """
+
+        self.__cleared = True
+
+        player = self.__player
+        ArrangeShipsWindow(self.__app,
+                           Player(str(player), player.get_width(),
+                                  player.get_height(), player.get_fleet()),
+                           self.__session, self.__board_class,
+                           self.__on_placed, self.__on_cancel)
+
+    def cancel(self):
+        """
+        Returns to the main menu without placing the ships,
+        runs when the user closes the window
         """
 
-        self.__main_window.destroy()
-        ArrangeShipsWindow(Player(str(self.__player)))
+        if self.__on_cancel is not None:
+            self.__on_cancel()
+        self.__app.show_settings()
 
     def exit_main_menu(self):
         """
@@ -937,8 +1394,7 @@ class ArrangeShipsWindow:
         """
         if messagebox.askyesno("Are you sure?", "Are you sure you want "
                                                 "to exit to the main menu?"):
-            PLAYERS.clear()
-            self.__main_window.destroy()
+            self.cancel()
 
     def exit_application(self):
         """
@@ -946,9 +1402,9 @@ class ArrangeShipsWindow:
         """
         if messagebox.askyesno("Are you sure?", "Are you sure you want "
                                                 "to exit the application?"):
-            self.__main_window.destroy()
-            global EXIT_APPLICATION
-            EXIT_APPLICATION = True
+            if self.__on_cancel is not None:
+                self.__on_cancel()
+            self.__app.quit()
 
 
 class GameWindow:
@@ -957,29 +1413,71 @@ class GameWindow:
     One object for each player
     """
 
-    def __init__(self, player):
+    def __init__(self, app, player, session, board_class=WidgetBoard,
+                 bot=None, remote=None, own_window=False):
         """
         Constructor, creates the game screen gui and its controls.
-        :param player:   Player,    player object for this player
-        """
-
+        :param app:         Application,    the gui
+        :param player:      Player,         player object for this player
+        :param session:     GameSession,    session of the game
+        :param board_class: class,          board renderer for the playing
+                                            fields, one of BOARD_BACKENDS
+        :param bot:         object,         computer opponent firing the shots
+                                            of this player, see ai.py, None if
+                                            the player is human
+        :param remote:      RemoteGame,     match on a game server the player
+                                            plays instead of the game logic
+                                            of the session, see client.py
+        :param own_window:  bool,           True  = open in a window next to
+                                                    the current screen, e.g.
+                                                    for the second player
+                                            False = replace the screen
+        """
+
+        self.__app = app
+        self.__own_window = own_window
         self.__player = player
-        self.__opponent = GAME_LOGIC.get_opponent(player)
+        self.__session = session
+        self.__game = session.get_game()
+        self.__log = session.get_log()
+        self.__bot = bot
+        # future of the shot the computer is choosing
+        self.__computer_shot = None
+        self.__remote = remote
+        # whether the board is unlocked for the player's turn online
+        self.__remote_turn = False
+        width = player.get_width()
+        height = player.get_height()
+        if remote is None:
+            self.__opponent = self.__game.get_opponent(player)
+        else:
+            # the opponent's fleet is only known to the server
+            self.__opponent = Player("Opponent", width, height,
+                                     player.get_fleet())
         self.__destroyed = False
-        self.__main_window = Tk()
-
-        # 830x600 non-resizeable window
-        self.__main_window.geometry("830x600")
-        self.__main_window.resizable(False, False)
 
-        # set title and icon
-        self.__main_window.title(f"Battleships | {player}")
-        if not ICON_MISSING:
-            self.__main_window.iconbitmap("icon.ico")
+        # 830x600 window for the default 10x10 fields, other playing fields
+        # size the window themselves, closing it forfeits the game
+        geometry = "830x600" if default_layout(width, height, board_class) \
+            else ""
+        if own_window:
+            self.__window = app.open_window(f"Battleships | {player}",
+                                            geometry, self.forfeit_game,
+                                            self.destroy)
+            self.__main_window = self.__window
+        else:
+            self.__window = app.get_root()
+            self.__main_window = app.show_screen(f"Battleships | {player}",
+                                                 geometry, self.forfeit_game,
+                                                 self.destroy)
 
         # create a menu
-        menu = Menu(self.__main_window)
+        menu = Menu(self.__window)
         options_menu = Menu(menu, tearoff=0)
+        # the state of an online match is kept on the server
+        if remote is None:
+            options_menu.add_command(label="Save Game...",
+                                     command=self.save_game)
         options_menu.add_command(label="Forfeit Game",
                                  command=self.forfeit_game)
         options_menu.add_command(label="Exit To Main Menu",
@@ -995,13 +1493,7 @@ class GameWindow:
         helpmenu.add_command(label="About...", command=about)
         menu.add_cascade(label="Help", menu=helpmenu)
 
-        self.__main_window.config(menu=menu)
-
-        # matrix to contain all the buttons and labels for opponent playing
-        # field and own playing field
-        # initialize 10 empty rows
-        self.__field_buttons = [[] for _ in range(10)]
-        self.__field_labels = [[] for _ in range(10)]
+        app.set_menu(self.__window, menu)
 
         player_name_label = Label(self.__main_window,
                                   text="Player: "
@@ -1024,34 +1516,53 @@ class GameWindow:
         my_field_label.grid(row=1, column=1, sticky=W, padx=(5, 0),
                             pady=(10, 0))
 
-        # 10x10 matrix of buttons corresponding to the opponent's playing field
-        # associate each button with a function and
-        # predetermined arguments (x, y)
+        # board of buttons corresponding to the opponent's playing field
+        # a click on a button fires a shot at its x and y coordinates
         opponent_field_frame = Frame(self.__main_window)
         opponent_field_frame.grid(row=2, column=0, padx=(10, 0))
-        for y in range(10):
-            for x in range(10):
-                # store each button for future configuration
-                self.__field_buttons[y].append(
-                    Button(opponent_field_frame,
-                           text=field_name(x, y),
-                           command=partial(self.field_button, x, y),
-                           bg=PLAYING_FIELD_COLORS["water"],
-                           width=4))
-                self.__field_buttons[y][x].grid(row=y, column=x, padx=2,
-                                                pady=2)
-
-        # 10x10 matrix of labels corresponding to own playing field
+        self.__opponent_board = board_class(opponent_field_frame,
+                                            width, height,
+                                            PLAYING_FIELD_COLORS["water"],
+                                            self.field_button)
+        self.__opponent_board.grid(row=0, column=0)
+
+        # nobody else fires the computer's shots, online the board is
+        # unlocked once the server tells it's the player's turn
+        if bot is not None or remote is not None:
+            self.__opponent_board.lock()
+
+        # board of labels corresponding to own playing field
         my_field_frame = Frame(self.__main_window)
         my_field_frame.grid(row=2, column=1, padx=(0, 10), sticky=N + E)
-        for y in range(10):
-            for x in range(10):
-                # store each label for future configuration
-                self.__field_labels[y].append(
-                    Label(my_field_frame,
-                          text=field_name(x, y), width=4,
-                          bg=self.get_field_color(x, y)))
-                self.__field_labels[y][x].grid(row=y, column=x, padx=2, pady=2)
+        self.__own_board = board_class(my_field_frame, width, height,
+                                       PLAYING_FIELD_COLORS["water"])
+        self.__own_board.grid(row=0, column=0)
+
+        # color in the ship parts, and the shots of a resumed game
+        for y, row in enumerate(player.ship_rows()):
+            row |= player.hit_rows()[y] | player.miss_rows()[y]
+            x = 0
+            while row:
+                if row & 1:
+                    self.__own_board.set_color(x, y,
+                                               self.get_field_color(x, y))
+                row >>= 1
+                x += 1
+
+        # fields of the opponent already fired at can't be fired at again
+        for y, (hit_row, miss_row) in enumerate(
+                zip(self.__opponent.hit_rows(), self.__opponent.miss_rows())):
+            row = hit_row | miss_row
+            x = 0
+            while row:
+                if hit_row >> x & 1:
+                    self.__opponent_board.set_field(
+                        x, y, PLAYING_FIELD_COLORS["hit"], False)
+                elif miss_row >> x & 1:
+                    self.__opponent_board.set_field(
+                        x, y, PLAYING_FIELD_COLORS["miss"], False)
+                row >>= 1
+                x += 1
 
         # checkbox to toggle the visibility of own game field
         self.__hidden_field = IntVar(my_field_frame, 1)
@@ -1059,7 +1570,7 @@ class GameWindow:
                                         text="Hide Own Playing field",
                                         variable=self.__hidden_field,
                                         command=self.toggle_hide_field)
-        toggle_hide_field.grid(row=10, column=0, columnspan=10)
+        toggle_hide_field.grid(row=1, column=0)
         # start off as selected (hidden field)
         toggle_hide_field.select()
         # hide the playing field by running the method
@@ -1098,20 +1609,30 @@ class GameWindow:
         ship_color_code.grid(row=0, column=3, padx=10)
 
         # scrolled text widget to contain the game log
+        from tkinter import scrolledtext
         self.__log_field = scrolledtext.ScrolledText(self.__main_window,
                                                      font=("Arial", 8),
                                                      width=60, height=10)
         self.__log_field.grid(row=4, column=0, padx=(10, 0), pady=(5, 20),
                               sticky=N + W)
 
+        # the log field follows the game log: how many of its messages have
+        # been shown, the line count of each message in the field and the
+        # pending update of the field
+        self.__log_shown = 0
+        self.__log_lines = collections.deque()
+        self.__log_update = None
+        self.update_log()
+
         self.__stats_label = Label(self.__main_window,
                                    justify=LEFT,
                                    font=("Arial", 10))
         self.__stats_label.grid(row=4, column=1, padx=(0, 10), pady=(10, 0),
                                 sticky=N + W + E)
 
-        # event handler for the user closing the window with
-        self.__main_window.protocol("WM_DELETE_WINDOW", self.forfeit_game)
+        if remote is not None:
+            self.append_log("Connected to the game server.")
+            self.poll_network()
 
     def field_button(self, x, y):
         """
@@ -1122,15 +1643,23 @@ class GameWindow:
         :param y: int, playing field y coordinate
         """
 
-        # ingore press if game has already ended
-        if GAME_LOGIC.game_ended():
+        # online the server fires the shot and reports it back
+        if self.__remote is not None:
+            if self.__remote.my_turn():
+                self.disable_buttons()
+                self.__remote.fire(x, y)
+            return
+
+        # ingore press if game has already ended or it's not our turn
+        if self.__game.game_ended() \
+                or self.__game.current_player() is not self.__player:
             return
 
         # disable buttons since player's turn ends
         self.disable_buttons()
 
         # fire a shot and return whether it was a hit or not
-        hit = GAME_LOGIC.fire_shot(x, y, self.__player)
+        hit = self.__game.fire_shot(x, y, self.__player)
 
         if hit:
             color = PLAYING_FIELD_COLORS["hit"]
@@ -1140,10 +1669,10 @@ class GameWindow:
         opponent_game_window = self.__opponent.get_game_window()
 
         # if hit and ships sink from one hit
-        if hit and GAME_LOGIC.sink_from_one():
+        if hit and self.__game.sink_from_one():
 
             # get the hit ship
-            hit_ship = GAME_LOGIC.get_ship(x, y, self.__opponent)
+            hit_ship = self.__game.get_ship(x, y, self.__opponent)
 
             # for each ship's part's coordinate
             for coord in hit_ship.get_coords():
@@ -1151,17 +1680,14 @@ class GameWindow:
                 coord_y = coord[1]
 
                 # mark each button/label with the correct color
-                self.__field_buttons[coord_y][coord_x].config(state=DISABLED,
-                                                              bg=color)
-                if not opponent_game_window.hidden_field():
-                    opponent_game_window.set_label_color(coord_x, coord_y,
-                                                         color)
+                self.__opponent_board.set_field(coord_x, coord_y, color,
+                                                False)
+                opponent_game_window.set_label_color(coord_x, coord_y, color)
         else:
-            self.__field_buttons[y][x].config(state=DISABLED, bg=color)
-            if not opponent_game_window.hidden_field():
-                opponent_game_window.set_label_color(x, y, color)
+            self.__opponent_board.set_field(x, y, color, False)
+            opponent_game_window.set_label_color(x, y, color)
 
-        if not GAME_LOGIC.game_ended():
+        if not self.__game.game_ended():
             # enable opponent's buttons since their turn starts
             self.__opponent.get_game_window().enable_buttons()
 
@@ -1171,19 +1697,13 @@ class GameWindow:
         Runs when checked state of the associated checkbox is changed
         """
 
-        # Set each field to water color
+        # cover the field with water color
         if self.__hidden_field.get() == 1:
-            for x in range(10):
-                for y in range(10):
-                    self.__field_labels[y][x].config(
-                        bg=PLAYING_FIELD_COLORS["water"])
+            self.__own_board.hide(PLAYING_FIELD_COLORS["water"])
 
-        # set each field back to correct color
+        # the fields underneath are kept up to date, just uncover them
         else:
-            for x in range(10):
-                for y in range(10):
-                    color = self.get_field_color(x, y)
-                    self.__field_labels[y][x].config(bg=color)
+            self.__own_board.show()
 
     def disable_buttons(self):
         """
@@ -1191,9 +1711,7 @@ class GameWindow:
         Used when a player finishes their turn
         """
 
-        for x in range(10):
-            for y in range(10):
-                self.__field_buttons[y][x].config(state=DISABLED)
+        self.__opponent_board.lock()
 
     def enable_buttons(self):
         """
@@ -1201,14 +1719,142 @@ class GameWindow:
         Used when a player gets their turn
         """
 
-        opponent_field = self.__opponent.get_playing_field()
+        # the computer fires once the gui has caught up
+        if self.__bot is not None:
+            self.__main_window.after(COMPUTER_MOVE_DELAY, self.computer_move)
+            return
+
+        # already used buttons were disabled when they were fired at
+        self.__opponent_board.unlock()
+
+    def computer_move(self):
+        """
+        Fires the computer's shot of the turn
+        """
+
+        if self.__destroyed or self.__game.game_ended() \
+                or self.__game.current_player() is not self.__player:
+            return
+
+        # the shot is chosen in the background, the gui keeps running
+        self.__computer_shot = self.__bot.request_shot(self.__game)
+        self.poll_computer_move()
+
+    def poll_computer_move(self):
+        """
+        Fires the computer's shot once it has been chosen,
+        otherwise checks again later
+        """
+
+        if self.__destroyed:
+            return
+
+        if not self.__computer_shot.done():
+            self.__main_window.after(COMPUTER_POLL_INTERVAL,
+                                     self.poll_computer_move)
+            return
+
+        if self.__game.game_ended() \
+                or self.__game.current_player() is not self.__player:
+            return
+
+        self.field_button(*self.__computer_shot.result())
+
+    def poll_network(self):
+        """
+        Shows the messages of the game server of an online match,
+        then checks again later
+        """
+
+        if self.__destroyed:
+            return
+
+        for message in self.__remote.poll():
+            if message is None:
+                self.append_log("Lost the connection to the game server.")
+            elif message[0] == "LOG":
+                self.append_log(message[1])
+            elif message[0] == "STATS":
+                self.update_stats(message[1])
+            elif message[0] == "ERROR":
+                self.append_log(f"Game server: {message[1]}")
+            elif message[0] == "WAITING":
+                self.append_log("Waiting for an opponent...")
+            elif message[0] == "MATCHED":
+                self.__window.title(f"Battleships | {self.__player} "
+                                    f"vs. {message[2]}")
+            elif message[0] == "SHOT":
+                self.show_remote_shot(message[1:])
+
+        # the board is only unlocked during the player's turn
+        if self.__remote.my_turn() != self.__remote_turn:
+            self.__remote_turn = self.__remote.my_turn()
+            if self.__remote_turn:
+                self.__opponent_board.unlock()
+            else:
+                self.__opponent_board.lock()
+
+        self.__main_window.after(NETWORK_POLL_INTERVAL, self.poll_network)
+
+    def show_remote_shot(self, words):
+        """
+        Colors a shot of an online match reported by the game server
+        :param words:   list,   words of the SHOT message after "SHOT"
+        """
+
+        firer, x, y = (int(word) for word in words[:3])
+        hit = words[3] != "MISS"
+        sunk_ship = words[4:]
+
+        if firer != self.__remote.get_index():
+            # the opponent fired at the player's fleet, every part of a
+            # sunk ship has been hit
+            coords = [(x, y)]
+            if sunk_ship:
+                coords = self.__player.get_ship(x, y).get_coords()
+            for coord_x, coord_y in coords:
+                self.__player.update_playing_field(coord_x, coord_y, hit)
+                self.__own_board.set_color(
+                    coord_x, coord_y, self.get_field_color(coord_x, coord_y))
+            return
+
+        color = PLAYING_FIELD_COLORS["hit" if hit else "miss"]
+        self.__opponent_board.set_field(x, y, color, False)
+
+        # the whole ship went down from one hit, color the rest of it too
+        if sunk_ship:
+            origin_x, origin_y, size = (int(word) for word in
+                                        sunk_ship[:2] + sunk_ship[3:4])
+            vertical = sunk_ship[2] == "v"
+            for part in range(size):
+                self.__opponent_board.set_field(
+                    origin_x if vertical else origin_x + part,
+                    origin_y + part if vertical else origin_y, color, False)
+
+    def save_game(self):
+        """
+        Saves the game so it can be resumed from the settings window,
+        see snapshot.py
+        """
+
+        from tkinter import filedialog
+        from snapshot import save_snapshot
+
+        path = filedialog.asksaveasfilename(parent=self.__main_window,
+                                            title="Save Game",
+                                            defaultextension=".bss",
+                                            filetypes=SAVED_GAME_TYPES)
+        if not path:
+            return
 
-        for x in range(10):
-            for y in range(10):
-                playing_field_state = opponent_field[y][x]
-                # if water or a non-hit ship
-                if playing_field_state == 0 or playing_field_state == 1:
-                    self.__field_buttons[y][x].config(state=NORMAL)
+        controllers = tuple(computer_controller(
+            player.get_game_window().get_bot())
+            for player in self.__game.get_players())
+        try:
+            save_snapshot(path, self.__game, self.__log.get_text(),
+                          controllers)
+        except OSError as error:
+            messagebox.showerror("Error", f"Couldn't save the game!\n{error}")
 
     def forfeit_game(self):
         """
@@ -1216,25 +1862,43 @@ class GameWindow:
         Gets ran when the user presses the forfeir option or closes the window
         """
 
+        # online the server ends the match, closing the connection forfeits
+        if self.__remote is not None:
+            if self.__remote.game_ended() \
+                    or messagebox.askyesno("Are you sure?",
+                                           "Are you sure you want to "
+                                           "forfeit the game?"):
+                self.close()
+            return
+
         # ingore press if game has already ended
-        if GAME_LOGIC.game_ended():
-            self.destroy()
+        if self.__game.game_ended():
+            self.close()
+            return
 
         if messagebox.askyesno("Are you sure?", "Are you sure you want "
                                                 "to forfeit the game?"):
-            GAME_LOGIC.forfeit_game(self.__player)
+            self.__game.forfeit_game(self.__player)
+            self.close()
+
+    def close(self):
+        """
+        Closes a window opened next to the screen, closing the game screen
+        itself returns to the main menu
+        """
+
+        if self.__own_window:
             self.destroy()
+        else:
+            self.__app.show_settings()
 
     def exit_main_menu(self):
         """
-        Exits to main menu
+        Exits to main menu, the game windows are destroyed with the screen
         """
         if messagebox.askyesno("Are you sure?", "Are you sure you want "
                                                 "to exit to the main menu?"):
-            PLAYERS.clear()
-            self.destroy()
-            self.__opponent.get_game_window().destroy()
-            SettingsWindow()
+            self.__app.show_settings()
 
     def exit_application(self):
         """
@@ -1242,8 +1906,7 @@ class GameWindow:
         """
         if messagebox.askyesno("Are you sure?", "Are you sure you want "
                                                 "to exit the application?"):
-            self.destroy()
-            self.__opponent.get_game_window().destroy()
+            self.__app.quit()
 
     def append_log(self, msg):
         """
@@ -1251,8 +1914,43 @@ class GameWindow:
         :param msg:     string, message to append
         """
 
-        # insert at end
-        self.__log_field.insert(END, msg + "\n---\n")
+        # the game logic has already added it to the game log,
+        # online games have no game logic
+        if self.__game is None:
+            self.__log.append(msg)
+
+        # all messages of one event are shown at once
+        if self.__log_update is None:
+            self.__log_update = self.__main_window.after_idle(self.update_log)
+
+    def update_log(self):
+        """
+        Shows the new messages of the game log in the log field, and drops
+        the ones dropped from the game log
+        """
+
+        self.__log_update = None
+        new = self.__log.total() - self.__log_shown
+        if self.__destroyed or new == 0:
+            return
+
+        self.__log_shown = self.__log.total()
+        capacity = self.__log.capacity()
+        if new >= capacity:
+            self.__log_field.delete("1.0", END)
+            self.__log_lines.clear()
+
+        messages = self.__log.latest(new)
+        self.__log_field.insert(END, "".join(format_entry(msg)
+                                             for msg in messages))
+        self.__log_lines.extend(msg.count("\n") + 2 for msg in messages)
+
+        # remove the oldest lines at once
+        excess = len(self.__log_lines) - capacity
+        if excess > 0:
+            lines = sum(self.__log_lines.popleft() for _ in range(excess))
+            self.__log_field.delete("1.0", f"{lines + 1}.0")
+
         self.__log_field.yview(END)  # scroll to end
 
     def update_stats(self, stats):
@@ -1271,7 +1969,7 @@ class GameWindow:
         :param color:   str, color to be set
         """
 
-        self.__field_labels[y][x].config(bg=color)
+        self.__own_board.set_color(x, y, color)
 
     def get_field_color(self, x, y):
         """
@@ -1281,7 +1979,7 @@ class GameWindow:
         :return:    string, word or hex representation of the color
         """
 
-        field = self.__player.get_playing_field()[y][x]
+        field = self.__player.field_state(x, y)
 
         if field == 0:
             return PLAYING_FIELD_COLORS["water"]
@@ -1295,6 +1993,14 @@ class GameWindow:
         if field == 3:
             return PLAYING_FIELD_COLORS["miss"]
 
+    def get_bot(self):
+        """
+        Returns the computer opponent firing this player's shots
+        :return:    object, see ai.py, None if the player is human
+        """
+
+        return self.__bot
+
     def hidden_field(self):
         """
         Returns whether or not the label game field is currently hidden
@@ -1304,283 +2010,120 @@ class GameWindow:
 
         return self.__hidden_field.get() == 1
 
-    def mainloop(self):
-        """
-        Starts the gui mainloop
-        """
-
-        self.__main_window.mainloop()
-
     def destroy(self):
         """
-        Destroys the gui
+        Destroys the gui, run when the screen is replaced
         """
 
         if not self.__destroyed:
             self.__main_window.destroy()
             self.__destroyed = True
 
+            if self.__bot is not None:
+                self.__bot.shutdown()
 
-class GameLogic:
-    """
-    A class to handle the game logic
-    """
-
-    def __init__(self, sink_option, player1, player2):
-        """
-        Constructor, creates the game logic object
-        :param sink_option:   bool,   True  = ships sink from one hit
-                                      False = ships sink once all parts are hit
-        :param player1:       Player, player object for first player
-        :param player2:       Player, player object for second player
-        """
-
-        self.__sink_from_one = sink_option
-        self.__player1 = player1
-        self.__player2 = player2
-        self.__game_ended = True
-
-    def sink_from_one(self):
-        """
-        Returns whether or not the game option for ships
-        sinking for one hit is enabled
-        :return:    bool,   True    = enabled
-                            False   = disabled
-        """
-
-        return self.__sink_from_one
-
-    def get_opponent(self, player):
-        """
-        Returns the opponent of the specified player
-        :param player:  Player, player object identifying the caller
-        """
-
-        # we can simply indentify by name,
-        # since same name was disallowed
-        if str(self.__player1) == str(player):
-            return self.__player2
-        else:
-            return self.__player1
-
-    def start_game(self):
-        """
-        Starts the game
-        """
-
-        self.__game_ended = False
-
-        # randomly get which player starts the game
-        player = [self.__player1, self.__player2][randrange(2)]
-
-        self.get_opponent(player).get_game_window().disable_buttons()
-
-        msg = f"Welcome to Battleships!\n{player} starts the game."
-
-        # add log message to both game windows
-        self.__player1.get_game_window().append_log(msg)
-        self.__player2.get_game_window().append_log(msg)
-
-        self.update_statistics()
-
-    def forfeit_game(self, player):
-        """
-        Handle the specified player forfeiting the game
-        :param player: Player,  the loser's player object
-        """
-
-        opponent = self.get_opponent(player)
-
-        # add log message to winner's game window
-        opponent.get_game_window().append_log(f"{player} has forfeited the "
-                                              f"game.\n{opponent} is the "
-                                              f"winner!")
-        self.__game_ended = True
-
-    def game_ended(self):
-        """
-        Returns whether the game has ended or not
-        :return: bool,  True    = game ended
-                        False   = game running
-        """
-
-        return self.__game_ended
-
-    def declare_winner(self, player):
-        """
-        Declare the specified player as the winner of the game
-        :param player: Player, winner's player object
-        """
-
-        self.update_statistics()
-
-        msg = f"{player} has won the game!"
-
-        # add log message to both game windows
-        self.__player1.get_game_window().append_log(msg)
-        self.__player2.get_game_window().append_log(msg)
-
-        self.__game_ended = True
-
-    def fire_shot(self, x, y, firer):
-        """
-        Fires a shot on the opponents playing field
-        Returns whether it was a hit or not
-        :param x:       int,    opponent playing field x coordinate
-        :param y:       int,    opponent playing field y coordinate
-        :param firer:   Player, who fired the shot
-        :return:        bool,   True  = hit
-                                False = miss
-        """
-
-        opponent = self.get_opponent(firer)
-
-        # when we're checking this, the field could only possibly be
-        # water or a ship part
-        hit = opponent.get_playing_field()[y][x] == 1
+            if self.__remote is not None:
+                self.__remote.close()
 
-        firer.increment_shots()
 
-        opponent.update_playing_field(x, y, hit)
-
-        if hit:
-            firer.increment_hits()
-            opponent.increment_hits_taken()
-
-            # get ship under these coordinates
-            ship = self.get_ship(x, y, opponent)
-
-            # if ship has no parts left
-            if ship.assign_hit(x, y, self.__sink_from_one) == 0:
-                # if the last ship was destroyed
-                if opponent.decrease_ship_count() == 0:
-                    self.announce_shot(firer, x, y, hit, ship)
-                    self.declare_winner(firer)
-                    return hit
-
-            self.announce_shot(firer, x, y, hit, ship)
-        else:
-            self.announce_shot(firer, x, y, hit)
-
-        self.update_statistics()
-
-        return hit
+def create_computer(controller, player):
+    """
+    Creates the computer opponent stored for a player in a saved game
+    :param controller:  str,    "density", "montecarlo" or "" for a human
+    :param player:      Player, the player
+    :return:            object, the computer opponent, see ai.py,
+                                None for a human
+    """
 
-    def announce_shot(self, firer, x, y, hit, ship=None):
-        """
-        Announces a hit or a miss to the game windows' logs
-        :param firer:   Player,     player object of the firer
-        :param x:       int,        playing field x coordinate
-        :param y:       int,        playing field x coordinate
-        :param hit:     bool,       True  = hit,    False = miss
-        :param ship:    Battleship, battleship object if there was a hit
-                                    defaults to None
-        """
+    if controller not in ("montecarlo", "density"):
+        return None
 
-        msg = f"{firer} fired a shot on {field_name(x, y)}..."
-        if hit:
-            opponent = self.get_opponent(firer)
-            msg += f"\n{opponent}'s {ship} was HIT!"
-
-            # how many parts left in the ship
-            parts_left = ship.get_size() - ship.hits_taken()
-            if parts_left == 1:
-                msg += f"\nOne more hit and the {ship} will be destroyed!"
-            elif parts_left == 0:
-                ships_left = opponent.ships_left()
-
-                # add "only" if less than 3 ships, and don't add "s"
-                # to "ships" if only one ship left
-                msg += f"\n{ship} got destroyed! " \
-                       f"{'Only ' if ships_left < 3 else ''}{ships_left} " \
-                       f"ship{'s' if ships_left > 1 else ''} left!"
-        else:
-            msg += "\nMISS!"
+    import ai
+    if controller == "montecarlo":
+        return ai.MonteCarloBot(player, COMPUTER_TIME_BUDGET)
+    if controller == "density":
+        return ai.ProbabilityBot(player)
+    return None
 
-        # add log message to both game windows
-        self.__player1.get_game_window().append_log(msg)
-        self.__player2.get_game_window().append_log(msg)
 
-    def update_statistics(self):
-        """
-        Produces the statistics to display for each player
-        """
+def computer_controller(bot):
+    """
+    Returns how a computer opponent is stored in a saved game
+    :param bot:     object, computer opponent, None for a human
+    :return:        str,    see create_computer
+    """
 
-        # two players, update both statistics
-        for i in range(2):
-            player = [self.__player1, self.__player2][i]
+    if bot is None:
+        return ""
+    import ai
+    if isinstance(bot, ai.MonteCarloBot):
+        return "montecarlo"
+    return "density"
 
-            shots_fired = player.shots_fired()
-            shots_hit = player.shots_hit()
-            shots_missed = shots_fired - shots_hit
 
-            if shots_fired == 0:
-                hit_percent = f"0 %"
-                miss_percent = f"0 %"
-            else:
-                hit_percent = f"{int(shots_hit / shots_fired * 100)} %"
-                miss_percent = f"{int(shots_missed / shots_fired * 100)} %"
+def default_layout(width, height, board_class):
+    """
+    Returns whether a playing field is the default 10x10 field of widgets,
+    which the fixed window sizes are made for
+    :param width:       int,    playing field width
+    :param height:      int,    playing field height
+    :param board_class: class,  board renderer of the playing field
+    :return:            bool,   True = default layout
+    """
 
-            hits_taken = player.hits_taken()
-            ships_left = player.ships_left()
+    return (width, height) == (DEFAULT_FIELD_WIDTH, DEFAULT_FIELD_HEIGHT) \
+        and board_class is WidgetBoard
 
-            # for each ship type, for each ship in ship type
-            ship_parts_left = \
-                sum([sum([ship.parts_left() for ship in ship_type])
-                     for ship_type in player.get_battleships().values()])
 
-            stats = f"Shots fired: {shots_fired}\n" \
-                    f"Shots hit: {shots_hit} ({hit_percent})\n" \
-                    f"Shots missed: {shots_missed} ({miss_percent})\n" \
-                    f"Hits taken: {hits_taken}\n" \
-                    f"Ships left: {ships_left}\n" \
-                    f"Ship parts left: {ship_parts_left}"
+def numpy_available():
+    """
+    Returns whether NumPy, which the stronger computer opponent needs, is
+    installed, without importing it
+    :return:    bool,   True = installed
+    """
 
-            player.get_game_window().update_stats(stats)
+    return importlib.util.find_spec("numpy") is not None
 
-    def get_ship(self, x, y, owner):
-        """
-        Gets the ship at these xy coordinates
-        Optionally get the opponent's ship
-        :param x:           int,        x coordinate
-        :param y:           int,        y coordinate
-        :param owner:       Player,     player object, owner of the ship
-        :return:            Battleship, battleship object
-        """
 
-        battleships = owner.get_battleships()
-        coord = (x, y)
+def score_store():
+    """
+    Returns the store of the top scores, opening it on first use
+    :return:    ScoreStore, the store, see scores.py
+    """
 
-        # check all ships for a matching coordinate
-        for ship_type in battleships:
-            # there can be more than one ship per ship type
-            for ship in battleships[ship_type]:
-                if coord in ship.get_coords():
-                    return ship
+    global SCORE_STORE
+    if SCORE_STORE is None:
+        from scores import ScoreStore
+        SCORE_STORE = ScoreStore(SCORES_FILE)
+    return SCORE_STORE
 
 
-def get_column(array, x, start, end):
+def instrument_latency():
     """
-    Gets values from a column in a matrix/2d array
-    :param array:   array, array to get values from
-    :param x:       int, x coordinate
-    :param start:   int, zero-based y start value
-    :param end:     int, zero-based y end value
-    :return:        array, values from the column
+    Starts measuring the latency of the gui callbacks, see latency.py
     """
-    return [row[x] for row in array[start:end + 1]]
 
+    from latency import LatencyMonitor
+
+    global LATENCY_MONITOR
+    LATENCY_MONITOR = LatencyMonitor()
+    LATENCY_MONITOR.instrument(GameWindow, "field_button", "shot fired")
+    LATENCY_MONITOR.instrument(GameWindow, "toggle_hide_field",
+                               "field hidden or shown")
+    LATENCY_MONITOR.instrument(ArrangeShipsWindow, "field_button",
+                               "ship part placed")
+    LATENCY_MONITOR.instrument(ArrangeShipsWindow, "update_button_states",
+                               "placement buttons updated")
 
-def field_name(x, y):
+
+def watch_latency(window):
     """
-    Returns the name of a playing field field from its x and y coordinates
-    e.g. A7, G8, B3,..
-    :param x:   int, playing field x coordinate
-    :param y:   int, playing field y coordinate
-    :return:    str, name of field
+    Measures the event loop lag of a new window if the latency is measured
+    :param window:  Tk,     the window
     """
 
-    return f"{X_FIELDS[x]}{y + 1}"
+    if LATENCY_MONITOR is not None:
+        LATENCY_MONITOR.watch(window)
 
 
 def game_rules():
@@ -1588,6 +2131,7 @@ def game_rules():
     Opens the Battleships wikipedia page in default browser
     """
 
+    import webbrowser
     webbrowser.open("https://en.wikipedia.org/wiki/Battleship_(game)")
 
 def github_link():
@@ -1595,6 +2139,7 @@ def github_link():
     Opens the GitHub repository for this program
     """
     
+    import webbrowser
     webbrowser.open("https://github.com/0x464e/battleships-py")
 
 def about():
@@ -1609,18 +2154,59 @@ def about():
                                  "8th of December 2020")
 
 
-def main():
+def main(profile_startup=False, profile_latency=False):
     """
     Entrypoint to the program
+    :param profile_startup: bool,   True = print how long the startup took
+    :param profile_latency: bool,   True = measure the gui callbacks and
+                                    print their latency on exit
     """
 
+    global STARTUP_PROFILE
+    if profile_startup:
+        STARTUP_PROFILE = StartupProfile()
+    if profile_latency:
+        instrument_latency()
+
     # if program icon is not found
     if not os.path.exists("icon.ico"):
         global ICON_MISSING
         ICON_MISSING = True
 
-    SettingsWindow()
+    # games are written as soon as they end, unfinished ones on exit
+    global REPLAY_WRITER, LOG_HISTORY, SCORE_STORE
+    try:
+        with ReplayWriter(REPLAY_FILE, buffer_size=0) as REPLAY_WRITER, \
+                LogHistory(LOG_HISTORY_FILE) as LOG_HISTORY:
+            if STARTUP_PROFILE is not None:
+                STARTUP_PROFILE.mark("replay and log files opened")
+            Application().mainloop()
+    finally:
+        if SCORE_STORE is not None:
+            SCORE_STORE.close()
+            SCORE_STORE = None
+        if LATENCY_MONITOR is not None:
+            LATENCY_MONITOR.dump()
+
+
+def tournament(argv):
+    """
+    Entrypoint to the bot tournament command line, see tournament.py
+    :param argv:    list,   command line arguments after "tournament"
+    """
+
+    # imported only when needed, the gui doesn't use it
+    from tournament import main as tournament_main
+    tournament_main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    # python battleships.py tournament [options] runs a bot tournament
+    if sys.argv[1:2] == ["tournament"]:
+        tournament(sys.argv[2:])
+    else:
+        # python battleships.py --profile-startup prints how long the
+        # settings window took to become ready, --profile-latency how long
+        # the gui took to react to the player
+        main("--profile-startup" in sys.argv[1:],
+             "--profile-latency" in sys.argv[1:])
@@ -0,0 +1,595 @@
+"""
+Battleships benchmarks
+
+Times the hot paths of the engine and the gui on playing fields of
+different sizes, with fleets growing with the playing field, and compares
+the results to a stored baseline so scaling regressions get caught.
+
+Each case is run with a fixed seed for a fixed amount of time. Only the
+operation itself is timed, one timing per operation, with the garbage
+collector off. Reported are operations per second and the 50th, 90th and
+99th percentile latencies.
+
+    python benchmark.py                     # engine benchmarks
+    xvfb-run python benchmark.py --gui      # and the gui benchmarks
+    python benchmark.py --save-baseline     # store results as the baseline
+
+Baselines are only comparable on the same machine, so the baseline file is
+local and not kept in git. Save one before making changes and compare
+against it afterwards, without one nothing is compared. The exit code is 1
+if a case got slower than the baseline by more than the tolerance.
+"""
+
+import argparse
+import gc
+import json
+import os.path
+import random
+import sys
+import time
+
+import ai
+from engine import Player, GameLogic, Fleet, DEFAULT_FLEET
+from placement import PlacementTable, random_fleet_placement
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "benchmark_baseline.json")
+
+# a case slower than the baseline by more than this is a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+class ReportingWindow:
+    """
+    Stands in for a game window, so the game logic produces its log
+    messages and statistics like with the gui
+    """
+
+    def append_log(self, msg):
+        pass
+
+    def update_stats(self, stats):
+        pass
+
+    def disable_buttons(self):
+        pass
+
+
+def scaled_fleet(width, height):
+    """
+    Returns the default fleet with its ship counts grown with the playing
+    field, so the share of ship parts stays the same as on 10x10
+    :param width:   int,    playing field width
+    :param height:  int,    playing field height
+    :return:        Fleet,  the fleet
+    """
+
+    scale = max(1, width * height // 100)
+    return Fleet([(ship_type, size, count * scale)
+                  for ship_type, size, count in DEFAULT_FLEET.get_ships()])
+
+
+def new_game(rng, size, fleet, reporting=False):
+    """
+    Creates a started game between two players with random fleets
+    :param rng:         random.Random,  random number generator to use
+    :param size:        int,            playing field width and height
+    :param fleet:       Fleet,          fleet of both players
+    :param reporting:   bool,           True = the game reports to
+                                        stand-in game windows
+    :return:            GameLogic,      the game
+    """
+
+    player1 = Player("Player 1", size, size, fleet)
+    player2 = Player("Player 2", size, size, fleet)
+    player1.place_fleet_randomly(rng)
+    player2.place_fleet_randomly(rng)
+    if reporting:
+        player1.set_game_window(ReportingWindow())
+        player2.set_game_window(ReportingWindow())
+
+    game = GameLogic(False, player1, player2, rng)
+    game.start_game(player1)
+    return game
+
+
+def shot_orders(rng, size):
+    """
+    Returns a random order of all fields for each player to fire at
+    :param rng:     random.Random,  random number generator to use
+    :param size:    int,            playing field width and height
+    :return:        list,           two lists of x, y tuples
+    """
+
+    orders = []
+    for _ in range(2):
+        fields = [(x, y) for y in range(size) for x in range(size)]
+        rng.shuffle(fields)
+        orders.append(fields)
+    return orders
+
+
+def case_fire_shot(rng, size, fleet, duration, reporting=False):
+    """
+    Times GameLogic.fire_shot over whole games of random shots
+    """
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        game = new_game(rng, size, fleet, reporting)
+        players = game.get_players()
+        orders = shot_orders(rng, size)
+        turn = 0
+        while not game.game_ended():
+            x, y = orders[turn].pop()
+            start = time.perf_counter_ns()
+            game.fire_shot(x, y, players[turn])
+            timings.append(time.perf_counter_ns() - start)
+            turn = 1 - turn
+    return timings
+
+
+def case_fire_shot_reporting(rng, size, fleet, duration):
+    """
+    Times GameLogic.fire_shot with game windows to report to
+    """
+
+    return case_fire_shot(rng, size, fleet, duration, True)
+
+
+def case_get_ship(rng, size, fleet, duration):
+    """
+    Times GameLogic.get_ship on random fields
+    """
+
+    game = new_game(rng, size, fleet)
+    owner = game.get_players()[1]
+    fields = [(rng.randrange(size), rng.randrange(size))
+              for _ in range(10000)]
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for x, y in fields:
+            start = time.perf_counter_ns()
+            game.get_ship(x, y, owner)
+            timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def case_update_statistics(rng, size, fleet, duration):
+    """
+    Times GameLogic.update_statistics after each shot of whole games
+    """
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        # windows set after the start, so fire_shot doesn't report
+        # and every statistics update has something new to show
+        game = new_game(rng, size, fleet)
+        players = game.get_players()
+        for player in players:
+            player.set_game_window(ReportingWindow())
+        orders = shot_orders(rng, size)
+        turn = 0
+        while not game.game_ended():
+            x, y = orders[turn].pop()
+            game.fire_shot(x, y, players[turn])
+            start = time.perf_counter_ns()
+            game.update_statistics()
+            timings.append(time.perf_counter_ns() - start)
+            turn = 1 - turn
+    return timings
+
+
+def case_placement(rng, size, fleet, duration):
+    """
+    Times PlacementTable.place for each ship of random fleets
+    """
+
+    sizes = [fleet.get_sizes()[ship_type]
+             for ship_type in fleet.get_place_order()]
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        table = PlacementTable(size, size, sizes)
+        for x, y, ship_size, vertical in random_fleet_placement(size, size,
+                                                                sizes, rng):
+            start = time.perf_counter_ns()
+            table.place(x, y, ship_size, vertical)
+            timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def case_random_fleet(rng, size, fleet, duration):
+    """
+    Times placing a whole fleet at random
+    """
+
+    sizes = [fleet.get_sizes()[ship_type]
+             for ship_type in fleet.get_place_order()]
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        random_fleet_placement(size, size, sizes, rng)
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def case_random_game(rng, size, fleet, duration):
+    """
+    Times whole games between random bots, from placing the fleets to
+    the last shot
+    """
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        game = new_game(rng, size, fleet)
+        ai.play_game(game, {player: ai.RandomBot(player, rng)
+                            for player in game.get_players()})
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def case_density_move(rng, size, fleet, duration):
+    """
+    Times the moves of the probability density bot over whole games
+    """
+
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        game = new_game(rng, size, fleet)
+        players = game.get_players()
+        bots = [ai.ProbabilityBot(player, rng) for player in players]
+        turn = 0
+        while not game.game_ended():
+            start = time.perf_counter_ns()
+            x, y = bots[turn].choose_shot(game)
+            timings.append(time.perf_counter_ns() - start)
+            game.fire_shot(x, y, players[turn])
+            turn = 1 - turn
+    return timings
+
+
+class GuiCases:
+    """
+    Benchmarks of the gui windows, which need a display, e.g. Xvfb
+    The screens are shown without entering the mainloop and the pending Tk
+    work is flushed after each timed operation.
+    """
+
+    def __init__(self):
+        """
+        Constructor, checks that a display is available
+        """
+
+        import battleships
+
+        self.__battleships = battleships
+        battleships.ICON_MISSING = True
+
+        # raises TclError without a display
+        self.__app = battleships.Application()
+
+    def board_class(self, size):
+        """
+        Returns the board renderer the settings window picks for a size
+        """
+
+        battleships = self.__battleships
+        if size > battleships.MAX_WIDGET_BOARD_SIZE:
+            return battleships.BOARD_BACKENDS["canvas"]
+        return battleships.BOARD_BACKENDS["widgets"]
+
+    def arrange_window(self, size, fleet):
+        """
+        Creates a ship arrangement window
+        """
+
+        battleships = self.__battleships
+        return battleships.ArrangeShipsWindow(
+            self.__app, Player("Player 1", size, size, fleet),
+            battleships.GameSession(), self.board_class(size))
+
+    def flush(self):
+        """
+        Processes the pending drawing of every window
+        """
+
+        self.__app.get_root().update_idletasks()
+
+    def case_check_placement(self, rng, size, fleet, duration):
+        """
+        Times ArrangeShipsWindow.check_placement on random fields
+        """
+
+        window = self.arrange_window(size, fleet)
+        ship_sizes = list(set(fleet.get_sizes().values()))
+        checks = [(rng.randrange(size), rng.randrange(size),
+                   rng.choice(ship_sizes)) for _ in range(10000)]
+
+        timings = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            for x, y, ship_size in checks:
+                start = time.perf_counter_ns()
+                window.check_placement(x, y, ship_size)
+                timings.append(time.perf_counter_ns() - start)
+        self.destroy_all()
+        return timings
+
+    def case_update_button_states(self, rng, size, fleet, duration):
+        """
+        Times ArrangeShipsWindow.update_button_states, including drawing
+        """
+
+        window = self.arrange_window(size, fleet)
+
+        timings = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter_ns()
+            window.update_button_states()
+            self.flush()
+            timings.append(time.perf_counter_ns() - start)
+        self.destroy_all()
+        return timings
+
+    def game_windows(self, rng, size, fleet):
+        """
+        Creates the game windows of a started game
+        :return:    tuple,  the game and both game windows
+        """
+
+        battleships = self.__battleships
+        player1 = Player("Player 1", size, size, fleet)
+        player2 = Player("Player 2", size, size, fleet)
+        player1.place_fleet_randomly(rng)
+        player2.place_fleet_randomly(rng)
+        game = GameLogic(False, player1, player2, rng)
+        session = battleships.GameSession()
+        session.set_game(game)
+
+        windows = []
+        for player in (player1, player2):
+            window = battleships.GameWindow(self.__app, player, session,
+                                            self.board_class(size),
+                                            own_window=player is player2)
+            player.set_game_window(window)
+            windows.append(window)
+        game.start_game(player1)
+        return game, windows
+
+    def case_game_window(self, rng, size, fleet, duration):
+        """
+        Times creating both game windows of a game, including drawing
+        """
+
+        timings = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter_ns()
+            self.game_windows(rng, size, fleet)
+            self.flush()
+            timings.append(time.perf_counter_ns() - start)
+            self.destroy_all()
+        return timings
+
+    def case_turn_switch(self, rng, size, fleet, duration):
+        """
+        Times firing shots through GameWindow.field_button, which switches
+        the turn, including drawing
+        """
+
+        timings = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            game, windows = self.game_windows(rng, size, fleet)
+            orders = shot_orders(rng, size)
+            turn = 0
+            while not game.game_ended() and time.perf_counter() < deadline:
+                x, y = orders[turn].pop()
+                start = time.perf_counter_ns()
+                windows[turn].field_button(x, y)
+                self.flush()
+                timings.append(time.perf_counter_ns() - start)
+                turn = 1 - turn
+            self.destroy_all()
+        return timings
+
+    def destroy_all(self):
+        """
+        Destroys the screen and windows created by the cases
+        """
+
+        self.__app.close_screen()
+
+
+def engine_cases():
+    """
+    Returns the engine benchmark cases
+    :return:    dict,   case name as key, function as value
+    """
+
+    cases = {
+        "fire_shot": case_fire_shot,
+        "fire_shot_reporting": case_fire_shot_reporting,
+        "get_ship": case_get_ship,
+        "update_statistics": case_update_statistics,
+        "placement_table_place": case_placement,
+        "random_fleet_placement": case_random_fleet,
+        "random_bot_game": case_random_game
+    }
+    if ai.numpy is not None:
+        cases["density_bot_move"] = case_density_move
+    return cases
+
+
+def gui_cases():
+    """
+    Returns the gui benchmark cases
+    :return:    dict,   case name as key, function as value
+    """
+
+    gui = GuiCases()
+    return {
+        "check_placement": gui.case_check_placement,
+        "update_button_states": gui.case_update_button_states,
+        "game_window": gui.case_game_window,
+        "turn_switch": gui.case_turn_switch
+    }
+
+
+def percentile(sorted_timings, fraction):
+    """
+    Returns a percentile of sorted timings
+    :param sorted_timings:  list,   timings in ascending order
+    :param fraction:        float,  e.g. 0.99 for the 99th percentile
+    :return:                int,    the percentile
+    """
+
+    return sorted_timings[min(len(sorted_timings) - 1,
+                              int(fraction * len(sorted_timings)))]
+
+
+def run_case(case, seed, size, duration):
+    """
+    Runs a benchmark case
+    :param case:        function,   the case
+    :param seed:        int,        random seed
+    :param size:        int,        playing field width and height
+    :param duration:    float,      seconds to run the case for
+    :return:            dict,       ops per second and percentile latencies
+                                    in microseconds
+    """
+
+    rng = random.Random(f"{seed}:{size}")
+    fleet = scaled_fleet(size, size)
+
+    gc.collect()
+    gc.disable()
+    try:
+        timings = case(rng, size, fleet, duration)
+    finally:
+        gc.enable()
+
+    timings.sort()
+    return {
+        "ops": len(timings),
+        "ops_per_sec": len(timings) * 1e9 / max(1, sum(timings)),
+        "p50_us": percentile(timings, 0.50) / 1000,
+        "p90_us": percentile(timings, 0.90) / 1000,
+        "p99_us": percentile(timings, 0.99) / 1000
+    }
+
+
+def compare(results, baseline):
+    """
+    Compares results to a baseline
+    :param results:     dict,   results of this run
+    :param baseline:    dict,   stored results
+    :return:            dict,   result name as key, ops per second
+                                relative to the baseline as value
+    """
+
+    return {name: result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+            for name, result in results.items() if name in baseline}
+
+
+def main(argv=None):
+    """
+    Entrypoint of the benchmark command line
+    :param argv:    list,   command line arguments, defaults to sys.argv
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the Battleships engine and gui")
+    parser.add_argument("cases", nargs="*",
+                        help="cases to run, defaults to all")
+    parser.add_argument("--sizes", default="10,30",
+                        help="comma separated playing field sizes")
+    parser.add_argument("--duration", type=float, default=1.0,
+                        help="seconds to run each case for")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gui", action="store_true",
+                        help="also run the gui cases, needs a display, "
+                             "e.g. xvfb-run")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    cases = engine_cases()
+    if args.gui:
+        try:
+            cases.update(gui_cases())
+        except Exception as error:
+            parser.error(f"Can't run the gui cases ({error}), "
+                         "try xvfb-run python benchmark.py --gui")
+
+    for name in args.cases:
+        if name not in cases:
+            parser.error(f"Unknown case '{name}', choose from "
+                         + ", ".join(cases))
+    selected = args.cases or list(cases)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print(f"{'Case':<32} {'ops/sec':>12} {'p50 us':>10} {'p90 us':>10} "
+          f"{'p99 us':>10} {'baseline':>9}")
+
+    results = {}
+    regressions = []
+    for size in [int(size) for size in args.sizes.split(",")]:
+        for name in selected:
+            result_name = f"{name}@{size}x{size}"
+            result = run_case(cases[name], args.seed, size, args.duration)
+            results[result_name] = result
+
+            relative = compare({result_name: result},
+                               baseline).get(result_name)
+            if relative is None:
+                change = "-"
+            else:
+                change = f"{relative:.0%}"
+                if relative < 1 - args.tolerance:
+                    change += " !"
+                    regressions.append(result_name)
+
+            print(f"{result_name:<32} {result['ops_per_sec']:>12.1f} "
+                  f"{result['p50_us']:>10.1f} {result['p90_us']:>10.1f} "
+                  f"{result['p99_us']:>10.1f} {change:>9}")
+
+    if args.save_baseline:
+        # keep the results of cases not run this time
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                stored = json.load(file)
+        stored.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(stored, file, indent=4, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print("Slower than the baseline: " + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
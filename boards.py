@@ -0,0 +1,368 @@
+"""
+Playing field renderers for the Battleships gui
+
+A board draws one playing field and remembers how each of its fields
+currently looks, so only actual changes are sent to Tk. Locking a board
+(e.g. while it's the opponent's turn) and hiding it are single operations
+on the whole board instead of one per field.
+"""
+
+from tkinter import *
+from functools import partial
+
+from engine import field_name
+
+
+class WidgetBoard:
+    """
+    A playing field drawn as a grid of buttons or labels
+    """
+
+    def __init__(self, master, width, height, color, command=None):
+        """
+        Constructor, creates the board and its fields
+        :param master:  widget,     widget to create the board in
+        :param width:   int,        playing field width
+        :param height:  int,        playing field height
+        :param color:   str,        initial color of every field
+        :param command: function,   called with the x and y coordinates
+                                    of a clicked field, if not given the
+                                    fields are plain labels
+        """
+
+        self.__width = width
+        self.__command = command
+        self.__locked = False
+        self.__hidden = False
+
+        # the border around a clickable board shows whether it's locked
+        self.__frame = Frame(master, highlightthickness=3,
+                             highlightbackground="green" if command
+                             else master["bg"])
+
+        # last applied color and enabled state of each field
+        # index is y * width + x
+        self.__colors = [color] * (width * height)
+        self.__enabled = [True] * (width * height)
+
+        self.__fields = []
+        for y in range(height):
+            for x in range(width):
+                if command is not None:
+                    field = Button(self.__frame,
+                                   text=field_name(x, y),
+                                   command=partial(self.__click, x, y),
+                                   bg=color,
+                                   width=4)
+                else:
+                    field = Label(self.__frame,
+                                  text=field_name(x, y),
+                                  bg=color,
+                                  width=4)
+                field.grid(row=y, column=x, padx=2, pady=2)
+                self.__fields.append(field)
+
+        # covers the whole board while it's hidden
+        self.__cover = Label(self.__frame, text="Hidden",
+                             font=("Arial", 13))
+
+    def grid(self, **options):
+        """
+        Positions the board in its master with the grid geometry manager
+        :param options: grid options
+        """
+
+        self.__frame.grid(**options)
+
+    def set_color(self, x, y, color):
+        """
+        Sets the color of a field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param color:   str,    color to be set
+        """
+
+        index = y * self.__width + x
+        if self.__colors[index] != color:
+            self.__colors[index] = color
+            self.__fields[index].config(bg=color)
+
+    def set_enabled(self, x, y, enabled):
+        """
+        Enables or disables a field button
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param enabled: bool,   True  = field can be clicked
+                                False = field can't be clicked
+        """
+
+        index = y * self.__width + x
+        if self.__enabled[index] != enabled:
+            self.__enabled[index] = enabled
+            self.__fields[index].config(state=NORMAL if enabled else DISABLED)
+
+    def set_field(self, x, y, color, enabled):
+        """
+        Sets both the color and the enabled state of a field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param color:   str,    color to be set
+        :param enabled: bool,   True  = field can be clicked
+                                False = field can't be clicked
+        """
+
+        index = y * self.__width + x
+        if self.__colors[index] != color or self.__enabled[index] != enabled:
+            self.__colors[index] = color
+            self.__enabled[index] = enabled
+            self.__fields[index].config(bg=color,
+                                        state=NORMAL if enabled else DISABLED)
+
+    def lock(self):
+        """
+        Ignores clicks on the whole board, e.g. while it's not the
+        player's turn. The fields keep their own states.
+        """
+
+        if not self.__locked:
+            self.__locked = True
+            self.__frame.config(highlightbackground="gray")
+
+    def unlock(self):
+        """
+        Lets the fields of the board be clicked again
+        """
+
+        if self.__locked:
+            self.__locked = False
+            self.__frame.config(highlightbackground="green")
+
+    def hide(self, color):
+        """
+        Covers the whole board so its fields can't be seen
+        :param color:   str,    color of the cover
+        """
+
+        if not self.__hidden:
+            self.__hidden = True
+            self.__cover.config(bg=color)
+            self.__cover.place(x=0, y=0, relwidth=1, relheight=1)
+
+    def show(self):
+        """
+        Uncovers a hidden board
+        """
+
+        if self.__hidden:
+            self.__hidden = False
+            self.__cover.place_forget()
+
+    def __click(self, x, y):
+        """
+        Passes a click on a field to the board's command
+        unless the board is locked
+        :param x:   int,    playing field x coordinate
+        :param y:   int,    playing field y coordinate
+        """
+
+        if not self.__locked:
+            self.__command(x, y)
+
+
+class CanvasBoard:
+    """
+    A playing field drawn as rectangles on a single canvas
+    Clicks are mapped to fields by their coordinates, so no widget is
+    created per field and large playing fields open quickly
+    """
+
+    # size of the drawn board in pixels, fields shrink to fit it
+    BOARD_SIZE = 400
+    MAX_FIELD_SIZE = 36
+    MIN_FIELD_SIZE = 4
+
+    # field names are only drawn if they fit in the fields
+    MIN_NAMED_FIELD_SIZE = 28
+
+    def __init__(self, master, width, height, color, command=None):
+        """
+        Constructor, creates the board and its fields
+        :param master:  widget,     widget to create the board in
+        :param width:   int,        playing field width
+        :param height:  int,        playing field height
+        :param color:   str,        initial color of every field
+        :param command: function,   called with the x and y coordinates
+                                    of a clicked field, if not given the
+                                    fields can't be clicked
+        """
+
+        self.__width = width
+        self.__height = height
+        self.__command = command
+        self.__locked = False
+        self.__hidden = False
+
+        field_size = self.BOARD_SIZE // max(width, height)
+        field_size = max(self.MIN_FIELD_SIZE,
+                         min(self.MAX_FIELD_SIZE, field_size))
+        self.__field_size = field_size
+
+        # the border around a clickable board shows whether it's locked
+        self.__frame = Frame(master, highlightthickness=3,
+                             highlightbackground="green" if command
+                             else master["bg"])
+
+        self.__canvas = Canvas(self.__frame,
+                               width=width * field_size,
+                               height=height * field_size,
+                               bg=master["bg"],
+                               highlightthickness=0,
+                               borderwidth=0)
+        self.__canvas.pack()
+
+        # last applied color and enabled state of each field
+        # index is y * width + x
+        self.__colors = [color] * (width * height)
+        self.__enabled = [True] * (width * height)
+
+        # leave a gap between the fields, unless they are tiny
+        gap = 1 if field_size > 6 else 0
+        named = field_size >= self.MIN_NAMED_FIELD_SIZE
+
+        self.__items = []
+        for y in range(height):
+            for x in range(width):
+                left = x * field_size
+                top = y * field_size
+                self.__items.append(
+                    self.__canvas.create_rectangle(left + gap, top + gap,
+                                                   left + field_size - gap,
+                                                   top + field_size - gap,
+                                                   fill=color, width=0))
+                if named:
+                    self.__canvas.create_text(left + field_size // 2,
+                                              top + field_size // 2,
+                                              text=field_name(x, y),
+                                              font=("Arial", 8))
+
+        # covers the whole board while it's hidden
+        self.__cover = self.__canvas.create_rectangle(
+            0, 0, width * field_size, height * field_size,
+            fill=color, width=0, state=HIDDEN)
+        self.__cover_text = self.__canvas.create_text(
+            width * field_size // 2, height * field_size // 2,
+            text="Hidden", font=("Arial", 13), state=HIDDEN)
+
+        if command is not None:
+            self.__canvas.bind("<Button-1>", self.__click)
+
+    def grid(self, **options):
+        """
+        Positions the board in its master with the grid geometry manager
+        :param options: grid options
+        """
+
+        self.__frame.grid(**options)
+
+    def set_color(self, x, y, color):
+        """
+        Sets the color of a field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param color:   str,    color to be set
+        """
+
+        index = y * self.__width + x
+        if self.__colors[index] != color:
+            self.__colors[index] = color
+            self.__canvas.itemconfig(self.__items[index], fill=color)
+
+    def set_enabled(self, x, y, enabled):
+        """
+        Enables or disables clicking a field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param enabled: bool,   True  = field can be clicked
+                                False = field can't be clicked
+        """
+
+        # clicks are checked against this when they happen,
+        # nothing to send to Tk
+        self.__enabled[y * self.__width + x] = enabled
+
+    def set_field(self, x, y, color, enabled):
+        """
+        Sets both the color and the enabled state of a field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param color:   str,    color to be set
+        :param enabled: bool,   True  = field can be clicked
+                                False = field can't be clicked
+        """
+
+        self.set_color(x, y, color)
+        self.set_enabled(x, y, enabled)
+
+    def lock(self):
+        """
+        Ignores clicks on the whole board, e.g. while it's not the
+        player's turn. The fields keep their own states.
+        """
+
+        if not self.__locked:
+            self.__locked = True
+            self.__frame.config(highlightbackground="gray")
+
+    def unlock(self):
+        """
+        Lets the fields of the board be clicked again
+        """
+
+        if self.__locked:
+            self.__locked = False
+            self.__frame.config(highlightbackground="green")
+
+    def hide(self, color):
+        """
+        Covers the whole board so its fields can't be seen
+        :param color:   str,    color of the cover
+        """
+
+        if not self.__hidden:
+            self.__hidden = True
+            self.__canvas.itemconfig(self.__cover, fill=color, state=NORMAL)
+            self.__canvas.itemconfig(self.__cover_text, state=NORMAL)
+
+    def show(self):
+        """
+        Uncovers a hidden board
+        """
+
+        if self.__hidden:
+            self.__hidden = False
+            self.__canvas.itemconfig(self.__cover, state=HIDDEN)
+            self.__canvas.itemconfig(self.__cover_text, state=HIDDEN)
+
+    def __click(self, event):
+        """
+        Maps a click on the canvas to a field and passes it to the
+        board's command, unless the board or the field is disabled
+        :param event:   Event, Tk mouse event
+        """
+
+        x = event.x // self.__field_size
+        y = event.y // self.__field_size
+
+        if self.__locked or not 0 <= x < self.__width \
+                or not 0 <= y < self.__height:
+            return
+
+        if self.__enabled[y * self.__width + x]:
+            self.__command(x, y)
+
+
+# selectable board renderers by name
+BOARD_BACKENDS = {
+    "widgets": WidgetBoard,
+    "canvas": CanvasBoard
+}
@@ -0,0 +1,209 @@
+"""
+Battleships game server client
+
+Plays a match on a game server (see server.py) for the gui. The connection
+is read in a background thread, which queues the messages of the server
+for the gui to poll, so the gui never waits for the network.
+
+    game = RemoteGame("localhost", 8765)
+    game.request_match(player, sink_from_one=False)
+    ...
+    for message in game.poll():
+        ...
+    game.fire(3, 4)
+"""
+
+import queue
+import socket
+import threading
+
+from server import escape, unescape, format_layout, DEFAULT_PORT
+
+
+# seconds to wait for the server to accept the connection
+CONNECT_TIMEOUT = 5
+
+
+def parse_address(address):
+    """
+    Parses a server address
+    :param address: str,    host or host:port
+    :return:        tuple,  host and port
+    """
+
+    host, _, port = address.strip().rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError(f"Invalid port '{port}'")
+
+
+class RemoteGame:
+    """
+    A match played on a game server
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT):
+        """
+        Constructor, connects to the server
+        :param host:    str,    server host
+        :param port:    int,    server port
+        :raises OSError: if the server can't be reached
+        """
+
+        self.__socket = socket.create_connection((host, port),
+                                                 CONNECT_TIMEOUT)
+        self.__socket.settimeout(None)
+        self.__send_lock = threading.Lock()
+
+        # messages of the server as lists of words, None once the
+        # connection was lost
+        self.__messages = queue.Queue()
+
+        # set by the server's messages
+        self.__index = None
+        self.__turn = None
+        self.__ended = False
+        # whether a shot was fired and its SHOT hasn't come yet
+        self.__firing = False
+
+        self.__reader = threading.Thread(target=self.read_messages,
+                                         daemon=True)
+        self.__reader.start()
+
+    def read_messages(self):
+        """
+        Reads the lines of the server into the message queue,
+        run in the background thread
+        """
+
+        try:
+            with self.__socket.makefile("r", encoding="utf-8",
+                                        errors="replace") as lines:
+                for line in lines:
+                    self.__messages.put(line.rstrip("\r\n").split(" "))
+        except OSError:
+            pass
+        self.__messages.put(None)
+
+    def send(self, line):
+        """
+        Sends a command to the server
+        :param line:    str,    the command without the line break
+        """
+
+        try:
+            with self.__send_lock:
+                self.__socket.sendall(line.encode() + b"\n")
+        except OSError:
+            # the reader notices the lost connection too
+            pass
+
+    def request_match(self, player, sink_from_one):
+        """
+        Asks for a match against a player with the same settings
+        :param player:          Player, player with their fleet placed
+        :param sink_from_one:   bool,   True = ships sink from one hit
+        """
+
+        self.send(f"NAME {escape(str(player))}")
+        self.send(f"PLAY {player.get_width()} {player.get_height()} "
+                  f"{int(sink_from_one)} {player.get_fleet()}")
+        self.send(f"PLACE {format_layout(player)}")
+
+    def fire(self, x, y):
+        """
+        Fires a shot, the result comes as a SHOT message
+        :param x:   int,    playing field x coordinate
+        :param y:   int,    playing field y coordinate
+        """
+
+        self.__turn = None
+        self.__firing = True
+        self.send(f"FIRE {x} {y}")
+
+    def forfeit(self):
+        """
+        Forfeits the match
+        """
+
+        if not self.__ended:
+            self.send("FORFEIT")
+
+    def poll(self):
+        """
+        Returns the messages received since the last poll
+        :return:    list,   each message as a list of words, texts of LOG,
+                            STATS and ERROR and the opponent name of
+                            MATCHED as one unescaped word,
+                            None if the connection was lost
+        """
+
+        messages = []
+        while True:
+            try:
+                message = self.__messages.get_nowait()
+            except queue.Empty:
+                return messages
+
+            if message is None:
+                self.__ended = True
+            elif message[0] in ("LOG", "STATS", "ERROR"):
+                message = [message[0], unescape(" ".join(message[1:]))]
+                # a refused shot leaves the turn to the player
+                if message[0] == "ERROR" and self.__firing:
+                    self.__firing = False
+                    self.__turn = self.__index
+            elif message[0] == "MATCHED":
+                self.__index = int(message[1])
+                message = [message[0], message[1],
+                           unescape(" ".join(message[2:]))]
+            elif message[0] == "START":
+                self.__turn = int(message[1])
+            elif message[0] == "SHOT":
+                self.__firing = False
+                self.__turn = 1 - int(message[1])
+            elif message[0] == "END":
+                self.__ended = True
+            messages.append(message)
+
+    def get_index(self):
+        """
+        Returns the player's index in the match
+        :return:    int,    0 or 1, None until matched
+        """
+
+        return self.__index
+
+    def my_turn(self):
+        """
+        Returns whether it's the player's turn to fire
+        :return:    bool,   True = the player may fire
+        """
+
+        return not self.__ended and self.__index is not None \
+            and self.__turn == self.__index
+
+    def game_ended(self):
+        """
+        Returns whether the match has ended or the connection was lost
+        :return:    bool,   True = ended
+        """
+
+        return self.__ended
+
+    def close(self):
+        """
+        Closes the connection, forfeiting a match still running
+        """
+
+        self.forfeit()
+        self.__ended = True
+        try:
+            self.__socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.__socket.close()
@@ -0,0 +1,1259 @@
+"""
+Battleships Game Engine
+
+The rules of the Battleships game without any gui.
+Nothing in this module imports tkinter, so games can be created and played
+headlessly, e.g. for simulations or computer opponents. The gui in
+battleships.py is built on top of this module.
+
+A game is played like so:
+    player1 = Player("Player 1")
+    player2 = Player("Player 2")
+    player1.add_battleship("Carrier", False, (0, 0))
+    ...
+    player2.place_fleet_randomly()
+    game = GameLogic(False, player1, player2)
+    starter = game.start_game()
+    hit = game.fire_shot(3, 4, starter)
+    ...
+    game.winner()
+
+If a player has been assigned a game window (see Player.set_game_window),
+the game logic reports log messages, statistics and turn changes to it.
+Any object with append_log, update_stats and disable_buttons methods will
+do. Without game windows or a log no messages are produced at all.
+
+A game can also be given a log, which gets each log message once, e.g.
+gamelog.GameLog to keep the last messages of the game.
+
+A game can also be given a recorder, which is told about the start, every
+shot and the end of the game, e.g. replay.ReplayWriter to store games in a
+replay file. Any object with game_started, shot_fired and game_ended
+methods will do, and a RecorderGroup tells several recorders.
+"""
+
+import random
+
+from placement import random_fleet_placement
+
+
+# global constants:
+# results of a shot as told to recorders
+SHOT_MISS = 0
+SHOT_HIT = 1
+SHOT_SUNK = 2
+
+DEFAULT_FIELD_WIDTH = 10
+DEFAULT_FIELD_HEIGHT = 10
+
+SHIP_PLACE_ORDER = ("Carrier,Battleship" + ",Cruiser" * 2 + ",Destroyer" * 2 +
+                    ",Submarine" * 2).split(",")
+
+BATTLESHIP_SIZES = {
+    "Carrier": 5,
+    "Battleship": 4,
+    "Cruiser": 3,
+    "Destroyer": 2,
+    "Submarine": 1
+}
+
+
+class Fleet:
+    """
+    Models the composition of a fleet: the types of battleships, their sizes,
+    how many of each there are and the order they are placed in
+    """
+
+    def __init__(self, ships):
+        """
+        Constructor, creates a fleet object
+        :param ships:   list, tuples of ship type (str), size (int) and
+                              count (int) in placing order
+        """
+
+        self.__ships = []
+        self.__sizes = {}
+        self.__place_order = []
+
+        for ship_type, size, count in ships:
+            if not ship_type or ship_type in self.__sizes:
+                raise ValueError(f"Invalid or duplicate ship type "
+                                 f"'{ship_type}'")
+            if size < 1 or count < 1:
+                raise ValueError(f"{ship_type} must have a positive size "
+                                 f"and count")
+
+            self.__ships.append((ship_type, size, count))
+            self.__sizes[ship_type] = size
+            self.__place_order += [ship_type] * count
+
+        if not self.__ships:
+            raise ValueError("A fleet must have at least one ship")
+
+    @staticmethod
+    def parse(text, max_ships=None):
+        """
+        Creates a fleet from its text representation
+        e.g. "Carrier:5x1, Cruiser:3x2"
+        :param text:        str,    comma separated ship type:sizexcount
+                                    entries
+        :param max_ships:   int,    most ships the fleet may have, checked
+                                    before the fleet is built, None = any
+        :return:            Fleet,  the parsed fleet
+        """
+
+        ships = []
+        for entry in text.split(","):
+            try:
+                ship_type, numbers = entry.split(":")
+                size, count = numbers.lower().split("x")
+                ships.append((ship_type.strip(), int(size), int(count)))
+            except ValueError:
+                raise ValueError(f"Invalid fleet entry '{entry.strip()}', "
+                                 "expected type:sizexcount") from None
+
+        if max_ships is not None \
+                and sum(count for _, _, count in ships) > max_ships:
+            raise ValueError(f"A fleet can have at most {max_ships} ships")
+
+        return Fleet(ships)
+
+    def get_sizes(self):
+        """
+        Returns the size of each ship type
+        :return:    dict, ship type as key, size as value
+        """
+
+        return self.__sizes
+
+    def get_place_order(self):
+        """
+        Returns the ship types in the order they are placed in,
+        a ship type appears once for each ship of the type
+        :return:    list, ship types
+        """
+
+        return self.__place_order
+
+    def get_ships(self):
+        """
+        Returns the ship types of this fleet with their sizes and counts
+        :return:    list, tuples of ship type, size and count
+        """
+
+        return self.__ships
+
+    def ship_count(self):
+        """
+        Returns the amount of ships in this fleet
+        :return:    int, count
+        """
+
+        return len(self.__place_order)
+
+    def __str__(self):
+        """
+        Returns the string representation of this object, which
+        Fleet.parse accepts
+        :return: str, e.g. "Carrier:5x1, Cruiser:3x2"
+        """
+
+        return ", ".join(f"{ship_type}:{size}x{count}"
+                         for ship_type, size, count in self.__ships)
+
+
+# the fleet of the original game
+DEFAULT_FLEET = Fleet([(ship_type, size, SHIP_PLACE_ORDER.count(ship_type))
+                       for ship_type, size in BATTLESHIP_SIZES.items()])
+
+
+class Player:
+    """
+    Models a player for this game
+    """
+
+    def __init__(self, name, width=DEFAULT_FIELD_WIDTH,
+                 height=DEFAULT_FIELD_HEIGHT, fleet=DEFAULT_FLEET):
+        """
+        Constructor, creates a player object
+        :param name:    str,    player's name
+        :param width:   int,    playing field width
+        :param height:  int,    playing field height
+        :param fleet:   Fleet,  the battleships this player places
+        """
+
+        self.__name = name
+        self.__fleet = fleet
+        self.__battleships = {}
+        self.__shots_fired = 0
+        self.__shots_hit = 0
+        self.__hits_taken = 0
+        self.__ships_left = fleet.ship_count()
+        self.__parts_left = 0
+
+        # how many parts of each ship type have been lost
+        self.__parts_lost = {}
+
+        # to be set
+        self.__game_window = None
+
+        # playing field stored as bitboards, one int for each row
+        # bit x of row y is the field at x, y
+        # a shot only touches one row, so its cost doesn't grow
+        # with the height of the playing field
+        self.__width = width
+        self.__height = height
+        self.__ship_rows = [0] * height
+        self.__hit_rows = [0] * height
+        self.__miss_rows = [0] * height
+
+        # battleship objects by the bit number of each of their parts
+        # memory grows with the fleet, not with the playing field
+        self.__ship_index = {}
+
+    def increment_shots(self):
+        """
+        Increments the amount of shots this player has fired
+        """
+
+        self.__shots_fired += 1
+
+    def increment_hits(self):
+        """
+        Increments the amount of shots this player has hit
+        """
+
+        self.__shots_hit += 1
+
+    def increment_hits_taken(self):
+        """
+        Increments the amount of hits this player has taken
+        """
+
+        self.__hits_taken += 1
+
+    def decrease_ship_count(self):
+        """
+        Decreases the amount of ships this player has left and returns
+        the new count of ships
+        :return:    int, count of ships left
+        """
+
+        self.__ships_left -= 1
+        return self.__ships_left
+
+    def decrease_parts_left(self, ship_type, count):
+        """
+        Decreases the amount of ship parts this player has left
+        :param ship_type:   str,    type of the battleship that lost parts
+        :param count:       int,    how many parts were lost
+        """
+
+        self.__parts_left -= count
+        self.__parts_lost[ship_type] += count
+
+    def add_battleship(self, battleship, vertical, coords):
+        """
+        Adds a battleship to this player's battleships
+        :param battleship:  str,    name of battleship to add
+        :param vertical:    bool,   True  = placed vertically
+                                    False = placed horizontally
+        :param coords:      tuple,  tuple of the x and y coordinates
+                                    for ship's origin
+        """
+
+        ship = Battleship(battleship, vertical, coords,
+                          self.__fleet.get_sizes()[battleship])
+
+        # set or append depending on if a the player already has
+        # the type of battleship
+        if battleship not in self.__battleships:
+            self.__battleships[battleship] = [ship]
+        else:
+            self.__battleships[battleship].append(ship)
+
+        self.__parts_left += ship.get_size()
+        self.__parts_lost.setdefault(battleship, 0)
+
+        # mark all the ship's parts to the player's playing field
+        # and index the ship by each of its parts
+        x = coords[0]
+        y = coords[1]
+        for i in range(ship.get_size()):
+            if vertical:
+                self.__ship_rows[y + i] |= 1 << x
+                self.__ship_index[(y + i) * self.__width + x] = ship
+            else:
+                self.__ship_rows[y] |= 1 << (x + i)
+                self.__ship_index[y * self.__width + x + i] = ship
+
+    def place_fleet_randomly(self, rng=random, uniform=False):
+        """
+        Adds every ship of this player's fleet at a random legal placement,
+        see placement.random_fleet_placement
+        :param rng:     random.Random,  random number generator to use
+        :param uniform: bool,           True = every legal layout of the
+                                        fleet is equally likely
+        """
+
+        sizes = self.__fleet.get_sizes()
+
+        # ship types waiting for a placement of their size
+        ship_types = {}
+        for ship_type in self.__fleet.get_place_order():
+            ship_types.setdefault(sizes[ship_type], []).append(ship_type)
+
+        for x, y, size, vertical in random_fleet_placement(
+                self.__width, self.__height,
+                [sizes[ship_type]
+                 for ship_type in self.__fleet.get_place_order()],
+                rng, uniform):
+            self.add_battleship(ship_types[size].pop(), vertical, (x, y))
+
+    def restore_shots(self, shots_fired, shots_hit, hit_rows, miss_rows):
+        """
+        Restores the shots of a saved game, see snapshot.py. The battleships
+        must have been added and their damage restored first.
+        :param shots_fired: int,    shots this player has fired
+        :param shots_hit:   int,    shots this player has hit
+        :param hit_rows:    list,   bitboard rows of hit fields
+        :param miss_rows:   list,   bitboard rows of missed fields
+        """
+
+        self.__shots_fired = shots_fired
+        self.__shots_hit = shots_hit
+        self.__hit_rows = list(hit_rows)
+        self.__miss_rows = list(miss_rows)
+
+        # the rest follows from the damage of the battleships
+        self.__hits_taken = 0
+        self.__ships_left = 0
+        self.__parts_left = 0
+        for ship_type, ships in self.__battleships.items():
+            self.__parts_lost[ship_type] = 0
+            for ship in ships:
+                self.__hits_taken += ship.hits_taken()
+                self.__parts_left += ship.parts_left()
+                self.__parts_lost[ship_type] += ship.get_size() \
+                    - ship.parts_left()
+                if ship.parts_left():
+                    self.__ships_left += 1
+
+    def get_battleships(self):
+        """
+        Returns this player's battleships
+        :return:    dict, dict of battleship objects
+        """
+
+        return self.__battleships
+
+    def get_ship(self, x, y):
+        """
+        Returns the battleship at the specified coordinates
+        :param x:   int,        playing field x coordinate
+        :param y:   int,        playing field y coordinate
+        :return:    Battleship, battleship object, None if there's no ship
+        """
+
+        return self.__ship_index.get(y * self.__width + x)
+
+    def set_game_window(self, game_window):
+        """
+        Assigns a game window to this player
+        :param game_window: GameWindow, game window object, or any object
+                                        implementing append_log, update_stats
+                                        and disable_buttons
+        """
+
+        self.__game_window = game_window
+
+    def update_playing_field(self, x, y, hit):
+        """
+        Updates hits and misses to this player's playing field
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param hit:     bool,   True  = ship was hit here
+                                False = missed shot here
+        """
+
+        if hit:
+            self.__hit_rows[y] |= 1 << x
+        else:
+            self.__miss_rows[y] |= 1 << x
+
+    def get_game_window(self):
+        """
+        Returns this player's game window object
+        :return: GameWindow, game window object, None if not set
+        """
+
+        return self.__game_window
+
+    def get_playing_field(self):
+        """
+        Returns this player's playing field as a matrix
+        Built from the bitboards on every call, prefer field_state and
+        the mask methods where speed matters
+        :return:    2d array, the playing field
+                              0 = water
+                              1 = ship part
+                              2 = hit ship
+                              3 = missed shot
+        """
+
+        return [[self.field_state(x, y) for x in range(self.__width)]
+                for y in range(self.__height)]
+
+    def field_state(self, x, y):
+        """
+        Returns the state of a single field of this player's playing field
+        :param x:   int, playing field x coordinate
+        :param y:   int, playing field y coordinate
+        :return:    int, 0 = water
+                         1 = ship part
+                         2 = hit ship
+                         3 = missed shot
+        """
+
+        bit = 1 << x
+
+        if self.__miss_rows[y] & bit:
+            return 3
+        if self.__hit_rows[y] & bit:
+            return 2
+        if self.__ship_rows[y] & bit:
+            return 1
+        return 0
+
+    def get_fleet(self):
+        """
+        Returns the fleet this player places
+        :return:    Fleet, fleet object
+        """
+
+        return self.__fleet
+
+    def get_width(self):
+        """
+        Returns the width of this player's playing field
+        :return:    int, width
+        """
+
+        return self.__width
+
+    def get_height(self):
+        """
+        Returns the height of this player's playing field
+        :return:    int, height
+        """
+
+        return self.__height
+
+    def ship_rows(self):
+        """
+        Returns the bitboard rows of this player's ship parts, hit or not
+        :return:    list, int for each row, bit x set for each ship part
+        """
+
+        return self.__ship_rows
+
+    def hit_rows(self):
+        """
+        Returns the bitboard rows of hit ship parts on this player's field
+        :return:    list, int for each row, bit x set for each hit
+        """
+
+        return self.__hit_rows
+
+    def miss_rows(self):
+        """
+        Returns the bitboard rows of missed shots on this player's field
+        :return:    list, int for each row, bit x set for each miss
+        """
+
+        return self.__miss_rows
+
+    def ship_mask(self):
+        """
+        Returns the bitboard of this player's ship parts, hit or not
+        :return:    int, bit y * width + x set for each ship part
+        """
+
+        return join_rows(self.__ship_rows, self.__width)
+
+    def hit_mask(self):
+        """
+        Returns the bitboard of hit ship parts on this player's field
+        :return:    int, bit y * width + x set for each hit
+        """
+
+        return join_rows(self.__hit_rows, self.__width)
+
+    def miss_mask(self):
+        """
+        Returns the bitboard of missed shots on this player's field
+        :return:    int, bit y * width + x set for each miss
+        """
+
+        return join_rows(self.__miss_rows, self.__width)
+
+    def shootable_mask(self):
+        """
+        Returns the bitboard of fields that haven't been fired at yet
+        :return:    int, bit y * width + x set for each shootable field
+        """
+
+        full = (1 << (self.__width * self.__height)) - 1
+        return full & ~(self.hit_mask() | self.miss_mask())
+
+    def all_ships_sunk(self):
+        """
+        Returns whether every ship part on this player's field has been hit
+        :return:    bool, True = all ships sunk
+        """
+
+        return self.__parts_left == 0
+
+    def ships_left(self):
+        """
+        Returns the amount of ships this player has left
+        :return:    int, count
+        """
+
+        return self.__ships_left
+
+    def parts_left(self):
+        """
+        Returns the amount of ship parts this player has left
+        :return:    int, count
+        """
+
+        return self.__parts_left
+
+    def parts_lost(self):
+        """
+        Returns how many parts of each ship type this player has lost
+        :return:    dict, ship type as key, count as value
+        """
+
+        return self.__parts_lost
+
+    def statistics(self):
+        """
+        Returns this player's statistics
+        :return:    tuple, shots fired, shots hit, hits taken,
+                           ships left and ship parts left
+        """
+
+        return (self.__shots_fired, self.__shots_hit, self.__hits_taken,
+                self.__ships_left, self.__parts_left)
+
+    def shots_fired(self):
+        """
+        Returns the amount of shots this player has fired
+        :return:    int, count
+        """
+
+        return self.__shots_fired
+
+    def shots_hit(self):
+        """
+        Returns the amount of shots this player has hit
+        :return:    int, count
+        """
+
+        return self.__shots_hit
+
+    def hits_taken(self):
+        """
+        Returns the amount of hits this player has taken
+        :return:    int, count
+        """
+
+        return self.__hits_taken
+
+    def __str__(self):
+        """
+        Returns the string representation of this object (player's name)
+        :return: str, player's name
+        """
+
+        return self.__name
+
+
+class Battleship:
+    """
+    Models a battleship
+    """
+
+    # simulations keep huge amounts of battleships around,
+    # so don't give each one an attribute dict
+    __slots__ = ("__ship_type", "__size", "__x", "__y", "__vertical",
+                 "__hits_taken", "__damage", "__parts_left")
+
+    def __init__(self, ship_type, vertical, coords, size=None):
+        """
+        Constructor, creates a battleship object
+        :param ship_type:   str,    type of battleship to create
+        :param vertical:    bool,   True  = placed vertically
+                                    False = placed horizontally
+        :param coords:      tuple,  tuple of the x and y coordinates
+                                    for ship's origin
+        :param size:        int,    size of the battleship, defaults to the
+                                    size of the type in the default fleet
+        """
+
+        self.__ship_type = ship_type
+        self.__size = BATTLESHIP_SIZES[ship_type] if size is None else size
+        self.__x = coords[0]
+        self.__y = coords[1]
+        self.__vertical = vertical
+        self.__hits_taken = 0
+
+        # which parts of the ship have been hit
+        # bit i is set once the part i steps away from the origin is hit
+        self.__damage = 0
+        self.__parts_left = self.__size
+
+    def assign_hit(self, x, y, sink_from_one):
+        """
+        Marks a part of this ship hit and returns
+        how many parts left it has
+        :param x:               int,   playing field x coordinate
+        :param y:               int,   playing field y coordiante
+        :param sink_from_one:   bool,  True  = ships sink from one hit
+                                       False = ships sink once each part is hit
+        :return:                int,   amount of parts left in ship
+        """
+
+        self.__hits_taken += 1
+
+        # whole ship is gone from one hit
+        if sink_from_one:
+            self.__damage = (1 << self.__size) - 1
+            self.__parts_left = 0
+
+        # ship no longer has this part
+        else:
+            if self.__vertical:
+                bit = 1 << (y - self.__y)
+            else:
+                bit = 1 << (x - self.__x)
+
+            if not self.__damage & bit:
+                self.__damage |= bit
+                self.__parts_left -= 1
+
+        # return amount of parts left in ship
+        return self.__parts_left
+
+    def restore_damage(self, damage, hits_taken):
+        """
+        Restores the damage of a saved game, see snapshot.py
+        :param damage:      int,    bit i set if the part i steps from the
+                                    origin is hit
+        :param hits_taken:  int,    hits this battleship has taken
+        """
+
+        self.__damage = damage
+        self.__hits_taken = hits_taken
+        self.__parts_left = self.__size - bin(damage).count("1")
+
+    def get_coords(self):
+        """
+        Returs this battleship's coordinates
+        The list is built on each call, get_origin and is_vertical
+        describe the ship without building anything
+        :return:    array, array of tuples
+        """
+
+        if self.__vertical:
+            return [(self.__x, self.__y + i) for i in range(self.__size)]
+
+        return [(self.__x + i, self.__y) for i in range(self.__size)]
+
+    def get_origin(self):
+        """
+        Returns the coordinates of this battleship's origin (top left part)
+        :return:    tuple, x and y coordinates
+        """
+
+        return self.__x, self.__y
+
+    def is_vertical(self):
+        """
+        Returns whether this battleship is placed vertically
+        :return:    bool,   True  = placed vertically
+                            False = placed horizontally
+        """
+
+        return self.__vertical
+
+    def get_damage(self):
+        """
+        Returns which parts of this battleship have been hit
+        :return:    int, bit i set if the part i steps from the origin is hit
+        """
+
+        return self.__damage
+
+    def parts_left(self):
+        """
+        Returns the amount of parts this battleship has left
+        :return:    int, count
+        """
+
+        return self.__parts_left
+
+    def get_size(self):
+        """
+        Returns the size of this battleship
+        :return:    int, size
+        """
+
+        return self.__size
+
+    def hits_taken(self):
+        """
+        Returns the amount of hits this battleship has taken
+        :return:    int, count
+        """
+
+        return self.__hits_taken
+
+    def __str__(self):
+        """
+        Returns the string representation of this object (battleships's type)
+        :return: str, battleship's type
+        """
+
+        return self.__ship_type
+
+
+class GameLogic:
+    """
+    A class to handle the game logic
+    """
+
+    def __init__(self, sink_option, player1, player2, rng=random,
+                 recorder=None, log=None):
+        """
+        Constructor, creates the game logic object
+        :param sink_option:   bool,   True  = ships sink from one hit
+                                      False = ships sink once all parts are hit
+        :param player1:       Player, player object for first player
+        :param player2:       Player, player object for second player
+        :param rng:           random.Random, random number generator for
+                                      picking the starter, seed it for
+                                      reproducible games
+        :param recorder:      object, told about the start, shots and end of
+                                      the game, e.g. replay.ReplayWriter,
+                                      defaults to None
+        :param log:           object, gets each log message once with
+                                      append, e.g. gamelog.GameLog,
+                                      defaults to None
+        """
+
+        if (player1.get_width(), player1.get_height()) \
+                != (player2.get_width(), player2.get_height()):
+            raise ValueError("Players must have equally sized playing fields")
+
+        self.__sink_from_one = sink_option
+        self.__rng = rng
+        self.__recorder = recorder
+        self.__log = log
+        self.__player1 = player1
+        self.__player2 = player2
+        self.__game_ended = True
+
+        # player whose turn it is and the winner, to be set
+        self.__turn = None
+        self.__winner = None
+
+        # game windows to report to, collected when the game starts
+        self.__windows = []
+
+        # whether log messages are produced, only if anyone gets them
+        self.__logging = log is not None
+
+        # statistics last shown in each player's game window
+        self.__shown_statistics = {}
+
+    def sink_from_one(self):
+        """
+        Returns whether or not the game option for ships
+        sinking for one hit is enabled
+        :return:    bool,   True    = enabled
+                            False   = disabled
+        """
+
+        return self.__sink_from_one
+
+    def set_log(self, log):
+        """
+        Sets the log getting each log message, e.g. of a restored game
+        :param log:     object, see the constructor, None for no log
+        """
+
+        self.__log = log
+        self.__logging = bool(self.__windows) or log is not None
+
+    def get_players(self):
+        """
+        Returns both players of this game
+        :return:    tuple, the first and second player objects
+        """
+
+        return self.__player1, self.__player2
+
+    def get_opponent(self, player):
+        """
+        Returns the opponent of the specified player
+        :param player:  Player, player object identifying the caller
+        :return:        Player, the other player of this game
+        """
+
+        # players are told apart by identity, they may share a name
+        if player is self.__player1:
+            return self.__player2
+        if player is self.__player2:
+            return self.__player1
+        raise ValueError(f"{player} doesn't play in this game")
+
+    def player_index(self, player):
+        """
+        Returns the index of a player in this game
+        :param player:  Player, the player
+        :return:        int,    0 for the first player, 1 for the second
+        """
+
+        if player is self.__player1:
+            return 0
+        if player is self.__player2:
+            return 1
+        raise ValueError(f"{player} doesn't play in this game")
+
+    def start_game(self, starter=None):
+        """
+        Starts the game
+        :param starter: Player, player who gets the first turn,
+                                defaults to a random player
+        :return:        Player, player who starts the game
+        """
+
+        self.__game_ended = False
+        self.__winner = None
+
+        # randomly get which player starts the game
+        if starter is None:
+            starter = (self.__player1,
+                       self.__player2)[self.__rng.randrange(2)]
+        self.__turn = starter
+
+        self.__windows = [player.get_game_window()
+                          for player in (self.__player1, self.__player2)
+                          if player.get_game_window() is not None]
+        self.__logging = bool(self.__windows) or self.__log is not None
+
+        if self.__recorder is not None:
+            self.__recorder.game_started(self, starter)
+
+        opponent_window = self.get_opponent(starter).get_game_window()
+        if opponent_window is not None:
+            opponent_window.disable_buttons()
+
+        if self.__logging:
+            # add log message to both game windows
+            self.append_log(f"Welcome to Battleships!\n{starter} starts "
+                            "the game.")
+        if self.__windows:
+            self.update_statistics()
+
+        return starter
+
+    def resume_game(self, turn, winner=None):
+        """
+        Resumes a saved game, see snapshot.py. Like start_game, but the
+        players keep their shots and nothing is logged. A recorder is only
+        told about games started with start_game.
+        :param turn:    Player, player whose turn it is
+        :param winner:  Player, winner of a game that had ended,
+                                None if it was still running
+        """
+
+        self.__turn = turn
+        self.__winner = winner
+        self.__game_ended = winner is not None
+
+        self.__windows = [player.get_game_window()
+                          for player in (self.__player1, self.__player2)
+                          if player.get_game_window() is not None]
+        self.__logging = bool(self.__windows) or self.__log is not None
+
+        opponent_window = self.get_opponent(turn).get_game_window()
+        if opponent_window is not None:
+            opponent_window.disable_buttons()
+
+        if self.__windows:
+            self.update_statistics()
+
+    def forfeit_game(self, player):
+        """
+        Handle the specified player forfeiting the game
+        :param player: Player,  the loser's player object
+        """
+
+        opponent = self.get_opponent(player)
+
+        # add log message to winner's game window
+        msg = f"{player} has forfeited the game.\n{opponent} is the winner!"
+        if self.__log is not None:
+            self.__log.append(msg)
+        opponent_window = opponent.get_game_window()
+        if opponent_window is not None:
+            opponent_window.append_log(msg)
+
+        # a forfeit after the game has already ended doesn't change the winner
+        if not self.__game_ended:
+            self.__winner = opponent
+            self.__game_ended = True
+            if self.__recorder is not None:
+                self.__recorder.game_ended(self, True)
+
+    def game_ended(self):
+        """
+        Returns whether the game has ended or not
+        :return: bool,  True    = game ended
+                        False   = game running
+        """
+
+        return self.__game_ended
+
+    def current_player(self):
+        """
+        Returns the player whose turn it is to fire
+        :return:    Player, player object, None if the game hasn't started
+        """
+
+        return self.__turn
+
+    def winner(self):
+        """
+        Returns the winner of the game
+        :return:    Player, winner's player object, None if there's no winner
+        """
+
+        return self.__winner
+
+    def declare_winner(self, player):
+        """
+        Declare the specified player as the winner of the game
+        :param player: Player, winner's player object
+        """
+
+        self.__winner = player
+        self.__game_ended = True
+
+        if self.__recorder is not None:
+            self.__recorder.game_ended(self, False)
+
+        if self.__windows:
+            self.update_statistics()
+
+        if self.__logging:
+            # add log message to both game windows
+            self.append_log(f"{player} has won the game!")
+
+    def fire_shot(self, x, y, firer):
+        """
+        Fires a shot on the opponents playing field
+        Returns whether it was a hit or not
+        :param x:       int,    opponent playing field x coordinate
+        :param y:       int,    opponent playing field y coordinate
+        :param firer:   Player, who fired the shot
+        :return:        bool,   True  = hit
+                                False = miss
+        """
+
+        if self.__game_ended:
+            raise ValueError("The game is not running")
+
+        if firer is not self.__turn:
+            raise ValueError(f"It is not {firer}'s turn")
+
+        opponent = self.get_opponent(firer)
+
+        # the playing fields are bitboards, a shot outside the field would
+        # set bits of other fields or fail in the shift
+        if not 0 <= x < opponent.get_width() \
+                or not 0 <= y < opponent.get_height():
+            raise ValueError(f"({x}, {y}) is outside the "
+                             f"{opponent.get_width()}x{opponent.get_height()} "
+                             "playing field")
+
+        field_state = opponent.field_state(x, y)
+
+        # only water or a non-hit ship part can be fired at
+        if field_state > 1:
+            raise ValueError(f"{field_name(x, y)} has already been fired at")
+
+        hit = field_state == 1
+
+        firer.increment_shots()
+
+        opponent.update_playing_field(x, y, hit)
+
+        # the turn passes to the opponent regardless of the result
+        self.__turn = opponent
+
+        if hit:
+            firer.increment_hits()
+            opponent.increment_hits_taken()
+
+            # get ship under these coordinates
+            ship = self.get_ship(x, y, opponent)
+
+            parts_left = ship.parts_left()
+            ship_parts_left = ship.assign_hit(x, y, self.__sink_from_one)
+            opponent.decrease_parts_left(str(ship),
+                                         parts_left - ship_parts_left)
+
+            # if ship has no parts left
+            sunk = ship_parts_left == 0
+
+            # the whole ship went down from one hit, so mark
+            # the rest of its parts hit on the playing field too
+            if sunk and self.__sink_from_one:
+                for coord_x, coord_y in ship.get_coords():
+                    opponent.update_playing_field(coord_x, coord_y, True)
+
+            if self.__recorder is not None:
+                self.__recorder.shot_fired(self, x, y,
+                                           SHOT_SUNK if sunk else SHOT_HIT)
+
+            if sunk:
+                # if the last ship was destroyed
+                if opponent.decrease_ship_count() == 0:
+                    if self.__logging:
+                        self.announce_shot(firer, x, y, hit, ship)
+                    self.declare_winner(firer)
+                    return hit
+
+            if self.__logging:
+                self.announce_shot(firer, x, y, hit, ship)
+        else:
+            if self.__recorder is not None:
+                self.__recorder.shot_fired(self, x, y, SHOT_MISS)
+
+            if self.__logging:
+                self.announce_shot(firer, x, y, hit)
+
+        if self.__windows:
+            self.update_statistics()
+
+        return hit
+
+    def announce_shot(self, firer, x, y, hit, ship=None):
+        """
+        Announces a hit or a miss to the game windows' logs
+        :param firer:   Player,     player object of the firer
+        :param x:       int,        playing field x coordinate
+        :param y:       int,        playing field x coordinate
+        :param hit:     bool,       True  = hit,    False = miss
+        :param ship:    Battleship, battleship object if there was a hit
+                                    defaults to None
+        """
+
+        msg = f"{firer} fired a shot on {field_name(x, y)}..."
+        if hit:
+            opponent = self.get_opponent(firer)
+            msg += f"\n{opponent}'s {ship} was HIT!"
+
+            # how many parts left in the ship
+            parts_left = ship.get_size() - ship.hits_taken()
+            if parts_left == 1:
+                msg += f"\nOne more hit and the {ship} will be destroyed!"
+            elif parts_left == 0:
+                ships_left = opponent.ships_left()
+
+                # add "only" if less than 3 ships, and don't add "s"
+                # to "ships" if only one ship left
+                msg += f"\n{ship} got destroyed! " \
+                       f"{'Only ' if ships_left < 3 else ''}{ships_left} " \
+                       f"ship{'s' if ships_left > 1 else ''} left!"
+        else:
+            msg += "\nMISS!"
+
+        # add log message to both game windows
+        self.append_log(msg)
+
+    def append_log(self, msg):
+        """
+        Appends the specified message to the log of each game window
+        and to the log of the game
+        :param msg:     str, message to append
+        """
+
+        if self.__log is not None:
+            self.__log.append(msg)
+
+        for window in self.__windows:
+            window.append_log(msg)
+
+    def update_statistics(self):
+        """
+        Produces the statistics to display for each player
+        """
+
+        # two players, update both statistics
+        for player in (self.__player1, self.__player2):
+            game_window = player.get_game_window()
+            if game_window is None:
+                continue
+
+            # only refresh windows whose statistics have changed
+            statistics = player.statistics()
+            if self.__shown_statistics.get(player) == statistics:
+                continue
+            self.__shown_statistics[player] = statistics
+
+            shots_fired, shots_hit, hits_taken, ships_left, ship_parts_left \
+                = statistics
+            shots_missed = shots_fired - shots_hit
+
+            if shots_fired == 0:
+                hit_percent = "0 %"
+                miss_percent = "0 %"
+            else:
+                hit_percent = f"{int(shots_hit / shots_fired * 100)} %"
+                miss_percent = f"{int(shots_missed / shots_fired * 100)} %"
+
+            stats = f"Shots fired: {shots_fired}\n" \
+                    f"Shots hit: {shots_hit} ({hit_percent})\n" \
+                    f"Shots missed: {shots_missed} ({miss_percent})\n" \
+                    f"Hits taken: {hits_taken}\n" \
+                    f"Ships left: {ships_left}\n" \
+                    f"Ship parts left: {ship_parts_left}"
+
+            game_window.update_stats(stats)
+
+    def get_ship(self, x, y, owner):
+        """
+        Gets the ship at these xy coordinates
+        Optionally get the opponent's ship
+        :param x:           int,        x coordinate
+        :param y:           int,        y coordinate
+        :param owner:       Player,     player object, owner of the ship
+        :return:            Battleship, battleship object
+        """
+
+        return owner.get_ship(x, y)
+
+
+class RecorderGroup:
+    """
+    Tells several recorders about a game, pass it to GameLogic as the
+    recorder
+    """
+
+    def __init__(self, *recorders):
+        """
+        Constructor
+        :param recorders:   object, the recorders, None ones are skipped
+        """
+
+        self.__recorders = [recorder for recorder in recorders
+                            if recorder is not None]
+
+    def game_started(self, game, starter):
+        """
+        Tells the recorders about the start of a game
+        :param game:    GameLogic,  the game
+        :param starter: Player,     player who gets the first turn
+        """
+
+        for recorder in self.__recorders:
+            recorder.game_started(game, starter)
+
+    def shot_fired(self, game, x, y, result):
+        """
+        Tells the recorders about a shot
+        :param game:    GameLogic,  the game
+        :param x:       int,        playing field x coordinate
+        :param y:       int,        playing field y coordinate
+        :param result:  int,        one of SHOT_*
+        """
+
+        for recorder in self.__recorders:
+            recorder.shot_fired(game, x, y, result)
+
+    def game_ended(self, game, forfeited):
+        """
+        Tells the recorders about the end of a game
+        :param game:        GameLogic,  the game
+        :param forfeited:   bool,       True = the loser forfeited
+        """
+
+        for recorder in self.__recorders:
+            recorder.game_ended(game, forfeited)
+
+
+def get_column(array, x, start, end):
+    """
+    Gets values from a column in a matrix/2d array
+    :param array:   array, array to get values from
+    :param x:       int, x coordinate
+    :param start:   int, zero-based y start value
+    :param end:     int, zero-based y end value
+    :return:        array, values from the column
+    """
+    return [row[x] for row in array[start:end + 1]]
+
+
+def join_rows(rows, width):
+    """
+    Joins bitboard rows into one bitboard of the whole playing field
+    :param rows:    list,   int for each row
+    :param width:   int,    playing field width
+    :return:        int,    bit y * width + x set if bit x of row y is set
+    """
+
+    # join halves recursively, so each bit is only shifted a
+    # logarithmic amount of times
+    if len(rows) == 1:
+        return rows[0]
+    if not rows:
+        return 0
+
+    middle = len(rows) // 2
+    return join_rows(rows[:middle], width) \
+        | join_rows(rows[middle:], width) << (middle * width)
+
+
+def column_name(x):
+    """
+    Returns the name of a playing field column
+    A, B, ..., Z, AA, AB, ..., ZZ, AAA, ...
+    :param x:   int, playing field x coordinate
+    :return:    str, name of column
+    """
+
+    name = ""
+    x += 1
+    while x > 0:
+        x, letter = divmod(x - 1, 26)
+        name = chr(ord("A") + letter) + name
+
+    return name
+
+
+def field_name(x, y):
+    """
+    Returns the name of a playing field field from its x and y coordinates
+    e.g. A7, G8, B3,.., AB12
+    :param x:   int, playing field x coordinate
+    :param y:   int, playing field y coordinate
+    :return:    str, name of field
+    """
+
+    return f"{column_name(x)}{y + 1}"
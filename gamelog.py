@@ -0,0 +1,183 @@
+"""
+Battleships game logs
+
+A game log keeps only the last messages of a game in a ring buffer, so a
+long game on a large playing field takes constant memory no matter how many
+shots are fired. The full history can be appended to a file by a LogHistory,
+which writes in a background thread so the game never waits for the disk.
+
+    with LogHistory("game_logs.txt") as history:
+        log = GameLog(500, history)
+        game = GameLogic(False, player1, player2, log=log)
+        ...
+        log.get_text()
+
+Views of a log, e.g. the log fields of the game windows, compare total()
+with the number of messages they've shown and take only the new ones with
+latest(), see GameWindow.update_log in battleships.py.
+"""
+
+import collections
+import queue
+import threading
+
+
+# messages kept by default
+DEFAULT_CAPACITY = 1000
+
+# separates the messages of a log as text
+SEPARATOR = "\n---\n"
+
+
+def format_entry(msg):
+    """
+    Formats a log message as text
+    :param msg:     str,    the message
+    :return:        str,    the message followed by the separator
+    """
+
+    return msg + SEPARATOR
+
+
+class GameLog:
+    """
+    The last messages of a game
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, history=None):
+        """
+        Constructor, creates an empty log
+        :param capacity:    int,        how many of the last messages are kept
+        :param history:     LogHistory, gets every message, defaults to None
+        """
+
+        self.__messages = collections.deque(maxlen=capacity)
+        self.__history = history
+
+        # messages ever appended, including the ones dropped since
+        self.__total = 0
+
+    def append(self, msg):
+        """
+        Appends a message, dropping the oldest one if the log is full
+        :param msg:     str,    the message
+        """
+
+        self.__messages.append(msg)
+        self.__total += 1
+
+        if self.__history is not None:
+            self.__history.write(format_entry(msg))
+
+    def load(self, text):
+        """
+        Replaces the messages with the ones of a log text, e.g. the log of a
+        resumed game. The history isn't told about them.
+        :param text:    str,    log text, see get_text
+        """
+
+        self.__messages.clear()
+        for msg in text.split(SEPARATOR):
+            if msg.strip():
+                self.__messages.append(msg)
+        self.__total += len(self.__messages)
+
+    def latest(self, count):
+        """
+        Returns the newest messages
+        :param count:   int,    how many, at most the capacity
+        :return:        list,   the messages, oldest first
+        """
+
+        count = min(count, len(self.__messages))
+        return [self.__messages[index]
+                for index in range(len(self.__messages) - count,
+                                   len(self.__messages))]
+
+    def get_text(self):
+        """
+        Returns the messages kept as text
+        :return:    str,    each message followed by the separator
+        """
+
+        return "".join(format_entry(msg) for msg in self.__messages)
+
+    def capacity(self):
+        """
+        Returns how many messages are kept
+        :return:    int,    the capacity
+        """
+
+        return self.__messages.maxlen
+
+    def total(self):
+        """
+        Returns how many messages have been appended
+        :return:    int,    including the messages dropped since
+        """
+
+        return self.__total
+
+    def __len__(self):
+        return len(self.__messages)
+
+
+class LogHistory:
+    """
+    Appends the messages of game logs to a file in a background thread
+    """
+
+    def __init__(self, path):
+        """
+        Constructor, opens the file and starts the writing thread
+        :param path:    str,    path of the file, appended to if it exists
+        """
+
+        self.__file = open(path, "a", encoding="utf-8")
+        self.__queue = queue.SimpleQueue()
+        self.__thread = threading.Thread(target=self.write_queued,
+                                         daemon=True)
+        self.__thread.start()
+
+    def write(self, text):
+        """
+        Queues text to be written
+        :param text:    str,    the text
+        """
+
+        self.__queue.put(text)
+
+    def write_queued(self):
+        """
+        Writes the queued text until the history is closed,
+        run in the background thread
+        """
+
+        while True:
+            texts = [self.__queue.get()]
+            # write everything queued meanwhile at once
+            while not self.__queue.empty():
+                texts.append(self.__queue.get())
+
+            closing = None in texts
+            self.__file.write("".join(text for text in texts
+                                      if text is not None))
+            self.__file.flush()
+            if closing:
+                return
+
+    def close(self):
+        """
+        Writes the queued text and closes the file
+        """
+
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,270 @@
+"""
+Latency instrumentation for the Battleships gui
+
+Measures how long the gui takes to react to the player: the wall-clock time
+of each instrumented callback, how many widget configure calls it made and
+how late the Tk event loop runs its timers. Everything goes into histograms,
+which can be printed at any time, e.g. on exit or from a hotkey.
+
+    monitor = LatencyMonitor()
+    monitor.instrument(GameWindow, "field_button", "shot fired")
+    monitor.watch(root_window)
+    ...
+    monitor.dump()
+
+Instrumenting replaces the method on the class, so it has to be done before
+the windows pass their bound methods to Tk as commands. Configure calls are
+counted by wrapping the configure methods of tkinter itself, so the counts
+include the calls made by the boards, see boards.py.
+"""
+
+import functools
+import sys
+import time
+import tkinter
+
+
+# upper bounds of the histogram buckets of milliseconds, the last bucket
+# holds everything slower
+LATENCY_BOUNDS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# upper bounds of the histogram buckets of configure calls per callback
+CONFIG_CALL_BOUNDS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+# milliseconds between the event loop lag probes
+LAG_PROBE_INTERVAL = 100
+
+# key that prints the histograms in a watched window
+DUMP_KEY = "<F12>"
+
+# width of the longest bar when printing a histogram
+BAR_WIDTH = 40
+
+# tkinter methods counted as configure calls, as (class, method name)
+CONFIG_METHODS = ((tkinter.Misc, "configure"), (tkinter.Misc, "config"),
+                  (tkinter.Canvas, "itemconfigure"),
+                  (tkinter.Canvas, "itemconfig"))
+
+
+class Histogram:
+    """
+    Counts of values in fixed buckets, e.g. milliseconds
+    """
+
+    def __init__(self, name, bounds, unit):
+        """
+        Constructor, creates an empty histogram
+        :param name:    str,    what is measured
+        :param bounds:  tuple,  upper bounds of the buckets, ascending
+        :param unit:    str,    unit of the values, e.g. "ms"
+        """
+
+        self.__name = name
+        self.__bounds = bounds
+        self.__unit = unit
+
+        # one bucket per bound and one for the values above the last bound
+        self.__counts = [0] * (len(bounds) + 1)
+        self.__count = 0
+        self.__total = 0
+        self.__max = 0
+
+    def add(self, value):
+        """
+        Counts a value
+        :param value:   float,  the value
+        """
+
+        index = 0
+        while index < len(self.__bounds) and value > self.__bounds[index]:
+            index += 1
+        self.__counts[index] += 1
+        self.__count += 1
+        self.__total += value
+        self.__max = max(self.__max, value)
+
+    def count(self):
+        """
+        Returns how many values have been counted
+        :return:    int,    number of values
+        """
+
+        return self.__count
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the bucket holding a percentile
+        :param percent: float,  0-100
+        :return:        float,  the bound, the maximum for the last bucket,
+                                0 if the histogram is empty
+        """
+
+        needed = self.__count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.__counts):
+            seen += count
+            if count and seen >= needed:
+                if index < len(self.__bounds):
+                    return min(self.__bounds[index], self.__max)
+                return self.__max
+        return 0
+
+    def format(self):
+        """
+        Formats the histogram as text
+        :return:    str,    a summary line and one bar per bucket in use
+        """
+
+        if not self.__count:
+            return f"{self.__name}: no samples\n"
+
+        unit = f" {self.__unit}" if self.__unit else ""
+        lines = [f"{self.__name}: {self.__count} samples, "
+                 f"mean {self.__total / self.__count:.3g}{unit}, "
+                 f"p50 <= {self.percentile(50):.3g}{unit}, "
+                 f"p90 <= {self.percentile(90):.3g}{unit}, "
+                 f"p99 <= {self.percentile(99):.3g}{unit}, "
+                 f"max {self.__max:.3g}{unit}"]
+
+        # leave out the empty buckets below and above the values
+        used = [index for index, count in enumerate(self.__counts) if count]
+        largest = max(self.__counts)
+        for index in range(used[0], used[-1] + 1):
+            if index < len(self.__bounds):
+                label = f"<= {self.__bounds[index]:g}"
+            else:
+                label = f"> {self.__bounds[-1]:g}"
+            bar = "#" * round(self.__counts[index] / largest * BAR_WIDTH)
+            lines.append(f"  {label + unit:>12}{self.__counts[index]:>8} "
+                         f"{bar}")
+        return "\n".join(lines) + "\n"
+
+
+class LatencyMonitor:
+    """
+    Histograms of the latency of gui callbacks and of the event loop
+    """
+
+    def __init__(self):
+        """
+        Constructor, starts counting the configure calls of tkinter
+        """
+
+        # histograms by name, in the order they were created
+        self.__histograms = {}
+
+        self.__config_calls = 0
+        for cls, name in CONFIG_METHODS:
+            setattr(cls, name, self.count_config_calls(getattr(cls, name)))
+
+        # the watched window and its probe, a new watch ends the old probe
+        self.__window = None
+        self.__probe = 0
+
+    def histogram(self, name, bounds=LATENCY_BOUNDS, unit="ms"):
+        """
+        Returns a histogram, creating it if needed
+        :param name:    str,        what is measured
+        :param bounds:  tuple,      upper bounds of the buckets
+        :param unit:    str,        unit of the values
+        :return:        Histogram,  the histogram
+        """
+
+        if name not in self.__histograms:
+            self.__histograms[name] = Histogram(name, bounds, unit)
+        return self.__histograms[name]
+
+    def count_config_calls(self, method):
+        """
+        Wraps a tkinter configure method to count its calls
+        :param method:  function,   the method
+        :return:        function,   the counting method
+        """
+
+        @functools.wraps(method)
+        def counted(*args, **kwargs):
+            self.__config_calls += 1
+            return method(*args, **kwargs)
+
+        return counted
+
+    def instrument(self, cls, method_name, name=None):
+        """
+        Replaces a method of a class with one that measures its calls
+        :param cls:         class,  e.g. GameWindow
+        :param method_name: str,    name of the method, e.g. "field_button"
+        :param name:        str,    name of the histograms, defaults to
+                                    Class.method
+        """
+
+        if name is None:
+            name = f"{cls.__name__}.{method_name}"
+        latency = self.histogram(f"{name} latency")
+        config_calls = self.histogram(f"{name} config calls",
+                                      CONFIG_CALL_BOUNDS, "")
+        method = getattr(cls, method_name)
+
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            calls = self.__config_calls
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                latency.add((time.perf_counter() - started) * 1000)
+                config_calls.add(self.__config_calls - calls)
+
+        setattr(cls, method_name, measured)
+
+    def watch(self, window):
+        """
+        Starts probing the event loop lag of a window and binds the dump key
+        in it. Replaces the previously watched window.
+        :param window:  Tk,     the window
+        """
+
+        self.__window = window
+        self.__probe += 1
+        window.bind_all(DUMP_KEY, lambda event: self.dump())
+        window.after(LAG_PROBE_INTERVAL, self.probe_lag, self.__probe,
+                     time.perf_counter() + LAG_PROBE_INTERVAL / 1000)
+
+    def probe_lag(self, probe, expected):
+        """
+        Records how late the event loop ran a timer and schedules the next
+        one, run by the watched window
+        :param probe:       int,    which watch scheduled the timer
+        :param expected:    float,  when the timer should have run, see
+                                    time.perf_counter
+        """
+
+        if probe != self.__probe:
+            return
+
+        now = time.perf_counter()
+        self.histogram("event loop lag").add(max(0, now - expected) * 1000)
+        try:
+            self.__window.after(LAG_PROBE_INTERVAL, self.probe_lag, probe,
+                                now + LAG_PROBE_INTERVAL / 1000)
+        except tkinter.TclError:
+            # the window was destroyed
+            pass
+
+    def format(self):
+        """
+        Formats all histograms as text
+        :return:    str,    the histograms
+        """
+
+        return "\n".join(histogram.format()
+                         for histogram in self.__histograms.values()
+                         if histogram.count())
+
+    def dump(self, file=None):
+        """
+        Prints all histograms
+        :param file:    file,   where to, defaults to stderr
+        """
+
+        print("Gui latency:", file=file or sys.stderr)
+        print(self.format() or "no samples", file=file or sys.stderr)
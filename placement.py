@@ -0,0 +1,784 @@
+"""
+Battleship placement rules
+
+Keeps track of where ships can legally be placed on a playing field.
+Ships can't overlap or touch each other, but their corners may touch.
+Doesn't depend on tkinter, so it can be used by the gui as well as by
+anything placing ships automatically.
+"""
+
+import random
+import time
+from functools import lru_cache
+from math import log
+
+
+class PlacementTable:
+    """
+    Models the legal ship origins of a playing field
+
+    For each ship size the table holds the valid orientations of a ship
+    with its origin (top left part) at each field. The table is updated
+    incrementally as ships are placed, only the fields within the touch
+    radius of a new ship are looked at.
+    """
+
+    def __init__(self, width, height, sizes):
+        """
+        Constructor, creates a placement table for an empty playing field
+        :param width:   int,        playing field width
+        :param height:  int,        playing field height
+        :param sizes:   iterable,   ship sizes to keep track of
+        """
+
+        self.__width = width
+        self.__height = height
+
+        # one byte per field, index is y * width + x
+        # 1 = field is a ship part
+        self.__ship_parts = bytearray(width * height)
+
+        # 1 = field is a ship part or orthogonally next to one,
+        # no new ship part can go here
+        self.__blocked = bytearray(width * height)
+
+        # valid orientations of each field for each ship size
+        # same bits as in ArrangeShipsWindow.check_placement
+        # high bit set for horizontal placement
+        # low bit set for vertical placement
+        self.__origins = {}
+
+        # count of valid (origin, orientation) pairs for each ship size
+        self.__counts = {}
+
+        # the valid pairs of each ship size as a list, so a random one can
+        # be picked in constant time, and the position of each pair in it.
+        # A pair is index * 2 + 1 if vertical, else index * 2. Removed
+        # pairs are swapped with the last one. Built on the first random
+        # pick, tables not used for random placement don't pay for them.
+        self.__legal = None
+        self.__legal_positions = None
+
+        for size in set(sizes):
+            # ships of size one are only placed "vertically"
+            horizontal = size > 1
+            horizontal_fields = max(0, width - size + 1) if horizontal else 0
+
+            # a row of origins is the same for every row the ship fits
+            # vertically in, and for every row it doesn't
+            row = bytearray(width)
+            row[:horizontal_fields] = b"\x02" * horizontal_fields
+            low_row = bytes(row)
+            for x in range(width):
+                row[x] |= 0b01
+            top_rows = max(0, height - size + 1)
+
+            self.__origins[size] = bytearray(row) * top_rows \
+                + bytearray(low_row) * (height - top_rows)
+            self.__counts[size] = top_rows * width \
+                + height * horizontal_fields
+
+    def orientations(self, x, y, size):
+        """
+        Returns the valid orientations for a ship of the specified size
+        with its origin at the specified coordinates
+        :param x:       int,    x-coordinate
+        :param y:       int,    y-coordinate
+        :param size:    int,    size of the ship
+        :return:        int,    high bit set for horizontal placement
+                                low bit set for vertical placement
+        """
+
+        return self.__origins[size][y * self.__width + x]
+
+    def is_ship_part(self, x, y):
+        """
+        Returns whether a ship part has been placed at the coordinates
+        :param x:       int,    x-coordinate
+        :param y:       int,    y-coordinate
+        :return:        bool,   True = ship part
+        """
+
+        return self.__ship_parts[y * self.__width + x] == 1
+
+    def placement_count(self, size):
+        """
+        Returns how many legal placements there are for a ship of the
+        specified size
+        :param size:    int,    size of the ship
+        :return:        int,    count of (origin, orientation) pairs
+        """
+
+        return self.__counts[size]
+
+    def random_placement(self, size, rng=random):
+        """
+        Picks one of the legal placements for a ship of the specified size,
+        each with the same probability
+        :param size:    int,            size of the ship
+        :param rng:     random.Random,  random number generator to use
+        :return:        tuple,          (x, y, vertical),
+                                        None if there is no legal placement
+        """
+
+        if self.__legal is None:
+            self.__build_legal()
+
+        legal = self.__legal[size]
+        if not legal:
+            return None
+
+        index, vertical = divmod(legal[int(rng.random() * len(legal))], 2)
+        y, x = divmod(index, self.__width)
+        return x, y, vertical == 1
+
+    def __build_legal(self):
+        """
+        Builds the lists of legal placements from the origins
+        """
+
+        self.__legal = {}
+        self.__legal_positions = {}
+
+        for size, origins in self.__origins.items():
+            legal = [index * 2 + vertical
+                     for index, orientations in enumerate(origins)
+                     if orientations
+                     for vertical in (0, 1)
+                     if orientations & (0b10 >> vertical)]
+            positions = [0] * (len(origins) * 2)
+            for position, pair in enumerate(legal):
+                positions[pair] = position
+
+            self.__legal[size] = legal
+            self.__legal_positions[size] = positions
+
+    def legal_placements(self, size):
+        """
+        Generates all legal placements for a ship of the specified size
+        :param size:    int,    size of the ship
+        :return:        generator of tuples (x, y, vertical)
+        """
+
+        width = self.__width
+        origins = self.__origins[size]
+
+        for index in range(len(origins)):
+            orientations = origins[index]
+            if orientations:
+                y, x = divmod(index, width)
+                if orientations & 0b10:
+                    yield x, y, False
+                if orientations & 0b01:
+                    yield x, y, True
+
+    def place(self, x, y, size, vertical):
+        """
+        Places a ship and removes the placements it makes illegal
+        The placement itself isn't checked, see orientations
+        :param x:           int,    ship origin x-coordinate
+        :param y:           int,    ship origin y-coordinate
+        :param size:        int,    size of the ship
+        :param vertical:    bool,   True  = placed vertically
+                                    False = placed horizontally
+        """
+
+        width = self.__width
+        height = self.__height
+        blocked = self.__blocked
+
+        for i in range(size):
+            part_x = x + (0 if vertical else i)
+            part_y = y + (i if vertical else 0)
+            self.__ship_parts[part_y * width + part_x] = 1
+
+            # the part itself and its orthogonal neighbours
+            for field_x, field_y in ((part_x, part_y),
+                                     (part_x - 1, part_y),
+                                     (part_x + 1, part_y),
+                                     (part_x, part_y - 1),
+                                     (part_x, part_y + 1)):
+                if 0 <= field_x < width and 0 <= field_y < height \
+                        and not blocked[field_y * width + field_x]:
+                    blocked[field_y * width + field_x] = 1
+                    self.__block(field_x, field_y)
+
+    def __block(self, x, y):
+        """
+        Removes every placement that would cover the specified field
+        :param x:   int,    x-coordinate of the newly blocked field
+        :param y:   int,    y-coordinate of the newly blocked field
+        """
+
+        width = self.__width
+        legal = self.__legal
+
+        for size, origins in self.__origins.items():
+            # removed pairs, see self.__legal
+            removed = []
+
+            # horizontal ships with their origin at most size - 1 to the left
+            if size > 1:
+                for origin_x in range(max(0, x - size + 1), x + 1):
+                    index = y * width + origin_x
+                    if origins[index] & 0b10:
+                        origins[index] &= 0b01
+                        removed.append(index * 2)
+
+            # vertical ships with their origin at most size - 1 above
+            for origin_y in range(max(0, y - size + 1), y + 1):
+                index = origin_y * width + x
+                if origins[index] & 0b01:
+                    origins[index] &= 0b10
+                    removed.append(index * 2 + 1)
+
+            self.__counts[size] -= len(removed)
+
+            if legal is not None:
+                size_legal = legal[size]
+                positions = self.__legal_positions[size]
+                for pair in removed:
+                    # swap the last pair in the removed one's place
+                    last = size_legal.pop()
+                    if last != pair:
+                        position = positions[pair]
+                        size_legal[position] = last
+                        positions[last] = position
+
+    def copy(self):
+        """
+        Returns an independent copy of this table
+        :return:    PlacementTable, the copy
+        """
+
+        table = PlacementTable.__new__(PlacementTable)
+        table.__width = self.__width
+        table.__height = self.__height
+        table.__ship_parts = bytearray(self.__ship_parts)
+        table.__blocked = bytearray(self.__blocked)
+        table.__origins = {size: bytearray(origins)
+                           for size, origins in self.__origins.items()}
+        table.__counts = dict(self.__counts)
+        table.__legal = None
+        table.__legal_positions = None
+        if self.__legal is not None:
+            table.__legal = {size: list(legal)
+                             for size, legal in self.__legal.items()}
+            table.__legal_positions = {size: list(positions)
+                                       for size, positions
+                                       in self.__legal_positions.items()}
+        return table
+
+
+def find_fleet_placement(width, height, sizes, max_states=100000):
+    """
+    Finds a legal placement for a whole fleet, which proves the fleet fits
+    on the playing field. First tries placing the ships greedily, then
+    searches exhaustively.
+
+    The exhaustive search goes through the fields in reading order and at
+    each field either starts a ship there, continues a ship started
+    earlier or leaves the field empty. Everything before the current
+    field is settled, so a search state is fully described by the current
+    field, the row profile (what is in the last field of each column, see
+    below) and the ships still to be placed. States known to lead nowhere
+    are memoized and never searched twice.
+    :param width:       int,    playing field width
+    :param height:      int,    playing field height
+    :param sizes:       list,   size of each ship in the fleet
+    :param max_states:  int,    how many search states to try at most
+    :return:            list,   tuples (x, y, size, vertical), one for each
+                                ship, None if the fleet can't fit
+    """
+
+    # quick checks for obviously impossible fleets
+    if not sizes:
+        return []
+    if max(sizes) > max(width, height) \
+            or sum(sizes) > block_capacity(width, height):
+        return None
+
+    for vertical_first in (False, True):
+        placement = greedy_fleet_placement(width, height, sizes,
+                                           vertical_first)
+        if placement is not None:
+            return placement
+
+    field_count = width * height
+    distinct_sizes = sorted(set(sizes), reverse=True)
+    largest = distinct_sizes[0]
+    start_counts = tuple(sizes.count(size) for size in distinct_sizes)
+
+    # the row profile holds one code per column for the last field searched
+    # in it: 0 = water, 1 = a ship part with nothing following,
+    # 2 to largest = a horizontal ship with code - 1 parts still to the
+    # right, above largest = a vertical ship with code - largest parts
+    # still below
+
+    def children(position, profile, counts):
+        """
+        Generates the states following a state with the ship started at
+        the current field, if any, ships first
+        """
+
+        y, x = divmod(position, width)
+        above = profile[x]
+        left = profile[x - 1] if x else 0
+        before = profile[:x]
+        after = profile[x + 1:]
+
+        # a vertical ship continues, nothing may touch it from the left
+        if above > largest:
+            if not left:
+                code = above - 1 if above > largest + 1 else 1
+                yield (position + 1, before + (code,) + after, counts), None
+            return
+
+        # a horizontal ship continues, nothing may touch it from above
+        if left > 1:
+            if not above:
+                code = left - 1 if left > 2 else 1
+                yield (position + 1, before + (code,) + after, counts), None
+            return
+
+        # a ship may start only where it touches no other ship
+        if not above and not left:
+            for index, size in enumerate(distinct_sizes):
+                if not counts[index]:
+                    continue
+
+                new_counts = counts[:index] + (counts[index] - 1,) \
+                    + counts[index + 1:]
+
+                # ships of size one are only placed "vertically"
+                if size == 1:
+                    yield (position + 1, before + (1,) + after, new_counts), \
+                        (x, y, 1, True)
+                    continue
+                if x + size <= width:
+                    yield (position + 1, before + (size,) + after,
+                           new_counts), (x, y, size, False)
+                if y + size <= height:
+                    yield (position + 1,
+                           before + (largest + size - 1,) + after,
+                           new_counts), (x, y, size, True)
+
+        yield (position + 1, before + (0,) + after, counts), None
+
+    # room left for ship parts from each field on, the rest of the row
+    # plus the rows below
+    rest_capacity = [width - x + block_capacity(width, height - y - 1)
+                     for y in range(height) for x in range(width)]
+
+    def parts_left(position, profile, counts):
+        """
+        Returns how many ship parts are still to be placed from a field on,
+        those of the ships left and those of the ships started earlier
+        """
+
+        parts = sum(count * size
+                    for count, size in zip(counts, distinct_sizes))
+        parts += sum(code - largest for code in profile if code > largest)
+        if position % width:
+            left = profile[position % width - 1]
+            if 1 < left <= largest:
+                parts += left - 1
+        return parts
+
+    start = (0, (0,) * width, start_counts)
+    failed = set()
+    stack = [(start, children(*start), None)]
+    states = 0
+
+    while stack:
+        state, state_children, _ = stack[-1]
+        child, ship = next(state_children, (None, None))
+
+        # every way forward from this state has been tried
+        if child is None:
+            failed.add(state)
+            stack.pop()
+            continue
+
+        position, profile, counts = child
+        parts = parts_left(position, profile, counts)
+        if not parts:
+            return [placed for _, _, placed in stack if placed is not None] \
+                + ([ship] if ship is not None else [])
+
+        if position >= field_count or child in failed \
+                or parts > rest_capacity[position]:
+            continue
+
+        states += 1
+        if states > max_states:
+            raise RuntimeError("Fleet feasibility search ran out of states")
+
+        stack.append((child, children(*child), ship))
+
+    return None
+
+
+def block_capacity(width, height):
+    """
+    Returns how many ship parts fit on a playing field at most. Ships
+    can't touch each other, so any 2x2 block of fields holds at most two
+    ship parts, and so does a 2x1 block left over at an odd width. A row
+    left over at an odd height may be full.
+    :param width:   int,    playing field width
+    :param height:  int,    playing field height
+    :return:        int,    the upper bound
+    """
+
+    if height <= 0:
+        return 0
+    if height == 1:
+        return width
+    if width == 1:
+        return height
+
+    return height // 2 * 2 * ((width + 1) // 2) + height % 2 * width
+
+
+def greedy_fleet_placement(width, height, sizes, vertical_first=False):
+    """
+    Tries to place a fleet by putting each ship, largest first, at the
+    first legal placement. Fast, but may fail on fleets that do fit.
+    :param width:           int,    playing field width
+    :param height:          int,    playing field height
+    :param sizes:           list,   size of each ship in the fleet
+    :param vertical_first:  bool,   True  = prefer vertical placements
+                                    False = prefer horizontal placements
+    :return:                list,   tuples (x, y, size, vertical), one for
+                                    each ship, None if the greedy placement
+                                    failed
+    """
+
+    table = PlacementTable(width, height, sizes)
+    placement = []
+
+    for size in sorted(sizes, reverse=True):
+        legal = None
+        for x, y, vertical in table.legal_placements(size):
+            if vertical == vertical_first or size == 1:
+                legal = x, y, vertical
+                break
+            if legal is None:
+                legal = x, y, vertical
+        if legal is None:
+            return None
+
+        x, y, vertical = legal
+        table.place(x, y, size, vertical)
+        placement.append((x, y, size, vertical))
+
+    return placement
+
+
+# largest playing field (width * height) placed with precomputed bitmasks
+# of every placement, larger ones only keep track of their blocked fields
+MAX_MASKED_FIELDS = 1600
+
+# random placements tried before looking through all of them for legal ones
+RANDOM_TRIES = 8
+
+# seconds random_fleet_placement keeps starting fleets over at most
+RANDOM_TIME_LIMIT = 2.0
+
+
+def random_fleet_placement(width, height, sizes, rng=random, uniform=False,
+                           max_attempts=10000, time_limit=RANDOM_TIME_LIMIT):
+    """
+    Places a fleet at random, largest ship first, each ship at a legal
+    placement picked uniformly. Every ship placed excludes the placements
+    it makes illegal, so nothing is retried unless an earlier ship took
+    the last room of a later one. Then the fleet starts over.
+
+    By default the layouts aren't exactly uniform: layouts where the ships
+    had less room to choose from are more likely. With uniform set, each
+    fleet is accepted with a probability proportional to the product of
+    the placement counts it was picked from, which cancels that out and
+    makes every legal layout equally likely. The product can only shrink,
+    so a fleet is given up on as soon as it can't reach the acceptance
+    threshold anymore.
+    :param width:           int,            playing field width
+    :param height:          int,            playing field height
+    :param sizes:           list,           size of each ship in the fleet
+    :param rng:             random.Random,  random number generator to use
+    :param uniform:         bool,           True = every legal layout is
+                                            equally likely
+    :param max_attempts:    int,            how many fleets to start at most
+    :param time_limit:      float,          seconds after which no more
+                                            fleets are started
+    :return:                list,           tuples (x, y, size, vertical),
+                                            one for each ship
+    """
+
+    sizes = sorted(sizes, reverse=True)
+
+    # log of the largest product of placement counts the ships after
+    # each ship can still reach, the counts on an empty playing field
+    rest_bounds = [0.0] * (len(sizes) + 1)
+    for i in range(len(sizes) - 1, -1, -1):
+        size = sizes[i]
+        count = max(0, height - size + 1) * width
+        if size > 1:
+            count += max(0, width - size + 1) * height
+        if not count:
+            raise RuntimeError("Fleet doesn't fit on the playing field")
+        rest_bounds[i] = rest_bounds[i + 1] + log(count)
+
+    if width * height <= MAX_MASKED_FIELDS:
+        place_fleet = masked_fleet_attempt
+    else:
+        place_fleet = sparse_fleet_attempt
+
+    deadline = time.perf_counter() + time_limit
+    for _ in range(max_attempts):
+        if time.perf_counter() > deadline:
+            break
+
+        # the fleet is accepted if the log of its placement count product
+        # reaches this
+        threshold = log(1.0 - rng.random()) + rest_bounds[0] \
+            if uniform else None
+
+        placement = place_fleet(width, height, sizes, rng, threshold,
+                                rest_bounds)
+        if placement is not None:
+            return placement
+
+    raise RuntimeError("Couldn't place the fleet randomly")
+
+
+def masked_fleet_attempt(width, height, sizes, rng, threshold, rest_bounds):
+    """
+    Makes one attempt of random_fleet_placement with the bitmasks of
+    placement_masks
+    :param width:       int,            playing field width
+    :param height:      int,            playing field height
+    :param sizes:       list,           ship sizes, largest first
+    :param rng:         random.Random,  random number generator to use
+    :param threshold:   float,          uniform acceptance threshold,
+                                        None = accept any fleet
+    :param rest_bounds: list,           see random_fleet_placement
+    :return:            list,           tuples (x, y, size, vertical),
+                                        None if the attempt failed
+    """
+
+    blocked = 0
+    weight = 0.0
+    placement = []
+
+    for i, size in enumerate(sizes):
+        masks = placement_masks(width, height, size)
+
+        picked = None
+        if threshold is None:
+            # on a sparse field a few random tries find a legal placement
+            for _ in range(RANDOM_TRIES):
+                mask = masks[int(rng.random() * len(masks))]
+                if not mask[0] & blocked:
+                    picked = mask
+                    break
+
+        if picked is None:
+            legal = [mask for mask in masks if not mask[0] & blocked]
+            if not legal:
+                return None
+
+            if threshold is not None:
+                weight += log(len(legal))
+                if weight + rest_bounds[i + 1] < threshold:
+                    return None
+
+            picked = legal[int(rng.random() * len(legal))]
+
+        blocked |= picked[1]
+        placement.append(picked[2])
+
+    return placement
+
+
+def sparse_fleet_attempt(width, height, sizes, rng, threshold, rest_bounds):
+    """
+    Makes one attempt of random_fleet_placement for playing fields too
+    large for bitmasks of every placement. Only the blocked fields are
+    stored, and a ship's legal placements are counted by subtracting the
+    placements covering a blocked field from all of its placements.
+    :param width:       int,            playing field width
+    :param height:      int,            playing field height
+    :param sizes:       list,           ship sizes, largest first
+    :param rng:         random.Random,  random number generator to use
+    :param threshold:   float,          uniform acceptance threshold,
+                                        None = accept any fleet
+    :param rest_bounds: list,           see random_fleet_placement
+    :return:            list,           tuples (x, y, size, vertical),
+                                        None if the attempt failed
+    """
+
+    # index is y * width + x
+    blocked = set()
+    weight = 0.0
+    placement = []
+
+    # placements with a part on a blocked field, by ship size, kept up to
+    # date as fields are blocked once a size has needed them
+    covering = {}
+
+    def add_covering(size_covering, size, index):
+        """
+        Adds the placements of a ship size covering a field
+        """
+
+        y, x = divmod(index, width)
+        for part in range(size):
+            if size > 1 and 0 <= x - part <= width - size:
+                size_covering.add((x - part, y, False))
+            if 0 <= y - part <= height - size:
+                size_covering.add((x, y - part, True))
+
+    for i, size in enumerate(sizes):
+        horizontal_count = max(0, width - size + 1) * height \
+            if size > 1 else 0
+        count = horizontal_count + max(0, height - size + 1) * width
+
+        def random_placement():
+            """
+            Returns a placement picked uniformly among all placements
+            """
+
+            number = int(rng.random() * count)
+            if number < horizontal_count:
+                y, x = divmod(number, width - size + 1)
+                return x, y, False
+            y, x = divmod(number - horizontal_count, width)
+            return x, y, True
+
+        def legal(x, y, vertical):
+            """
+            Returns whether the placement covers no blocked field
+            """
+
+            origin = y * width + x
+            step = width if vertical else 1
+            return all(origin + part * step not in blocked
+                       for part in range(size))
+
+        picked = None
+        if threshold is None:
+            # on a sparse field a few random tries find a legal placement
+            for _ in range(RANDOM_TRIES):
+                placement_tried = random_placement()
+                if legal(*placement_tried):
+                    picked = placement_tried
+                    break
+
+        if picked is None:
+            if size not in covering:
+                covering[size] = set()
+                for index in blocked:
+                    add_covering(covering[size], size, index)
+            size_covering = covering[size]
+
+            legal_count = count - len(size_covering)
+            if not legal_count:
+                return None
+
+            if threshold is not None:
+                weight += log(legal_count)
+                if weight + rest_bounds[i + 1] < threshold:
+                    return None
+
+            # pick uniformly among the legal placements: random tries
+            # usually do, as many as it takes on average to hit a legal
+            # one several times over, otherwise list them
+            for _ in range(RANDOM_TRIES * -(-count // legal_count)):
+                picked = random_placement()
+                if picked not in size_covering:
+                    break
+            else:
+                placements = [(x, y, vertical)
+                              for vertical in ((False, True) if size > 1
+                                               else (True,))
+                              for y in range(height - size + 1 if vertical
+                                             else height)
+                              for x in range(width if vertical
+                                             else width - size + 1)
+                              if (x, y, vertical) not in size_covering]
+                picked = placements[int(rng.random() * len(placements))]
+
+        x, y, vertical = picked
+        for part in range(size):
+            part_x = x + (0 if vertical else part)
+            part_y = y + (part if vertical else 0)
+
+            # the part itself and its orthogonal neighbours
+            for field_x, field_y in ((part_x, part_y),
+                                     (part_x - 1, part_y),
+                                     (part_x + 1, part_y),
+                                     (part_x, part_y - 1),
+                                     (part_x, part_y + 1)):
+                index = field_y * width + field_x
+                if 0 <= field_x < width and 0 <= field_y < height \
+                        and index not in blocked:
+                    blocked.add(index)
+                    for covered_size, size_covering in covering.items():
+                        add_covering(size_covering, covered_size, index)
+
+        placement.append((x, y, size, vertical))
+
+    return placement
+
+
+@lru_cache(maxsize=64)
+def placement_masks(width, height, size):
+    """
+    Returns every placement of a ship of the specified size on an empty
+    playing field, with bitmasks of the ship and its halo (the ship and
+    the fields orthogonally next to it). Bit y * width + x is the field at
+    x, y. A placement is legal if its ship mask has no blocked field,
+    placing it blocks its halo mask.
+    :param width:   int,    playing field width
+    :param height:  int,    playing field height
+    :param size:    int,    size of the ship
+    :return:        tuple,  tuples (ship mask, halo mask,
+                            (x, y, size, vertical))
+    """
+
+    masks = []
+    row_full = (1 << width) - 1
+
+    # ships of size one are only placed "vertically"
+    for vertical in ((True,) if size == 1 else (False, True)):
+        for y in range(height - size + 1 if vertical else height):
+            for x in range(width if vertical else width - size + 1):
+                if vertical:
+                    ship = 0
+                    for i in range(size):
+                        ship |= 1 << ((y + i) * width + x)
+                    row = 1 << x
+                    # the rows of the ship, widened by a field each side
+                    halo = 0
+                    for i in range(size):
+                        halo |= ((row << 1 | row | row >> 1) & row_full) \
+                            << ((y + i) * width)
+                    # fields above and below the ship
+                    if y > 0:
+                        halo |= row << ((y - 1) * width)
+                    if y + size < height:
+                        halo |= row << ((y + size) * width)
+                else:
+                    row = ((1 << size) - 1) << x
+                    halo = ((row << 1 | row | row >> 1) & row_full) \
+                        << (y * width)
+                    ship = row << (y * width)
+                    if y > 0:
+                        halo |= row << ((y - 1) * width)
+                    if y + 1 < height:
+                        halo |= row << ((y + 1) * width)
+
+                masks.append((ship, halo, (x, y, size, vertical)))
+
+    return tuple(masks)
+
@@ -0,0 +1,637 @@
+"""
+Battleships replay files
+
+Stores played games in a compact binary format and reads them back, so
+games from the gui or from simulations can be analysed afterwards.
+
+A replay file starts with the magic bytes "BSRP" and a version byte,
+followed by the games one after another. Each game consists of
+    - a header: playing field width and height as unsigned shorts and a
+      flags byte, see the FLAG_* constants
+    - the fleet as text, see Fleet.parse, prefixed with its length as an
+      unsigned short, length 0 = same fleet as the previous game
+    - both player names as UTF-8, each prefixed with its length as a byte
+    - the ship layouts of both players, one code per ship in the placing
+      order of the fleet: field index << 1 | vertical
+    - one code per shot: field index << 2 | result, see engine.SHOT_*,
+      the players take turns starting from the starter
+    - an end code: (END_* << 1 | player) << 2 | 3, where player is the
+      winner or the player who forfeited
+The field index of x, y is y * width + x. Codes are little endian unsigned
+shorts, or unsigned ints on fields with over 16384 fields.
+
+Games are written by ReplayWriter, which records games when given to
+GameLogic as the recorder. A finished game is written with a single append,
+so a file only ever ends in the middle of a game if writing it was cut off.
+Games still running when the writer is closed are stored as abandoned.
+
+read_replays streams the games of a file in chunks, so files with millions
+of games can be iterated without loading them into memory:
+    for replay in read_replays("replays.bsr"):
+        print(replay.get_names(), replay.winner(), len(replay.shots()))
+"""
+
+import os
+import re
+import struct
+import threading
+
+from engine import Player, GameLogic, Fleet
+
+
+MAGIC = b"BSRP"
+VERSION = 1
+
+# flags of a game header
+FLAG_SINK_FROM_ONE = 0b001
+FLAG_PLAYER2_STARTS = 0b010
+FLAG_WIDE_CODES = 0b100
+
+# how a game ended
+END_WON = 0
+END_FORFEIT = 1
+END_ABANDONED = 2
+
+# codes with these lowest bits end a game
+END_CODE = 0b11
+
+# fields above this need the wide codes
+MAX_NARROW_FIELDS = 1 << 14
+
+# the lowest byte of a little endian code comes first, these patterns match
+# the run of shot codes up to the end code of a game
+END_BYTES = re.escape(bytes(byte for byte in range(256)
+                            if byte & 0b11 == END_CODE))
+SHOT_RUNS = {2: re.compile(b"(?:[^" + END_BYTES + b"].)*", re.DOTALL),
+             4: re.compile(b"(?:[^" + END_BYTES + b"]...)*", re.DOTALL)}
+
+GAME_HEADER = struct.Struct("<HHB")
+FLEET_LENGTH = struct.Struct("<H")
+NARROW_CODE = struct.Struct("<H")
+WIDE_CODE = struct.Struct("<I")
+
+# finished games are collected up to this many bytes before being written
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+# bytes read from a replay file at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class ReplayWriter:
+    """
+    Writes games to a replay file, append only. Pass it to GameLogic as the
+    recorder to record a game. Games played in different threads can share
+    a writer.
+    """
+
+    def __init__(self, file, buffer_size=DEFAULT_BUFFER_SIZE, header=True):
+        """
+        Constructor, opens the replay file
+        :param file:        str,    path of the replay file, appended to if
+                                    it exists, or a binary file object
+        :param buffer_size: int,    bytes of finished games collected before
+                                    writing them, 0 = write every game
+                                    as soon as it ends
+        :param header:      bool,   False = never write the file header,
+                                    e.g. to append the output to another
+                                    replay file later
+        """
+
+        if isinstance(file, (str, bytes, os.PathLike)):
+            self.__file = open(file, "ab")
+            self.__owns_file = True
+        else:
+            self.__file = file
+            self.__owns_file = False
+
+        self.__buffer_size = buffer_size
+        self.__buffer = bytearray()
+
+        # append mode starts at the end of the file
+        if header and self.__file.tell() == 0:
+            self.__buffer += MAGIC + bytes((VERSION,))
+
+        # game logic object as key, the game recorded so far as value
+        self.__games = {}
+
+        # fleet of the previous game written, not repeated if unchanged
+        self.__last_fleet = None
+
+        # guards the buffer, games may end in different threads
+        self.__lock = threading.RLock()
+
+    def game_started(self, game, starter):
+        """
+        Starts recording a game, called by GameLogic
+        :param game:    GameLogic,  the game
+        :param starter: Player,     player who gets the first turn
+        """
+
+        # a game started again is a new game
+        if game in self.__games:
+            self.end_recording(game, END_ABANDONED, 0)
+
+        self.__games[game] = GameRecording(game, starter)
+
+    def shot_fired(self, game, x, y, result):
+        """
+        Records a shot, called by GameLogic
+        :param game:    GameLogic,  the game
+        :param x:       int,        playing field x coordinate
+        :param y:       int,        playing field y coordinate
+        :param result:  int,        one of engine.SHOT_*
+        """
+
+        recording = self.__games.get(game)
+        if recording is not None:
+            recording.add_shot(x, y, result)
+
+    def game_ended(self, game, forfeited):
+        """
+        Records the end of a game, called by GameLogic
+        :param game:        GameLogic,  the game
+        :param forfeited:   bool,       True = the loser forfeited
+        """
+
+        if game not in self.__games:
+            return
+
+        winner = game.winner()
+        if forfeited:
+            self.end_recording(game, END_FORFEIT,
+                               1 - game.player_index(winner))
+        else:
+            self.end_recording(game, END_WON,
+                               game.player_index(winner))
+
+    def end_recording(self, game, end, player):
+        """
+        Ends the recording of a game and writes it
+        :param game:    GameLogic,  the game
+        :param end:     int,        one of END_*
+        :param player:  int,        index of the winner or the player
+                                    who forfeited
+        """
+
+        with self.__lock:
+            recording = self.__games.pop(game)
+            fleet = recording.get_fleet()
+            self.__buffer += recording.encode(end, player,
+                                              fleet != self.__last_fleet)
+            self.__last_fleet = fleet
+
+            if len(self.__buffer) >= self.__buffer_size:
+                self.flush()
+
+    def append_games(self, data):
+        """
+        Appends games written by another writer without the file header
+        :param data:    bytes,  the games
+        """
+
+        # the fleet of the last appended game isn't known here,
+        # so the next game written spells out its fleet
+        with self.__lock:
+            self.__buffer += data
+            self.__last_fleet = None
+
+            if len(self.__buffer) >= self.__buffer_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes the finished games collected so far to the file
+        """
+
+        with self.__lock:
+            if self.__buffer:
+                self.__file.write(self.__buffer)
+                self.__buffer.clear()
+            self.__file.flush()
+
+    def close(self):
+        """
+        Writes the games still running as abandoned and closes the file
+        if it was opened by this writer
+        """
+
+        with self.__lock:
+            for game in list(self.__games):
+                self.end_recording(game, END_ABANDONED, 0)
+            self.flush()
+
+            if self.__owns_file:
+                self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecording:
+    """
+    A game being recorded by a ReplayWriter
+    """
+
+    def __init__(self, game, starter):
+        """
+        Constructor, records the header and the ship layouts of a game
+        :param game:    GameLogic,  the game
+        :param starter: Player,     player who gets the first turn
+        """
+
+        player1, player2 = game.get_players()
+        self.__width = player1.get_width()
+        self.__fleet = str(player1.get_fleet())
+
+        flags = 0
+        if game.sink_from_one():
+            flags |= FLAG_SINK_FROM_ONE
+        if starter is player2:
+            flags |= FLAG_PLAYER2_STARTS
+        if player1.get_width() * player1.get_height() > MAX_NARROW_FIELDS:
+            flags |= FLAG_WIDE_CODES
+            self.__code = WIDE_CODE
+        else:
+            self.__code = NARROW_CODE
+
+        self.__header = GAME_HEADER.pack(player1.get_width(),
+                                         player1.get_height(), flags)
+        self.__names = b"".join(encode_name(str(player))
+                                for player in (player1, player2))
+        self.__layouts = b"".join(self.encode_layout(player)
+                                  for player in (player1, player2))
+        self.__shots = bytearray()
+
+    def encode_layout(self, player):
+        """
+        Encodes the ship layout of a player
+        :param player:  Player, the player
+        :return:        bytes,  one code per ship in placing order
+        """
+
+        battleships = player.get_battleships()
+
+        # how many ships of each type have been encoded
+        encoded = {}
+
+        codes = bytearray()
+        for ship_type in player.get_fleet().get_place_order():
+            ship = battleships[ship_type][encoded.setdefault(ship_type, 0)]
+            encoded[ship_type] += 1
+
+            x, y = ship.get_origin()
+            codes += self.__code.pack((y * self.__width + x) << 1
+                                      | ship.is_vertical())
+        return bytes(codes)
+
+    def get_fleet(self):
+        """
+        Returns the fleet of the game as text
+        :return:    str, see Fleet.parse
+        """
+
+        return self.__fleet
+
+    def add_shot(self, x, y, result):
+        """
+        Records a shot
+        :param x:       int,    playing field x coordinate
+        :param y:       int,    playing field y coordinate
+        :param result:  int,    one of engine.SHOT_*
+        """
+
+        self.__shots += self.__code.pack((y * self.__width + x) << 2
+                                         | result)
+
+    def encode(self, end, player, with_fleet):
+        """
+        Encodes the whole game
+        :param end:         int,    one of END_*
+        :param player:      int,    index of the winner or the player who
+                                    forfeited
+        :param with_fleet:  bool,   False = the fleet is the same as in the
+                                    previous game of the file
+        :return:            bytes,  the game
+        """
+
+        fleet = self.__fleet.encode() if with_fleet else b""
+        return b"".join((self.__header, FLEET_LENGTH.pack(len(fleet)), fleet,
+                         self.__names, self.__layouts, self.__shots,
+                         self.__code.pack((end << 1 | player) << 2
+                                          | END_CODE)))
+
+
+class GameReplay:
+    """
+    A game read from a replay file. The ship layouts and shots are decoded
+    only when asked for.
+    """
+
+    __slots__ = ("__width", "__height", "__flags", "__fleet", "__names",
+                 "__layouts", "__shots", "__end")
+
+    def __init__(self, width, height, flags, fleet, names, layouts, shots,
+                 end):
+        """
+        Constructor, see read_replays
+        :param width:   int,    playing field width
+        :param height:  int,    playing field height
+        :param flags:   int,    FLAG_* of the game
+        :param fleet:   Fleet,  fleet of both players
+        :param names:   tuple,  names of both players
+        :param layouts: tuple,  ship layout codes
+        :param shots:   bytes,  encoded shots
+        :param end:     int,    the end code
+        """
+
+        self.__width = width
+        self.__height = height
+        self.__flags = flags
+        self.__fleet = fleet
+        self.__names = names
+        self.__layouts = layouts
+        self.__shots = shots
+        self.__end = end
+
+    def get_width(self):
+        """
+        Returns the playing field width
+        :return:    int, width
+        """
+
+        return self.__width
+
+    def get_height(self):
+        """
+        Returns the playing field height
+        :return:    int, height
+        """
+
+        return self.__height
+
+    def get_fleet(self):
+        """
+        Returns the fleet of both players
+        :return:    Fleet, the fleet
+        """
+
+        return self.__fleet
+
+    def get_names(self):
+        """
+        Returns the names of both players
+        :return:    tuple, names of the first and second player
+        """
+
+        return self.__names
+
+    def sink_from_one(self):
+        """
+        Returns whether ships sank from one hit in this game
+        :return:    bool, True = ships sank from one hit
+        """
+
+        return bool(self.__flags & FLAG_SINK_FROM_ONE)
+
+    def starter(self):
+        """
+        Returns which player started the game
+        :return:    int, 0 = first player, 1 = second player
+        """
+
+        return int(bool(self.__flags & FLAG_PLAYER2_STARTS))
+
+    def end(self):
+        """
+        Returns how the game ended
+        :return:    int, one of END_*
+        """
+
+        return self.__end >> 3
+
+    def winner(self):
+        """
+        Returns the winner of the game
+        :return:    int, 0 = first player, 1 = second player,
+                         None if the game was abandoned
+        """
+
+        if self.end() == END_ABANDONED:
+            return None
+
+        player = self.__end >> 2 & 1
+        if self.end() == END_FORFEIT:
+            return 1 - player
+        return player
+
+    def get_layout(self, player):
+        """
+        Returns the ship layout of a player
+        :param player:  int,    0 = first player, 1 = second player
+        :return:        list,   ship type, x, y and vertical of each ship
+                                in placing order
+        """
+
+        ship_count = len(self.__layouts) // 2
+        codes = self.__layouts[player * ship_count:(player + 1) * ship_count]
+        layout = []
+        for ship_type, code in zip(self.__fleet.get_place_order(), codes):
+            field = code >> 1
+            layout.append((ship_type, field % self.__width,
+                           field // self.__width, bool(code & 1)))
+        return layout
+
+    def shots(self):
+        """
+        Returns the shots of the game
+        :return:    list,   firing player, x, y and result of each shot,
+                            see engine.SHOT_*
+        """
+
+        code = WIDE_CODE if self.__flags & FLAG_WIDE_CODES else NARROW_CODE
+        firer = self.starter()
+
+        shots = []
+        for code, in code.iter_unpack(self.__shots):
+            field = code >> 2
+            shots.append((firer, field % self.__width, field // self.__width,
+                          code & 0b11))
+            firer = 1 - firer
+        return shots
+
+    def replay(self):
+        """
+        Plays the game again on the game engine, checking every result
+        :return:    GameLogic,  the game in its final state
+        """
+
+        players = []
+        for player, name in enumerate(self.__names):
+            players.append(Player(name, self.__width, self.__height,
+                                  self.__fleet))
+            for ship_type, x, y, vertical in self.get_layout(player):
+                players[player].add_battleship(ship_type, vertical, (x, y))
+
+        game = GameLogic(self.sink_from_one(), *players)
+        game.start_game(players[self.starter()])
+        for firer, x, y, result in self.shots():
+            hit = game.fire_shot(x, y, players[firer])
+            if hit != (result != 0):
+                raise ValueError("The replay doesn't match the game engine")
+
+        if self.end() == END_FORFEIT:
+            game.forfeit_game(players[self.__end >> 2 & 1])
+        return game
+
+
+def encode_name(name):
+    """
+    Encodes a player name for a replay file
+    :param name:    str,    player name
+    :return:        bytes,  UTF-8 prefixed with its length, cut to 255 bytes
+    """
+
+    encoded = name.encode()[:255]
+    return bytes((len(encoded),)) + encoded
+
+
+def read_replays(file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterates over the games of a replay file, reading it in chunks
+    :param file:        str,        path of the replay file,
+                                    or a binary file object
+    :param chunk_size:  int,        bytes to read at a time
+    :return:            generator,  GameReplay objects
+    """
+
+    if isinstance(file, (str, bytes, os.PathLike)):
+        with open(file, "rb") as opened:
+            yield from read_replays(opened, chunk_size)
+        return
+
+    reader = ChunkReader(file, chunk_size)
+    if reader.read(len(MAGIC) + 1) != MAGIC + bytes((VERSION,)):
+        raise ValueError("Not a version 1 Battleships replay file")
+
+    # parsed fleets by their text, the same fleet is usually repeated
+    fleets = {}
+    fleet = None
+
+    # ship layout code struct by ship count and code width
+    layout_structs = {}
+
+    while reader.has_data():
+        width, height, flags = GAME_HEADER.unpack(
+            reader.read(GAME_HEADER.size))
+
+        fleet_length, = FLEET_LENGTH.unpack(reader.read(FLEET_LENGTH.size))
+        if fleet_length:
+            text = reader.read(fleet_length).decode()
+            if text not in fleets:
+                fleets[text] = Fleet.parse(text)
+            fleet = fleets[text]
+        elif fleet is None:
+            raise ValueError("Replay file is corrupted")
+
+        names = tuple(reader.read(reader.read(1)[0]).decode(errors="replace")
+                      for _ in range(2))
+
+        wide = flags & FLAG_WIDE_CODES
+        code = WIDE_CODE if wide else NARROW_CODE
+        key = (fleet.ship_count(), wide)
+        if key not in layout_structs:
+            layout_structs[key] = struct.Struct(
+                f"<{2 * fleet.ship_count()}{'I' if wide else 'H'}")
+        layout_struct = layout_structs[key]
+        layouts = layout_struct.unpack(reader.read(layout_struct.size))
+
+        shots, end = reader.read_shots(code)
+
+        yield GameReplay(width, height, flags, fleet, names, layouts, shots,
+                         end)
+
+
+class ChunkReader:
+    """
+    Reads a file in chunks for read_replays
+    """
+
+    def __init__(self, file, chunk_size):
+        """
+        Constructor
+        :param file:        file,   binary file object
+        :param chunk_size:  int,    bytes to read at a time
+        """
+
+        self.__file = file
+        self.__chunk_size = chunk_size
+        self.__chunk = b""
+        self.__position = 0
+
+    def fill(self, size):
+        """
+        Makes sure at least the specified amount of bytes is in the chunk,
+        unless the file ends
+        :param size:    int,    bytes needed from the current position
+        """
+
+        if len(self.__chunk) - self.__position >= size:
+            return
+
+        rest = self.__chunk[self.__position:]
+        self.__chunk = rest + self.__file.read(
+            max(self.__chunk_size, size - len(rest)))
+        self.__position = 0
+
+    def has_data(self):
+        """
+        Returns whether the file has any bytes left
+        :return:    bool, True = bytes left
+        """
+
+        self.fill(1)
+        return self.__position < len(self.__chunk)
+
+    def read(self, size):
+        """
+        Reads bytes
+        :param size:    int,    how many bytes to read
+        :return:        bytes,  the bytes
+        """
+
+        self.fill(size)
+        if len(self.__chunk) - self.__position < size:
+            raise ValueError("Replay file is truncated")
+
+        data = self.__chunk[self.__position:self.__position + size]
+        self.__position += size
+        return data
+
+    def read_shots(self, code):
+        """
+        Reads the shot codes of a game up to its end code
+        :param code:    struct.Struct,  shot code struct
+        :return:        tuple,          the shot codes as bytes and the end
+                                        code
+        """
+
+        shot_run = SHOT_RUNS[code.size]
+        start = self.__position
+        while True:
+            shots_end = shot_run.match(self.__chunk, start).end()
+            if len(self.__chunk) - shots_end >= code.size:
+                self.__position = shots_end + code.size
+                return (self.__chunk[start:shots_end],
+                        code.unpack_from(self.__chunk, shots_end)[0])
+
+            # the chunk ended first, read more keeping the shots so far and
+            # growing the reads so long games aren't copied over and over
+            scanned = len(self.__chunk) - start
+            self.__position = start
+            self.fill(2 * scanned + self.__chunk_size)
+            if len(self.__chunk) - self.__position <= scanned:
+                raise ValueError("Replay file is truncated")
+            start = self.__position
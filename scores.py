@@ -0,0 +1,293 @@
+"""
+Battleships top scores
+
+Stores the winner of every finished game in an SQLite database: the
+player's name, the shots it took to win, the accuracy of the shots and when
+the game was played. Fewer shots rank higher, equal shots are ranked by
+accuracy. The table is indexed for each query, so the top scores, the best
+score of a player and the top scores since some date are found in
+milliseconds even among millions of games. For the latter the best scores
+of all time are walked until enough recent ones turn up, unless that takes
+longer than merging the best scores of each day, each score also stores
+the day it was played.
+
+Scores are written in a background thread, so recording one never makes a
+gui wait for the disk. A ScoreStore is also a recorder for GameLogic, which
+records the winner of each game that isn't forfeited.
+
+    store = ScoreStore("scores.db")
+    game = GameLogic(False, player1, player2, recorder=store)
+    ...
+    store.top_scores(10)
+    store.player_best("Player 1")
+    store.top_scores(10, since=time.time() - 7 * 24 * 60 * 60)
+    store.close()
+"""
+
+import collections
+import heapq
+import queue
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_PATH = "scores.db"
+
+# how many scores the queries return by default
+DEFAULT_COUNT = 10
+
+# seconds in a day, the scores of each day are indexed by rank
+DAY_SECONDS = 24 * 60 * 60
+
+# scores walked in rank order for each day of a window before the best
+# scores of each day are merged instead, about what the query for a day
+# costs
+WALKED_SCORES_PER_DAY = 10
+
+# a score: player name, shots to win, accuracy from 0 to 1 and when the
+# game was played as seconds since the epoch
+Score = collections.namedtuple("Score", "player shots accuracy played")
+
+TABLE = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    shots INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    played REAL NOT NULL,
+    day INTEGER NOT NULL
+);
+"""
+
+# databases written before the scores had their day get it, see day_of
+ADD_DAY = ("ALTER TABLE scores ADD COLUMN day INTEGER NOT NULL DEFAULT 0",
+           "UPDATE scores SET day = day_of(played)")
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS scores_by_rank
+    ON scores (shots, accuracy DESC);
+CREATE INDEX IF NOT EXISTS scores_by_player
+    ON scores (player, shots, accuracy DESC);
+CREATE INDEX IF NOT EXISTS scores_by_date
+    ON scores (played, shots, accuracy DESC);
+CREATE INDEX IF NOT EXISTS scores_by_day
+    ON scores (day, shots, accuracy DESC);
+"""
+
+INSERT = "INSERT INTO scores (player, shots, accuracy, played, day) " \
+         "VALUES (?, ?, ?, ?, ?)"
+
+COLUMNS = "SELECT player, shots, accuracy, played FROM scores"
+RANK = "ORDER BY shots, accuracy DESC LIMIT ?"
+
+
+def day_of(played):
+    """
+    Returns the day a game was played on
+    :param played:  float,  seconds since the epoch
+    :return:        int,    days since the epoch
+    """
+
+    return int(played // DAY_SECONDS)
+
+
+class ScoreStore:
+    """
+    The scores of finished games, stored in an SQLite database
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Constructor, opens the database, creating it if needed, and starts
+        the writing thread. Query from the thread that created the store.
+        :param path:    str,    path of the database file
+        """
+
+        self.__path = path
+
+        # write-ahead logging lets the queries read while scores are written
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        with self.__connection:
+            self.__connection.execute(TABLE)
+            columns = [column[1] for column in self.__connection.execute(
+                "PRAGMA table_info(scores)")]
+            if "day" not in columns:
+                self.__connection.create_function("day_of", 1, day_of,
+                                                  deterministic=True)
+                for statement in ADD_DAY:
+                    self.__connection.execute(statement)
+        self.__connection.executescript(INDEXES)
+
+        # scores waiting to be written, None closes the writing thread
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.write_queued,
+                                         daemon=True)
+        self.__thread.start()
+
+    def record(self, player, shots, accuracy, played=None):
+        """
+        Queues a score to be written
+        :param player:      str,    name of the winner
+        :param shots:       int,    shots it took to win
+        :param accuracy:    float,  hits per shot, from 0 to 1
+        :param played:      float,  when the game was played as seconds since
+                                    the epoch, defaults to now
+        """
+
+        if played is None:
+            played = time.time()
+        self.__queue.put((player, shots, accuracy, played, day_of(played)))
+
+    def game_started(self, game, starter):
+        """
+        Nothing is recorded before the game ends, called by GameLogic
+        :param game:    GameLogic,  the game
+        :param starter: Player,     player who gets the first turn
+        """
+
+    def shot_fired(self, game, x, y, result):
+        """
+        Nothing is recorded before the game ends, called by GameLogic
+        :param game:    GameLogic,  the game
+        :param x:       int,        playing field x coordinate
+        :param y:       int,        playing field y coordinate
+        :param result:  int,        one of engine.SHOT_*
+        """
+
+    def game_ended(self, game, forfeited):
+        """
+        Records the winner of a game, called by GameLogic
+        :param game:        GameLogic,  the game
+        :param forfeited:   bool,       True = the loser forfeited, nothing
+                                        is recorded
+        """
+
+        winner = game.winner()
+        if forfeited or winner is None or not winner.shots_fired():
+            return
+
+        self.record(str(winner), winner.shots_fired(),
+                    winner.shots_hit() / winner.shots_fired())
+
+    def write_queued(self):
+        """
+        Writes the queued scores until the store is closed, each batch in
+        one transaction, run in the background thread
+        """
+
+        connection = sqlite3.connect(self.__path)
+        closing = False
+        while not closing:
+            scores = [self.__queue.get()]
+            # write everything queued meanwhile at once
+            while not self.__queue.empty():
+                scores.append(self.__queue.get())
+
+            closing = None in scores
+            with connection:
+                connection.executemany(INSERT, [score for score in scores
+                                                if score is not None])
+            for _ in scores:
+                self.__queue.task_done()
+        connection.close()
+
+    def flush(self):
+        """
+        Waits until the queued scores have been written
+        """
+
+        self.__queue.join()
+
+    def top_scores(self, count=DEFAULT_COUNT, since=None):
+        """
+        Returns the best scores
+        :param count:   int,    how many
+        :param since:   float,  only games played since this time as seconds
+                                since the epoch, defaults to all games
+        :return:        list,   Score tuples, best first
+        """
+
+        if since is None:
+            rows = self.__connection.execute(f"{COLUMNS} {RANK}", (count,))
+            return [Score(*row) for row in rows]
+
+        day = day_of(since)
+        last_day, = self.__connection.execute(
+            "SELECT MAX(day) FROM scores").fetchone()
+        if last_day is None or last_day < day:
+            return []
+
+        # the best scores of a long window are mostly among the best scores
+        # of all time, walk those as long as it costs less than merging the
+        # days of the window
+        limit = WALKED_SCORES_PER_DAY * (last_day - day + 1)
+        rows = []
+        walked = 0
+        for row in self.__connection.execute(
+                f"{COLUMNS} INDEXED BY scores_by_rank {RANK}", (limit,)):
+            walked += 1
+            if row[3] >= since:
+                rows.append(row)
+                if len(rows) == count:
+                    break
+        # found enough, or walked past every score
+        if len(rows) == count or walked < limit:
+            return [Score(*row) for row in rows]
+
+        # the games of the first day from the time on are sorted,
+        # each following day with games gives its best ones in rank order
+        rows = self.__connection.execute(
+            f"{COLUMNS} INDEXED BY scores_by_date "
+            f"WHERE played >= ? AND played < ? {RANK}",
+            (since, (day + 1) * DAY_SECONDS, count)).fetchall()
+        while True:
+            day, = self.__connection.execute(
+                "SELECT MIN(day) FROM scores WHERE day > ?",
+                (day,)).fetchone()
+            if day is None:
+                break
+            rows += self.__connection.execute(
+                f"{COLUMNS} INDEXED BY scores_by_day WHERE day = ? {RANK}",
+                (day, count))
+
+        return [Score(*row) for row in
+                heapq.nsmallest(count, rows, key=lambda row: (row[1],
+                                                              -row[2]))]
+
+    def player_best(self, player):
+        """
+        Returns the best score of a player
+        :param player:  str,    name of the player
+        :return:        Score,  None if the player has never won
+        """
+
+        row = self.__connection.execute(
+            f"{COLUMNS} WHERE player = ? {RANK}", (player, 1)).fetchone()
+        return None if row is None else Score(*row)
+
+    def count(self):
+        """
+        Returns how many scores have been written
+        :return:    int,    number of scores
+        """
+
+        return self.__connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        """
+        Writes the queued scores and closes the database
+        """
+
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
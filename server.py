@@ -0,0 +1,829 @@
+"""
+Battleships game server
+
+An asyncio TCP server hosting any number of concurrent matches in one
+process, on top of the game engine. Players connect, ask for a match with
+some settings, place their fleets and are paired with the next player
+asking for the same settings.
+
+    python server.py serve --port 8765
+    python server.py bench --matches 2000 --concurrency 500
+
+The bench command plays random matches against a server, by default one
+started in the same process, and prints the matches and shots per second.
+The gui connects as a client with "Play Online..." in the settings window,
+see client.py.
+
+The protocol is made of text lines, words separated by spaces.
+Client to server:
+    NAME <name>                         name of the player, escaped,
+                                        before PLAY
+    PLAY <width> <height> <sink> <fleet>
+                                        asks for a match, sink is 1 if ships
+                                        sink from one hit, fleet as in
+                                        Fleet.parse, may contain spaces
+    PLACE RANDOM                        places the fleet at random
+    PLACE <x> <y> <h|v> ...             places every ship of the fleet in
+                                        its placing order, ships of size one
+                                        are placed vertically
+    FIRE <x> <y>                        fires a shot
+    FORFEIT                             forfeits the match
+Server to client:
+    OK                                  PLAY was accepted
+    LAYOUT <x> <y> <h|v> ...            where PLACE RANDOM put the ships
+    WAITING                             the fleet is placed, waiting for
+                                        an opponent
+    MATCHED <index> <opponent name>     the match starts, index 0 or 1 is
+                                        the player's index in the match,
+                                        the name is escaped
+    START <index>                       index of the player who fires first,
+                                        the turns alternate from there on
+    SHOT <index> <x> <y> <MISS|HIT|SUNK> [<x> <y> <h|v> <size>]
+                                        a shot fired by the player of the
+                                        index, the sunk ship is appended
+    LOG <text>                          game log message
+    STATS <text>                        the player's statistics
+    END <index> <WON|FORFEIT|DISCONNECT>
+                                        the match ended, index of the
+                                        winner, a new PLAY may follow
+    ERROR <message>                     the last command was refused
+Line breaks and backslashes in texts are escaped as \\n and \\\\.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from functools import lru_cache
+
+from engine import Player, GameLogic, Fleet, SHOT_HIT, SHOT_SUNK, \
+    DEFAULT_FLEET, DEFAULT_FIELD_WIDTH, DEFAULT_FIELD_HEIGHT
+from placement import PlacementTable, find_fleet_placement
+
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 8765
+
+# largest playing field width and height a match can be played on
+MAX_FIELD_SIZE = 100
+
+# longest command a client may send
+MAX_LINE_LENGTH = 1 << 16
+
+SHOT_RESULTS = ("MISS", "HIT", "SUNK")
+
+
+def escape(text):
+    """
+    Escapes a text to fit on a line
+    :param text:    str,    the text
+    :return:        str,    the text without line breaks
+    """
+
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def unescape(text):
+    """
+    Reverses escape
+    :param text:    str,    escaped text
+    :return:        str,    the original text
+    """
+
+    parts = text.split("\\\\")
+    return "\\".join(part.replace("\\n", "\n") for part in parts)
+
+
+@lru_cache(maxsize=256)
+def fleet_fits(width, height, sizes):
+    """
+    Returns whether a fleet has been proven to fit on a playing field,
+    see find_fleet_placement
+    :param width:   int,    playing field width
+    :param height:  int,    playing field height
+    :param sizes:   tuple,  size of each ship in the fleet, sorted
+    :return:        bool,   False if it doesn't fit or the search gave up
+    """
+
+    try:
+        return find_fleet_placement(width, height, list(sizes)) is not None
+    except RuntimeError:
+        return False
+
+
+def format_layout(player):
+    """
+    Formats the ship layout of a player for PLACE and LAYOUT
+    :param player:  Player, the player
+    :return:        str,    x, y and orientation of each ship in placing
+                            order
+    """
+
+    battleships = player.get_battleships()
+
+    # how many ships of each type have been formatted
+    formatted = {}
+
+    words = []
+    for ship_type in player.get_fleet().get_place_order():
+        ship = battleships[ship_type][formatted.setdefault(ship_type, 0)]
+        formatted[ship_type] += 1
+
+        x, y = ship.get_origin()
+        words += [str(x), str(y), "v" if ship.is_vertical() else "h"]
+    return " ".join(words)
+
+
+class GameServer:
+    """
+    Hosts the matches, one Connection object for each client
+    """
+
+    def __init__(self, rng=random):
+        """
+        Constructor
+        :param rng: random.Random,  random number generator for placing
+                                    fleets at random and picking starters
+        """
+
+        self.__rng = rng
+
+        # match settings as key, connection waiting for an opponent as value
+        self.__waiting = {}
+
+        # connections with lines waiting to be sent, sent together once
+        # a command has been handled so each client gets one write
+        self.__pending = set()
+
+        self.__connections = 0
+        self.__matches_played = 0
+        self.__shots_fired = 0
+
+    def get_rng(self):
+        """
+        Returns the random number generator of the server
+        :return:    random.Random, the random number generator
+        """
+
+        return self.__rng
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Starts listening for clients
+        :param host:    str,            host to listen on
+        :param port:    int,            port to listen on, 0 = any free port
+        :return:        asyncio.Server, the listening server
+        """
+
+        return await asyncio.start_server(self.handle_client, host, port,
+                                          limit=MAX_LINE_LENGTH)
+
+    async def handle_client(self, reader, writer):
+        """
+        Serves a client until it disconnects
+        :param reader:  asyncio.StreamReader,   reads from the client
+        :param writer:  asyncio.StreamWriter,   writes to the client
+        """
+
+        self.__connections += 1
+        connection = Connection(self, writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError,
+                        ValueError):
+                    break
+                if not line:
+                    break
+
+                await connection.handle_command(
+                    line.decode(errors="replace").rstrip("\r\n"))
+                self.send_pending()
+                if writer.transport.get_write_buffer_size() > MAX_LINE_LENGTH:
+                    await writer.drain()
+        finally:
+            self.__connections -= 1
+            connection.disconnected()
+            self.send_pending()
+            writer.close()
+
+    def add_pending(self, connection):
+        """
+        Marks a connection as having lines waiting to be sent
+        :param connection:  Connection, the connection
+        """
+
+        self.__pending.add(connection)
+
+    def send_pending(self):
+        """
+        Sends the lines waiting to be sent to every connection
+        """
+
+        for connection in self.__pending:
+            connection.flush()
+        self.__pending.clear()
+
+    def find_opponent(self, connection):
+        """
+        Pairs a connection with a fleet placed with the one waiting for the
+        same settings, or makes it wait for an opponent
+        :param connection:  Connection, connection whose fleet was placed
+        """
+
+        settings = connection.get_settings()
+        opponent = self.__waiting.pop(settings, None)
+        if opponent is None:
+            self.__waiting[settings] = connection
+            connection.send("WAITING")
+            return
+
+        Match(self, opponent, connection)
+
+    def stop_waiting(self, connection):
+        """
+        Takes a connection out of the queue of players waiting for an
+        opponent
+        :param connection:  Connection, the connection
+        """
+
+        if self.__waiting.get(connection.get_settings()) is connection:
+            del self.__waiting[connection.get_settings()]
+
+    def match_ended(self, shots_fired):
+        """
+        Counts a match that ended
+        :param shots_fired: int,    shots fired in the match
+        """
+
+        self.__matches_played += 1
+        self.__shots_fired += shots_fired
+
+    def statistics(self):
+        """
+        Returns the statistics of the server
+        :return:    tuple,  connected clients, matches played and shots
+                            fired in them
+        """
+
+        return self.__connections, self.__matches_played, self.__shots_fired
+
+
+class Connection:
+    """
+    A client of the game server. It's also the game window of its player
+    for the game logic, which reports log messages and statistics to it.
+    """
+
+    def __init__(self, server, writer):
+        """
+        Constructor
+        :param server:  GameServer,             the server
+        :param writer:  asyncio.StreamWriter,   writes to the client
+        """
+
+        self.__server = server
+        self.__writer = writer
+        self.__name = "Player"
+
+        # lines waiting to be sent
+        self.__output = []
+
+        # set by PLAY
+        self.__settings = None
+        self.__fleet = None
+
+        # set by PLACE
+        self.__player = None
+
+        # set once matched
+        self.__match = None
+
+    def get_settings(self):
+        """
+        Returns the match settings asked for
+        :return:    tuple,  width, height, sink from one and the fleet text
+        """
+
+        return self.__settings
+
+    def get_player(self):
+        """
+        Returns the player of this connection
+        :return:    Player, player object with the placed fleet
+        """
+
+        return self.__player
+
+    def get_name(self):
+        """
+        Returns the name of the player
+        :return:    str,    the name
+        """
+
+        return self.__name
+
+    def send(self, line):
+        """
+        Sends a line to the client once the command being handled is done
+        :param line:    str,    line without the line break
+        """
+
+        if not self.__output:
+            self.__server.add_pending(self)
+        self.__output.append(line)
+
+    def flush(self):
+        """
+        Sends the lines waiting to be sent
+        """
+
+        if self.__output and not self.__writer.is_closing():
+            self.__output.append("")
+            self.__writer.write("\n".join(self.__output).encode())
+        self.__output.clear()
+
+    async def handle_command(self, line):
+        """
+        Handles a command of the client, the next command of the client
+        waits until it's done
+        :param line:    str,    the command line
+        """
+
+        command, _, arguments = line.partition(" ")
+        handler = {
+            "NAME": self.command_name,
+            "PLAY": self.command_play,
+            "PLACE": self.command_place,
+            "FIRE": self.command_fire,
+            "FORFEIT": self.command_forfeit
+        }.get(command.upper())
+
+        if handler is None:
+            self.send(f"ERROR Unknown command '{command}'")
+            return
+
+        try:
+            # commands with lengthy work run it in a thread and are awaited,
+            # the other clients are served meanwhile
+            result = handler(arguments)
+            if asyncio.iscoroutine(result):
+                await result
+        except ValueError as error:
+            self.send(f"ERROR {escape(str(error))}")
+
+    def command_name(self, arguments):
+        """
+        NAME <name>
+        """
+
+        if self.__settings is not None:
+            raise ValueError("The name can't be changed after PLAY")
+        if not arguments.strip():
+            raise ValueError("The name can't be empty")
+        self.__name = unescape(arguments.strip())[:100]
+
+    async def command_play(self, arguments):
+        """
+        PLAY <width> <height> <sink> <fleet>
+        """
+
+        if self.__match is not None:
+            raise ValueError("Already in a match")
+
+        words = arguments.split(" ", 3)
+        if len(words) != 4:
+            raise ValueError("Expected PLAY <width> <height> <sink> <fleet>")
+
+        try:
+            width = int(words[0])
+            height = int(words[1])
+            sink_from_one = int(words[2])
+        except ValueError:
+            raise ValueError("Width, height and sink must be numbers")
+
+        if not 1 <= width <= MAX_FIELD_SIZE \
+                or not 1 <= height <= MAX_FIELD_SIZE:
+            raise ValueError(f"Field size must be between 1 and "
+                             f"{MAX_FIELD_SIZE}")
+        if sink_from_one not in (0, 1):
+            raise ValueError("Sink must be 0 or 1")
+
+        # fleets written differently but meaning the same get matched,
+        # each ship needs a field of its own
+        fleet = Fleet.parse(words[3], max_ships=width * height)
+
+        # only fleets proven to fit are played, so PLACE RANDOM can't
+        # search for long
+        sizes = tuple(sorted(fleet.get_sizes()[ship_type]
+                             for ship_type in fleet.get_place_order()))
+        if not await asyncio.get_running_loop().run_in_executor(
+                None, fleet_fits, width, height, sizes):
+            raise ValueError("The fleet doesn't fit on the playing field")
+
+        # the client may have been matched with its previous settings
+        # meanwhile
+        if self.__match is not None:
+            raise ValueError("Already in a match")
+
+        self.__server.stop_waiting(self)
+        self.__settings = (width, height, sink_from_one, str(fleet))
+        self.__fleet = fleet
+        self.__player = None
+        self.send("OK")
+
+    async def command_place(self, arguments):
+        """
+        PLACE RANDOM or PLACE <x> <y> <h|v> ...
+        """
+
+        if self.__settings is None:
+            raise ValueError("PLAY must come before PLACE")
+        if self.__player is not None:
+            raise ValueError("The fleet has already been placed")
+
+        width, height, _, _ = self.__settings
+        player = Player(self.__name, width, height, self.__fleet)
+
+        if arguments.strip().upper() == "RANDOM":
+            # the thread gets a generator of its own
+            rng = random.Random(self.__server.get_rng().getrandbits(64))
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, player.place_fleet_randomly, rng)
+            except RuntimeError:
+                raise ValueError("Couldn't place the fleet at random, "
+                                 "place it ship by ship")
+            self.send(f"LAYOUT {format_layout(player)}")
+        else:
+            self.place_ships(player, arguments.split())
+
+        self.__player = player
+        player.set_game_window(self)
+        self.__server.find_opponent(self)
+
+    def place_ships(self, player, words):
+        """
+        Places the ships of PLACE <x> <y> <h|v> ...
+        :param player:  Player, the player to place the ships for
+        :param words:   list,   the arguments of the command
+        """
+
+        place_order = self.__fleet.get_place_order()
+        sizes = self.__fleet.get_sizes()
+        if len(words) != 3 * len(place_order):
+            raise ValueError(f"Expected x, y and h or v for each of the "
+                             f"{len(place_order)} ships")
+
+        width, height, _, _ = self.__settings
+        table = PlacementTable(width, height, sizes.values())
+        for i, ship_type in enumerate(place_order):
+            try:
+                x = int(words[3 * i])
+                y = int(words[3 * i + 1])
+            except ValueError:
+                raise ValueError("Coordinates must be numbers")
+            vertical = words[3 * i + 2].lower() == "v"
+            size = sizes[ship_type]
+
+            if not 0 <= x < width or not 0 <= y < height \
+                    or words[3 * i + 2].lower() not in ("h", "v") \
+                    or not table.orientations(x, y, size) \
+                    & (0b01 if vertical else 0b10):
+                raise ValueError(f"Illegal placement for the {ship_type} "
+                                 f"at {x} {y}")
+
+            table.place(x, y, size, vertical)
+            player.add_battleship(ship_type, vertical, (x, y))
+
+    def command_fire(self, arguments):
+        """
+        FIRE <x> <y>
+        """
+
+        if self.__match is None:
+            raise ValueError("Not in a match")
+
+        try:
+            x, y = (int(word) for word in arguments.split())
+        except ValueError:
+            raise ValueError("Expected FIRE <x> <y>")
+
+        width, height, _, _ = self.__settings
+        if not 0 <= x < width or not 0 <= y < height:
+            raise ValueError(f"{x} {y} is outside the playing field")
+
+        self.__match.fire_shot(self, x, y)
+
+    def command_forfeit(self, arguments):
+        """
+        FORFEIT
+        """
+
+        if self.__match is None:
+            raise ValueError("Not in a match")
+        self.__match.forfeit(self)
+
+    def set_match(self, match):
+        """
+        Sets the match this connection plays in
+        :param match:   Match,  the match, None once it has ended
+        """
+
+        self.__match = match
+        if match is None:
+            # a new fleet for the next match
+            self.__player = None
+
+    def disconnected(self):
+        """
+        Cleans up after the client disconnected
+        """
+
+        if self.__settings is not None:
+            self.__server.stop_waiting(self)
+        if self.__match is not None:
+            self.__match.disconnected(self)
+
+    # the game window interface of the game logic
+
+    def append_log(self, msg):
+        """
+        Sends a game log message
+        :param msg:     str,    the message
+        """
+
+        self.send(f"LOG {escape(msg)}")
+
+    def update_stats(self, stats):
+        """
+        Sends the statistics of the player
+        :param stats:   str,    the statistics
+        """
+
+        self.send(f"STATS {escape(stats)}")
+
+    def disable_buttons(self):
+        """
+        Nothing to do, the clients know whose turn it is from START
+        """
+
+
+class Match:
+    """
+    A match between two connections
+    """
+
+    def __init__(self, server, connection1, connection2):
+        """
+        Constructor, starts the match
+        :param server:      GameServer, the server
+        :param connection1: Connection, first player
+        :param connection2: Connection, second player
+        """
+
+        self.__server = server
+        self.__connections = (connection1, connection2)
+        self.__players = (connection1.get_player(), connection2.get_player())
+
+        for index, connection in enumerate(self.__connections):
+            connection.set_match(self)
+            connection.send(f"MATCHED {index} "
+                            f"{escape(str(self.__players[1 - index]))}")
+
+        _, _, sink_from_one, _ = connection1.get_settings()
+        self.__game = GameLogic(bool(sink_from_one), *self.__players,
+                                server.get_rng())
+        starter = self.__game.start_game()
+        self.send_both(f"START {self.__game.player_index(starter)}")
+
+    def send_both(self, line):
+        """
+        Sends a line to both players
+        :param line:    str,    line without the line break
+        """
+
+        for connection in self.__connections:
+            connection.send(line)
+
+    def fire_shot(self, connection, x, y):
+        """
+        Fires a shot of a player
+        :param connection:  Connection, connection of the firing player
+        :param x:           int,        playing field x coordinate
+        :param y:           int,        playing field y coordinate
+        """
+
+        index = self.__connections.index(connection)
+        firer = self.__players[index]
+        opponent = self.__players[1 - index]
+
+        # raises ValueError if it's not the player's turn
+        # or the field was already fired at
+        hit = self.__game.fire_shot(x, y, firer)
+
+        line = f"SHOT {index} {x} {y} "
+        ship = opponent.get_ship(x, y) if hit else None
+        if ship is not None and ship.parts_left() == 0:
+            origin_x, origin_y = ship.get_origin()
+            line += f"{SHOT_RESULTS[SHOT_SUNK]} {origin_x} {origin_y} " \
+                    f"{'v' if ship.is_vertical() else 'h'} {ship.get_size()}"
+        else:
+            line += SHOT_RESULTS[SHOT_HIT if hit else 0]
+        self.send_both(line)
+
+        if self.__game.game_ended():
+            self.end(index, "WON")
+
+    def forfeit(self, connection):
+        """
+        Handles a player forfeiting
+        :param connection:  Connection, connection of the player
+        """
+
+        index = self.__connections.index(connection)
+        self.__game.forfeit_game(self.__players[index])
+        self.end(1 - index, "FORFEIT")
+
+    def disconnected(self, connection):
+        """
+        Handles a player disconnecting, the opponent wins
+        :param connection:  Connection, connection of the player
+        """
+
+        index = self.__connections.index(connection)
+        self.__game.forfeit_game(self.__players[index])
+        self.end(1 - index, "DISCONNECT")
+
+    def end(self, winner, reason):
+        """
+        Ends the match
+        :param winner:  int,    index of the winner
+        :param reason:  str,    WON, FORFEIT or DISCONNECT
+        """
+
+        self.send_both(f"END {winner} {reason}")
+        for connection in self.__connections:
+            connection.set_match(None)
+        self.__server.match_ended(sum(player.shots_fired()
+                                      for player in self.__players))
+
+
+async def serve(host, port):
+    """
+    Runs the server until interrupted, printing statistics every ten
+    seconds
+    :param host:    str,    host to listen on
+    :param port:    int,    port to listen on
+    """
+
+    game_server = GameServer()
+    server = await game_server.start(host, port)
+    print("Listening on " + ", ".join(str(socket.getsockname())
+                                      for socket in server.sockets))
+
+    async with server:
+        while True:
+            await asyncio.sleep(10)
+            connections, matches, shots = game_server.statistics()
+            print(f"{connections} clients connected, {matches} matches "
+                  f"and {shots} shots played")
+
+
+async def bench_client(host, port, settings, rng):
+    """
+    Plays one match as a client firing at random fields
+    :param host:        str,            server host
+    :param port:        int,            server port
+    :param settings:    str,            arguments of PLAY
+    :param rng:         random.Random,  random number generator
+    :return:            int,            shots this client fired
+    """
+
+    reader, writer = await asyncio.open_connection(host, port,
+                                                   limit=MAX_LINE_LENGTH)
+    width, height = (int(word) for word in settings.split()[:2])
+    targets = [(x, y) for y in range(height) for x in range(width)]
+    rng.shuffle(targets)
+
+    writer.write(f"NAME bench\nPLAY {settings}\nPLACE RANDOM\n".encode())
+    index = turn = None
+    shots = 0
+    try:
+        while True:
+            words = (await reader.readline()).decode().split()
+            if not words:
+                raise ConnectionError("The server closed the connection")
+
+            if words[0] == "MATCHED":
+                index = int(words[1])
+            elif words[0] == "START":
+                turn = int(words[1])
+            elif words[0] == "SHOT":
+                turn = 1 - int(words[1])
+            elif words[0] == "END":
+                return shots
+            elif words[0] == "ERROR":
+                raise RuntimeError(" ".join(words[1:]))
+            else:
+                continue
+
+            if index is not None and turn == index \
+                    and words[0] in ("START", "SHOT"):
+                x, y = targets.pop()
+                writer.write(f"FIRE {x} {y}\n".encode())
+                shots += 1
+    finally:
+        writer.close()
+
+
+async def bench(host, port, matches, concurrency, settings, seed):
+    """
+    Plays random matches against a server and prints the throughput
+    :param host:        str,    server host, None = start a server in
+                                this process
+    :param port:        int,    server port
+    :param matches:     int,    how many matches to play
+    :param concurrency: int,    how many matches to play at the same time
+    :param settings:    str,    arguments of PLAY
+    :param seed:        int,    random seed
+    """
+
+    rng = random.Random(seed)
+    server = None
+    if host is None:
+        server = await GameServer(random.Random(seed)).start(DEFAULT_HOST, 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    # clients waiting to play, two for each match
+    remaining = [matches * 2]
+    shots = [0]
+
+    async def client_loop():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            fired = await bench_client(host, port, settings,
+                                       random.Random(rng.random()))
+            shots[0] += fired
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop()
+                           for _ in range(min(2 * concurrency,
+                                              2 * matches))))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    print(f"{matches} matches, {shots[0]} shots in {elapsed:.2f} s: "
+          f"{matches / elapsed:.1f} matches/s, "
+          f"{shots[0] / elapsed:.1f} shots/s")
+
+
+def main(argv=None):
+    """
+    Entrypoint of the server command line
+    :param argv:    list,   command line arguments, defaults to sys.argv
+    """
+
+    parser = argparse.ArgumentParser(description="Battleships game server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the server")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    bench_parser = commands.add_parser(
+        "bench", help="measure how many matches a server sustains")
+    bench_parser.add_argument("--host", default=None,
+                              help="server to play against, defaults to "
+                                   "one started in this process")
+    bench_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bench_parser.add_argument("--matches", type=int, default=1000)
+    bench_parser.add_argument("--concurrency", type=int, default=200,
+                              help="matches played at the same time")
+    bench_parser.add_argument("--width", type=int,
+                              default=DEFAULT_FIELD_WIDTH)
+    bench_parser.add_argument("--height", type=int,
+                              default=DEFAULT_FIELD_HEIGHT)
+    bench_parser.add_argument("--fleet", default=str(DEFAULT_FLEET))
+    bench_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port))
+        else:
+            asyncio.run(bench(args.host, args.port, args.matches,
+                              args.concurrency,
+                              f"{args.width} {args.height} 0 {args.fleet}",
+                              args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
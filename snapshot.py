@@ -0,0 +1,256 @@
+"""
+Battleships game snapshots
+
+Saves the whole state of a game to a compact binary snapshot and restores
+it, so a game can be resumed later or a simulation can checkpoint its games.
+Restoring rebuilds the players and the game directly from the snapshot,
+no shots are replayed. Taking a snapshot of a 10x10 game takes tens of
+microseconds.
+
+A snapshot starts with the magic bytes "BSSN" and a version byte, followed by
+    - a header: playing field width and height as unsigned shorts and a
+      flags byte, see the FLAG_* constants
+    - the fleet as text, see Fleet.parse, prefixed with its length as an
+      unsigned short
+    - for both players
+        - the name and the controller as UTF-8, each prefixed with its
+          length as a byte. The controller is free text for whoever takes
+          the snapshot, e.g. the gui stores which computer opponent, if any,
+          played the player.
+        - shots fired and shots hit as unsigned ints
+        - the hit and the missed fields as little endian bitboards of the
+          whole playing field, see engine.join_rows
+        - each ship in the placing order of the fleet: field index << 1 |
+          vertical as an unsigned int, the hits it has taken as an unsigned
+          short and its damage as a little endian bitmask
+    - the log tail as UTF-8, prefixed with its length as an unsigned int
+
+    data = take_snapshot(game, log)
+    game, log, controllers = restore_snapshot(data)
+"""
+
+import random
+import struct
+
+from engine import Player, GameLogic, Fleet, join_rows
+
+
+MAGIC = b"BSSN"
+VERSION = 1
+
+# flags of the header
+FLAG_SINK_FROM_ONE = 0b0001
+FLAG_PLAYER2_TURN = 0b0010
+FLAG_ENDED = 0b0100
+FLAG_PLAYER2_WON = 0b1000
+
+HEADER = struct.Struct("<HHB")
+FLEET_LENGTH = struct.Struct("<H")
+SHOTS = struct.Struct("<II")
+SHIP = struct.Struct("<IH")
+LOG_LENGTH = struct.Struct("<I")
+
+# how much of the end of a game log is kept in a snapshot
+LOG_TAIL_LENGTH = 8000
+
+
+def take_snapshot(game, log="", controllers=("", "")):
+    """
+    Takes a snapshot of a started game
+    :param game:        GameLogic,  the game
+    :param log:         str,        game log, only its tail is kept
+    :param controllers: tuple,      free text for both players, e.g. which
+                                    computer opponent played them
+    :return:            bytes,      the snapshot
+    """
+
+    player1, player2 = game.get_players()
+    width = player1.get_width()
+    height = player1.get_height()
+    fleet = str(player1.get_fleet()).encode()
+
+    if game.current_player() is None:
+        raise ValueError("The game hasn't been started")
+
+    flags = 0
+    if game.sink_from_one():
+        flags |= FLAG_SINK_FROM_ONE
+    if game.current_player() is player2:
+        flags |= FLAG_PLAYER2_TURN
+    if game.game_ended():
+        flags |= FLAG_ENDED
+    if game.winner() is player2:
+        flags |= FLAG_PLAYER2_WON
+
+    field_bytes = (width * height + 7) // 8
+    parts = [MAGIC, bytes((VERSION,)), HEADER.pack(width, height, flags),
+             FLEET_LENGTH.pack(len(fleet)), fleet]
+
+    for player, controller in zip((player1, player2), controllers):
+        parts.append(encode_text(str(player)))
+        parts.append(encode_text(controller))
+        parts.append(SHOTS.pack(player.shots_fired(), player.shots_hit()))
+        parts.append(join_rows(player.hit_rows(), width)
+                     .to_bytes(field_bytes, "little"))
+        parts.append(join_rows(player.miss_rows(), width)
+                     .to_bytes(field_bytes, "little"))
+
+        battleships = player.get_battleships()
+
+        # how many ships of each type have been saved
+        saved = {}
+        for ship_type in player.get_fleet().get_place_order():
+            ship = battleships[ship_type][saved.setdefault(ship_type, 0)]
+            saved[ship_type] += 1
+
+            x, y = ship.get_origin()
+            parts.append(SHIP.pack((y * width + x) << 1 | ship.is_vertical(),
+                                   ship.hits_taken()))
+            parts.append(ship.get_damage().to_bytes(
+                (ship.get_size() + 7) // 8, "little"))
+
+    log = log[-LOG_TAIL_LENGTH:].encode()
+    parts.append(LOG_LENGTH.pack(len(log)))
+    parts.append(log)
+    return b"".join(parts)
+
+
+def restore_snapshot(data, rng=random, recorder=None):
+    """
+    Restores a game from a snapshot. The players have no game windows,
+    set them and call resume_game of the game again to report to them.
+    :param data:        bytes,          the snapshot
+    :param rng:         random.Random,  random number generator of the game
+    :param recorder:    object,         recorder of the game, see GameLogic
+    :return:            tuple,          the resumed GameLogic, the log tail
+                                        and the controllers of both players
+    """
+
+    if data[:len(MAGIC) + 1] != MAGIC + bytes((VERSION,)):
+        raise ValueError("Not a version 1 Battleships snapshot")
+
+    try:
+        position = len(MAGIC) + 1
+        width, height, flags = HEADER.unpack_from(data, position)
+        position += HEADER.size
+
+        fleet_length, = FLEET_LENGTH.unpack_from(data, position)
+        position += FLEET_LENGTH.size
+        fleet = Fleet.parse(data[position:position + fleet_length].decode())
+        position += fleet_length
+
+        field_bytes = (width * height + 7) // 8
+        players = []
+        controllers = []
+        for _ in range(2):
+            name, position = decode_text(data, position)
+            controller, position = decode_text(data, position)
+            controllers.append(controller)
+            player = Player(name, width, height, fleet)
+
+            shots_fired, shots_hit = SHOTS.unpack_from(data, position)
+            position += SHOTS.size
+            hit_rows = split_rows(data[position:position + field_bytes],
+                                  width, height)
+            position += field_bytes
+            miss_rows = split_rows(data[position:position + field_bytes],
+                                   width, height)
+            position += field_bytes
+
+            for ship_type in fleet.get_place_order():
+                code, hits_taken = SHIP.unpack_from(data, position)
+                position += SHIP.size
+                field = code >> 1
+                player.add_battleship(ship_type, bool(code & 1),
+                                      (field % width, field // width))
+
+                ship = player.get_battleships()[ship_type][-1]
+                damage_bytes = (ship.get_size() + 7) // 8
+                ship.restore_damage(int.from_bytes(
+                    data[position:position + damage_bytes], "little"),
+                    hits_taken)
+                position += damage_bytes
+
+            player.restore_shots(shots_fired, shots_hit, hit_rows, miss_rows)
+            players.append(player)
+
+        log_length, = LOG_LENGTH.unpack_from(data, position)
+        position += LOG_LENGTH.size
+        log = data[position:position + log_length].decode(errors="replace")
+    except (struct.error, IndexError, KeyError) as error:
+        raise ValueError("The snapshot is corrupted") from error
+
+    game = GameLogic(bool(flags & FLAG_SINK_FROM_ONE), *players, rng=rng,
+                     recorder=recorder)
+    winner = None
+    if flags & FLAG_ENDED:
+        winner = players[bool(flags & FLAG_PLAYER2_WON)]
+    game.resume_game(players[bool(flags & FLAG_PLAYER2_TURN)], winner)
+    return game, log, tuple(controllers)
+
+
+def save_snapshot(path, game, log="", controllers=("", "")):
+    """
+    Saves a snapshot of a game to a file, see take_snapshot
+    :param path:        str,        path of the file
+    :param game:        GameLogic,  the game
+    :param log:         str,        game log, only its tail is kept
+    :param controllers: tuple,      free text for both players
+    """
+
+    data = take_snapshot(game, log, controllers)
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+def load_snapshot(path, rng=random, recorder=None):
+    """
+    Restores a game from a snapshot file, see restore_snapshot
+    :param path:        str,            path of the file
+    :param rng:         random.Random,  random number generator of the game
+    :param recorder:    object,         recorder of the game, see GameLogic
+    :return:            tuple,          the resumed GameLogic, the log tail
+                                        and the controllers of both players
+    """
+
+    with open(path, "rb") as file:
+        return restore_snapshot(file.read(), rng, recorder)
+
+
+def encode_text(text):
+    """
+    Encodes a name or a controller for a snapshot
+    :param text:    str,    the text
+    :return:        bytes,  UTF-8 prefixed with its length, cut to 255 bytes
+    """
+
+    encoded = text.encode()[:255]
+    return bytes((len(encoded),)) + encoded
+
+
+def decode_text(data, position):
+    """
+    Decodes a name or a controller of a snapshot
+    :param data:        bytes,  the snapshot
+    :param position:    int,    position of the length prefix
+    :return:            tuple,  the text and the position after it
+    """
+
+    length = data[position]
+    position += 1
+    return (data[position:position + length].decode(errors="replace"),
+            position + length)
+
+
+def split_rows(data, width, height):
+    """
+    Splits a little endian bitboard of the whole playing field into rows
+    :param data:    bytes,  the bitboard
+    :param width:   int,    playing field width
+    :param height:  int,    playing field height
+    :return:        list,   int for each row
+    """
+
+    board = int.from_bytes(data, "little")
+    mask = (1 << width) - 1
+    return [board >> (y * width) & mask for y in range(height)]
@@ -0,0 +1,22 @@
+"""
+Helpers shared by the tests
+"""
+
+from engine import Player, GameLogic, Fleet
+
+
+def tiny_game(recorder=None, names=("A", "B")):
+    """
+    Returns a started game on a 3x1 field with one submarine each,
+    the first player starts
+    """
+
+    fleet = Fleet.parse("Sub:1x1")
+    player1 = Player(names[0], 3, 1, fleet)
+    player1.add_battleship("Sub", True, (0, 0))
+    player2 = Player(names[1], 3, 1, fleet)
+    player2.add_battleship("Sub", True, (2, 0))
+
+    game = GameLogic(False, player1, player2, recorder=recorder)
+    game.start_game(player1)
+    return game, player1, player2
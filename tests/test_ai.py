@@ -0,0 +1,200 @@
+"""
+Tests of the computer opponents
+"""
+
+import random
+import unittest
+
+import ai
+from engine import Player, GameLogic, Fleet
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def bot_game(rng, bot_classes, width=10, height=10):
+    """
+    Plays a game of randomly placed default fleets between two bots,
+    returns the index of the winner
+    """
+
+    players = [Player(name, width, height) for name in ("A", "B")]
+    for player in players:
+        player.place_fleet_randomly(rng)
+
+    bots = {player: bot_class(player, rng)
+            for player, bot_class in zip(players, bot_classes)}
+    game = GameLogic(False, *players, rng)
+    game.start_game()
+    winner = ai.play_game(game, bots)
+    for bot in bots.values():
+        bot.shutdown()
+    return game.player_index(winner)
+
+
+@unittest.skipIf(numpy is None, "needs NumPy")
+class ProbabilityBotTest(unittest.TestCase):
+
+    def brute_force_density(self, free, pending, size, hit_weight):
+        """
+        Counts the horizontal placements covering each field one by one
+        """
+
+        height, width = free.shape
+        density = numpy.zeros((height, width))
+        for y in range(height):
+            for x in range(width - size + 1):
+                span = range(x, x + size)
+                if not all(free[y, i] for i in span):
+                    continue
+                next_to = [(y, x - 1), (y, x + size)] \
+                    + [(y - 1, i) for i in span] + [(y + 1, i) for i in span]
+                if any(0 <= near_y < height and 0 <= near_x < width
+                       and pending[near_y, near_x]
+                       for near_y, near_x in next_to):
+                    continue
+                weight = hit_weight ** sum(int(pending[y, i]) for i in span)
+                for i in span:
+                    density[y, i] += weight
+        return density
+
+    def test_row_density(self):
+        rng = numpy.random.default_rng(1)
+        for _ in range(200):
+            height, width = rng.integers(1, 9, size=2)
+            free = rng.random((height, width)) < 0.8
+            pending = free & (rng.random((height, width)) < 0.15)
+            size = int(rng.integers(1, 6))
+            numpy.testing.assert_allclose(
+                ai.row_density(free, pending, size, 50.0),
+                self.brute_force_density(free, pending, size, 50.0))
+
+    def test_rows_to_array(self):
+        for width in (5, 63, 64, 70):
+            rows = [random.Random(width + y).getrandbits(width)
+                    for y in range(4)]
+            expected = [[bool(row >> x & 1) for x in range(width)]
+                        for row in rows]
+            self.assertEqual(ai.rows_to_array(rows, width).tolist(),
+                             expected)
+
+    def test_density_finishes_off_a_hit(self):
+        fleet = Fleet.parse("Cruiser:3x1")
+        player = Player("A", 7, 7, fleet)
+        opponent = Player("B", 7, 7, fleet)
+        player.add_battleship("Cruiser", False, (0, 0))
+        opponent.add_battleship("Cruiser", False, (2, 3))
+        game = GameLogic(False, player, opponent)
+        game.start_game(player)
+        bot = ai.ProbabilityBot(player, random.Random(1))
+
+        game.fire_shot(2, 3, player)
+        game.fire_shot(6, 6, opponent)
+        self.assertEqual(bot.probability_density(game)[3, 2], 0.0)
+        self.assertIn(bot.choose_shot(game),
+                      {(1, 3), (3, 3), (2, 2), (2, 4)})
+
+        # two hits in a row, the ship lies along them
+        game.fire_shot(3, 3, player)
+        game.fire_shot(5, 6, opponent)
+        self.assertIn(bot.choose_shot(game), {(1, 3), (4, 3)})
+
+        # a miss at one end leaves the other end
+        game.fire_shot(1, 3, player)
+        game.fire_shot(4, 6, opponent)
+        self.assertEqual(bot.choose_shot(game), (4, 3))
+
+    def test_density_skips_sunk_ships(self):
+        fleet = Fleet.parse("Cruiser:3x1, Submarine:1x1")
+        player = Player("A", 5, 5, fleet)
+        opponent = Player("B", 5, 5, fleet)
+        for owner in (player, opponent):
+            owner.add_battleship("Cruiser", False, (0, 0))
+            owner.add_battleship("Submarine", True, (4, 4))
+        game = GameLogic(True, player, opponent)
+        game.start_game(player)
+        game.fire_shot(1, 0, player)
+
+        density = ai.ProbabilityBot(player).probability_density(game)
+        # the sunk cruiser and the fields next to it
+        for x, y in ((0, 0), (1, 0), (2, 0), (3, 0), (0, 1), (1, 1),
+                     (2, 1)):
+            self.assertEqual(density[y, x], 0.0, (x, y))
+        self.assertGreater(density[4, 4], 0.0)
+
+    def test_beats_random_shots(self):
+        rng = random.Random(4)
+        winners = [bot_game(rng, (ai.ProbabilityBot, ai.RandomBot))
+                   for _ in range(10)]
+        self.assertGreaterEqual(winners.count(0), 9)
+
+
+class MonteCarloBotTest(unittest.TestCase):
+
+    def test_sampled_fleets_cover_the_hits(self):
+        width, height = 7, 6
+        sizes = [4, 3, 2, 1]
+        forbidden = 1 << (2 * width + 2) | 1 << (5 * width + 6)
+        hit = 3 * width + 4
+        coverage = ai.sample_coverage(width, height, sizes, forbidden,
+                                      1 << hit, 5, 0.0, samples=300)
+
+        self.assertEqual(coverage, ai.sample_coverage(
+            width, height, sizes, forbidden, 1 << hit, 5, 0.0, samples=300))
+        fleets = sum(coverage.values()) / sum(sizes)
+        self.assertGreater(fleets, 0)
+        # every sampled fleet has a ship through the hit
+        self.assertEqual(coverage[hit], fleets)
+        for index in coverage:
+            self.assertFalse(forbidden >> index & 1, index)
+
+    def test_opponent_knowledge(self):
+        fleet = Fleet.parse("Cruiser:3x1, Submarine:1x1")
+        player = Player("A", 5, 5, fleet)
+        opponent = Player("B", 5, 5, fleet)
+        for owner in (player, opponent):
+            owner.add_battleship("Cruiser", False, (0, 0))
+            owner.add_battleship("Submarine", True, (4, 4))
+        game = GameLogic(False, player, opponent)
+        game.start_game(player)
+        for x, y in ((4, 4), (1, 0), (2, 2)):
+            game.fire_shot(x, y, player)
+            game.fire_shot(x, y + 1 if y < 4 else 0, opponent)
+
+        def mask(*fields):
+            return sum(1 << (y * 5 + x) for x, y in fields)
+
+        self.assertEqual(ai.opponent_knowledge(opponent),
+                         (mask((4, 4), (1, 0), (2, 2)),
+                          mask((2, 2), (4, 4), (3, 4), (4, 3)),
+                          mask((1, 0)), [3]))
+
+    def test_pick_shot(self):
+        rng = random.Random(1)
+        coverage = [0, 5, 5, 9, 1, 0]
+        # the best field has been fired at, ties are broken randomly
+        shots = {ai.pick_shot(3, 2, coverage, 1 << 3, 0, rng)
+                 for _ in range(50)}
+        self.assertEqual(shots, {(1, 0), (2, 0)})
+        # every field left is known to be water, fire at any of them
+        self.assertEqual(ai.pick_shot(3, 2, [0] * 6, 0b011111, 0b100000,
+                                      rng), (2, 1))
+
+    def test_beats_random_shots(self):
+        rng = random.Random(5)
+        winners = [bot_game(rng, (lambda player, rng: ai.MonteCarloBot(
+            player, workers=0, rng=rng, samples=50), ai.RandomBot))
+                   for _ in range(10)]
+        self.assertGreaterEqual(winners.count(0), 9)
+
+    def test_samples_on_a_process_pool(self):
+        rng = random.Random(6)
+        winner = bot_game(rng, (lambda player, rng: ai.MonteCarloBot(
+            player, workers=2, rng=rng, samples=20), ai.RandomBot))
+        self.assertEqual(winner, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
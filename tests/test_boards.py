@@ -0,0 +1,148 @@
+"""
+Tests of the playing field renderers, skipped without a display
+"""
+
+import unittest
+from tkinter import Tk, Button, Canvas, TclError
+from unittest import mock
+
+from boards import WidgetBoard, CanvasBoard
+
+
+class TkTestCase(unittest.TestCase):
+    """
+    Creates a hidden Tk root window for each test
+    """
+
+    def setUp(self):
+        try:
+            self.root = Tk()
+        except TclError as error:
+            self.skipTest(f"no display: {error}")
+        self.root.withdraw()
+        self.clicks = []
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def click(self, x, y):
+        self.clicks.append((x, y))
+
+
+class WidgetBoardTest(TkTestCase):
+
+    def create_board(self):
+        board = WidgetBoard(self.root, 5, 4, "blue", self.click)
+        board.grid(row=0, column=0)
+        frame, = self.root.winfo_children()
+        # a button for each field and the cover
+        fields = frame.winfo_children()
+        return board, fields[:-1], fields[-1]
+
+    def test_only_changes_are_sent(self):
+        board, _, _ = self.create_board()
+        with mock.patch.object(Button, "config", autospec=True,
+                               side_effect=Button.config) as config:
+            board.set_color(2, 1, "blue")
+            board.set_enabled(2, 1, True)
+            board.set_field(2, 1, "blue", True)
+            self.assertEqual(config.call_count, 0)
+
+            board.set_color(2, 1, "red")
+            board.set_color(2, 1, "red")
+            self.assertEqual(config.call_count, 1)
+            board.set_enabled(2, 1, False)
+            board.set_enabled(2, 1, False)
+            self.assertEqual(config.call_count, 2)
+            board.set_field(3, 1, "red", False)
+            board.set_field(3, 1, "red", False)
+            self.assertEqual(config.call_count, 3)
+
+            board.lock()
+            board.hide("gray")
+            board.show()
+            board.unlock()
+            self.assertEqual(config.call_count, 3)
+
+    def test_clicks(self):
+        board, fields, _ = self.create_board()
+        fields[1 * 5 + 2].invoke()
+        self.assertEqual(self.clicks, [(2, 1)])
+
+        board.lock()
+        fields[0].invoke()
+        board.unlock()
+        fields[4 * 5 - 1].invoke()
+        self.assertEqual(self.clicks, [(2, 1), (4, 3)])
+
+        board.set_enabled(4, 3, False)
+        fields[4 * 5 - 1].invoke()
+        self.assertEqual(self.clicks, [(2, 1), (4, 3)])
+
+    def test_hide_and_show(self):
+        board, _, cover = self.create_board()
+        self.assertEqual(cover.winfo_manager(), "")
+        board.hide("gray")
+        self.assertEqual(cover.winfo_manager(), "place")
+        self.assertEqual(cover["bg"], "gray")
+        board.show()
+        self.assertEqual(cover.winfo_manager(), "")
+
+
+class CanvasBoardTest(TkTestCase):
+
+    def create_board(self, width=5, height=4):
+        board = CanvasBoard(self.root, width, height, "blue", self.click)
+        board.grid(row=0, column=0)
+        canvas, = self.root.winfo_children()[-1].winfo_children()
+        return board, canvas
+
+    def click_at(self, canvas, x, y):
+        canvas.event_generate("<Button-1>", x=x, y=y)
+
+    def test_only_changes_are_sent(self):
+        board, _ = self.create_board()
+        with mock.patch.object(Canvas, "itemconfig", autospec=True,
+                               side_effect=Canvas.itemconfig) as itemconfig:
+            board.set_color(2, 1, "blue")
+            board.set_field(2, 1, "blue", True)
+            # clicks are checked on the board, nothing to send
+            board.set_enabled(2, 1, False)
+            board.set_enabled(2, 1, True)
+            self.assertEqual(itemconfig.call_count, 0)
+
+            board.set_color(2, 1, "red")
+            board.set_field(2, 1, "red", False)
+            self.assertEqual(itemconfig.call_count, 1)
+
+    def test_clicks(self):
+        board, canvas = self.create_board()
+        size = CanvasBoard.MAX_FIELD_SIZE
+
+        self.click_at(canvas, 2 * size + 1, 1 * size + size - 1)
+        self.assertEqual(self.clicks, [(2, 1)])
+
+        board.lock()
+        self.click_at(canvas, 0, 0)
+        board.unlock()
+        self.click_at(canvas, 5 * size - 1, 4 * size - 1)
+        self.assertEqual(self.clicks, [(2, 1), (4, 3)])
+
+        board.set_enabled(4, 3, False)
+        self.click_at(canvas, 5 * size - 1, 4 * size - 1)
+        # past the last field
+        self.click_at(canvas, 5 * size, 0)
+        self.assertEqual(self.clicks, [(2, 1), (4, 3)])
+
+    def test_field_size(self):
+        for width, height, field_size in ((5, 4, CanvasBoard.MAX_FIELD_SIZE),
+                                          (20, 10, 20),
+                                          (200, 100,
+                                           CanvasBoard.MIN_FIELD_SIZE)):
+            _, canvas = self.create_board(width, height)
+            self.assertEqual((int(canvas["width"]), int(canvas["height"])),
+                             (width * field_size, height * field_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
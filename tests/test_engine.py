@@ -0,0 +1,364 @@
+"""
+Tests of the headless game engine
+"""
+
+import random
+import unittest
+
+from engine import Player, GameLogic, Battleship, Fleet, join_rows
+from helpers import tiny_game
+
+
+FLEET = Fleet.parse("Cruiser:3x1, Destroyer:2x1")
+
+
+def small_game(sink_from_one=False):
+    """
+    Returns a started game on a 5x4 field with a cruiser and a destroyer
+    each, at the same fields, the first player starts
+    """
+
+    players = []
+    for name in ("A", "B"):
+        player = Player(name, 5, 4, FLEET)
+        # cruiser at A1-C1, destroyer at E2-E3
+        player.add_battleship("Cruiser", False, (0, 0))
+        player.add_battleship("Destroyer", True, (4, 1))
+        players.append(player)
+
+    game = GameLogic(sink_from_one, *players)
+    game.start_game(players[0])
+    return game, players[0], players[1]
+
+
+def random_game(rng, sink_from_one=False, width=12, height=9):
+    """
+    Returns a started game of randomly placed default fleets and the
+    fields each player fires at, in order
+    """
+
+    player1 = Player("Player 1", width, height)
+    player2 = Player("Player 2", width, height)
+    player1.place_fleet_randomly(rng)
+    player2.place_fleet_randomly(rng)
+
+    game = GameLogic(sink_from_one, player1, player2, rng)
+    game.start_game()
+    targets = {player: [(x, y) for y in range(height) for x in range(width)]
+               for player in (player1, player2)}
+    for targets_left in targets.values():
+        rng.shuffle(targets_left)
+    return game, targets
+
+
+def fire_until_the_end(game, targets):
+    """
+    Fires the next field of each player's targets that hasn't been fired
+    at until the game ends, yields after each shot
+    """
+
+    while not game.game_ended():
+        firer = game.current_player()
+        opponent = game.get_opponent(firer)
+        x, y = targets[firer].pop()
+        # ships sinking from one hit mark their other parts hit
+        if opponent.field_state(x, y) > 1:
+            continue
+        game.fire_shot(x, y, firer)
+        yield firer
+
+
+def count_bits(rows):
+    """
+    Returns how many bits of bitboard rows are set
+    """
+
+    return sum(bin(row).count("1") for row in rows)
+
+
+class FireShotTest(unittest.TestCase):
+
+    def test_shot_outside_the_field(self):
+        game, player1, player2 = tiny_game()
+        for x, y in ((3, 0), (0, 1), (-1, 0), (0, -1), (100, 100)):
+            with self.assertRaisesRegex(ValueError, "outside"):
+                game.fire_shot(x, y, player1)
+
+        # nothing changed, not even bits past the end of a row
+        self.assertIs(game.current_player(), player1)
+        self.assertEqual(player1.shots_fired(), 0)
+        self.assertEqual(player2.miss_rows(), [0])
+        self.assertEqual(player2.hit_rows(), [0])
+
+    def test_shot_out_of_turn(self):
+        game, player1, player2 = tiny_game()
+        with self.assertRaisesRegex(ValueError, "turn"):
+            game.fire_shot(1, 0, player2)
+
+        self.assertIs(game.current_player(), player1)
+        self.assertEqual(player2.shots_fired(), 0)
+        self.assertEqual(player1.miss_rows(), [0])
+
+    def test_repeated_shot(self):
+        game, player1, player2 = small_game()
+        self.assertFalse(game.fire_shot(1, 1, player1))
+        self.assertTrue(game.fire_shot(0, 0, player2))
+        self.assertTrue(game.fire_shot(0, 0, player1))
+        self.assertFalse(game.fire_shot(1, 1, player2))
+
+        for x, y in ((1, 1), (0, 0)):
+            with self.assertRaisesRegex(ValueError, "already"):
+                game.fire_shot(x, y, player1)
+        self.assertIs(game.current_player(), player1)
+        self.assertEqual(player1.shots_fired(), 2)
+        self.assertEqual(player2.hits_taken(), 1)
+
+    def test_game_not_running(self):
+        game, player1, player2 = tiny_game()
+        game.fire_shot(2, 0, player1)
+        self.assertIs(game.winner(), player1)
+        with self.assertRaisesRegex(ValueError, "not running"):
+            game.fire_shot(0, 0, player2)
+
+        game = GameLogic(False, Player("A"), Player("B"))
+        with self.assertRaisesRegex(ValueError, "not running"):
+            game.fire_shot(0, 0, game.get_players()[0])
+
+
+class PlayingFieldTest(unittest.TestCase):
+
+    def test_playing_field_matches_the_bitboards(self):
+        rng = random.Random(1)
+        game, targets = random_game(rng)
+        shots = fire_until_the_end(game, targets)
+        for _ in range(120):
+            next(shots)
+
+        for player in game.get_players():
+            width = player.get_width()
+            ship_fields = {coords
+                           for ships in player.get_battleships().values()
+                           for ship in ships
+                           for coords in ship.get_coords()}
+            # fields the opponent hasn't fired at yet
+            unfired = set(targets[game.get_opponent(player)])
+
+            field = player.get_playing_field()
+            self.assertEqual(len(field), player.get_height())
+            for y, row in enumerate(field):
+                self.assertEqual(len(row), width)
+                for x, state in enumerate(row):
+                    bit = 1 << x
+                    if (x, y) in unfired:
+                        expected = 1 if (x, y) in ship_fields else 0
+                    elif (x, y) in ship_fields:
+                        expected = 2
+                    else:
+                        expected = 3
+                    self.assertEqual(state, expected, (x, y))
+                    self.assertEqual(player.field_state(x, y), state)
+                    self.assertEqual(bool(player.ship_rows()[y] & bit),
+                                     (x, y) in ship_fields)
+                    self.assertEqual(bool(player.hit_rows()[y] & bit),
+                                     state == 2)
+                    self.assertEqual(bool(player.miss_rows()[y] & bit),
+                                     state == 3)
+
+                    field_bit = 1 << (y * width + x)
+                    self.assertEqual(bool(player.ship_mask() & field_bit),
+                                     (x, y) in ship_fields)
+                    self.assertEqual(bool(player.hit_mask() & field_bit),
+                                     state == 2)
+                    self.assertEqual(bool(player.miss_mask() & field_bit),
+                                     state == 3)
+                    self.assertEqual(
+                        bool(player.shootable_mask() & field_bit),
+                        state < 2)
+
+    def test_join_rows(self):
+        self.assertEqual(join_rows([], 2), 0)
+        self.assertEqual(join_rows([0b10], 2), 0b10)
+        self.assertEqual(join_rows([0b01, 0b10, 0b11], 2), 0b111001)
+        rows = [random.Random(y).getrandbits(7) for y in range(13)]
+        self.assertEqual(join_rows(rows, 7),
+                         sum(row << (y * 7) for y, row in enumerate(rows)))
+
+
+class ShipIndexTest(unittest.TestCase):
+
+    def test_ship_at_each_field(self):
+        rng = random.Random(2)
+        for width, height in ((10, 10), (12, 9), (9, 12), (30, 20)):
+            player = Player("A", width, height)
+            player.place_fleet_randomly(rng)
+
+            ship_at = {coords: ship
+                       for ships in player.get_battleships().values()
+                       for ship in ships
+                       for coords in ship.get_coords()}
+            for y in range(height):
+                for x in range(width):
+                    self.assertIs(player.get_ship(x, y), ship_at.get((x, y)),
+                                  (width, height, x, y))
+
+    def test_ship_at_the_end_of_a_row(self):
+        player = Player("A", 5, 4, FLEET)
+        player.add_battleship("Destroyer", True, (4, 1))
+
+        ship = player.get_ship(4, 1)
+        self.assertEqual(str(ship), "Destroyer")
+        self.assertIs(player.get_ship(4, 2), ship)
+        # the next field in the index is the first one of the next row
+        self.assertIsNone(player.get_ship(0, 2))
+        self.assertIsNone(player.get_ship(4, 0))
+        self.assertIsNone(player.get_ship(4, 3))
+
+
+class DamageTest(unittest.TestCase):
+
+    def test_damage_bitmask(self):
+        for vertical, parts in ((False, [(3, 1), (4, 1), (2, 1)]),
+                                (True, [(2, 2), (2, 3), (2, 1)])):
+            ship = Battleship("Cruiser", vertical, (2, 1), 3)
+            self.assertEqual(ship.get_damage(), 0)
+
+            self.assertEqual(ship.assign_hit(*parts[0], False), 2)
+            self.assertEqual(ship.get_damage(), 0b010)
+            # a part can only be lost once
+            self.assertEqual(ship.assign_hit(*parts[0], False), 2)
+            self.assertEqual(ship.get_damage(), 0b010)
+            self.assertEqual(ship.assign_hit(*parts[1], False), 1)
+            self.assertEqual(ship.get_damage(), 0b110)
+            self.assertEqual(ship.assign_hit(*parts[2], False), 0)
+            self.assertEqual(ship.get_damage(), 0b111)
+            self.assertEqual(ship.hits_taken(), 4)
+            self.assertEqual(ship.parts_left(), 0)
+
+    def test_restore_damage(self):
+        ship = Battleship("Cruiser", False, (0, 0), 3)
+        ship.restore_damage(0b101, 4)
+        self.assertEqual(ship.get_damage(), 0b101)
+        self.assertEqual(ship.parts_left(), 1)
+        self.assertEqual(ship.hits_taken(), 4)
+        self.assertEqual(ship.assign_hit(1, 0, False), 0)
+
+    def test_sink_from_one(self):
+        game, player1, player2 = small_game(sink_from_one=True)
+        self.assertTrue(game.fire_shot(1, 0, player1))
+
+        cruiser = player2.get_ship(0, 0)
+        self.assertEqual(cruiser.get_damage(), 0b111)
+        self.assertEqual(cruiser.parts_left(), 0)
+        self.assertEqual(cruiser.hits_taken(), 1)
+        # every part of the ship is marked hit on the field
+        self.assertEqual(player2.hit_rows(), [0b111, 0, 0, 0])
+        self.assertEqual(player2.ships_left(), 1)
+        self.assertEqual(player2.parts_left(), 2)
+        self.assertEqual(player2.parts_lost(),
+                         {"Cruiser": 3, "Destroyer": 0})
+        self.assertEqual(player2.hits_taken(), 1)
+
+        game.fire_shot(3, 3, player2)
+        self.assertTrue(game.fire_shot(4, 2, player1))
+        self.assertTrue(game.game_ended())
+        self.assertIs(game.winner(), player1)
+        self.assertTrue(player2.all_ships_sunk())
+
+
+class StatisticsWindow:
+    """
+    Stands in for a game window, keeps the statistics it is shown
+    """
+
+    def __init__(self):
+        self.stats = []
+
+    def append_log(self, msg):
+        pass
+
+    def update_stats(self, stats):
+        self.stats.append(stats)
+
+    def disable_buttons(self):
+        pass
+
+
+class CountersTest(unittest.TestCase):
+
+    def check_counters(self, game):
+        for player in game.get_players():
+            opponent = game.get_opponent(player)
+            fired = count_bits(opponent.hit_rows()) \
+                + count_bits(opponent.miss_rows())
+            ships = [ship for ships in player.get_battleships().values()
+                     for ship in ships]
+
+            if not game.sink_from_one():
+                self.assertEqual(player.shots_fired(), fired)
+                self.assertEqual(player.shots_hit(),
+                                 count_bits(opponent.hit_rows()))
+            self.assertEqual(player.shots_hit(), opponent.hits_taken())
+            self.assertEqual(player.hits_taken(),
+                             sum(ship.hits_taken() for ship in ships))
+            self.assertEqual(player.parts_left(),
+                             count_bits(player.ship_rows())
+                             - count_bits(player.hit_rows()))
+            self.assertEqual(player.ships_left(),
+                             sum(1 for ship in ships if ship.parts_left()))
+            self.assertEqual(player.parts_lost(),
+                             {ship_type: sum(ship.get_size()
+                                             - ship.parts_left()
+                                             for ship in typed)
+                              for ship_type, typed
+                              in player.get_battleships().items()})
+            self.assertEqual(player.statistics(),
+                             (player.shots_fired(), player.shots_hit(),
+                              player.hits_taken(), player.ships_left(),
+                              player.parts_left()))
+
+    def test_counters_match_the_fields(self):
+        rng = random.Random(3)
+        for sink_from_one in (False, True):
+            for _ in range(5):
+                game, targets = random_game(rng, sink_from_one)
+                shots = 0
+                for _ in fire_until_the_end(game, targets):
+                    shots += 1
+                    self.check_counters(game)
+
+                self.assertEqual(sum(player.shots_fired()
+                                     for player in game.get_players()),
+                                 shots)
+                self.assertTrue(game.get_opponent(game.winner())
+                                .all_ships_sunk())
+
+    def test_statistics_shown(self):
+        game, player1, player2 = small_game()
+        windows = {}
+        for player in (player1, player2):
+            windows[player] = StatisticsWindow()
+            player.set_game_window(windows[player])
+        game.start_game(player1)
+
+        self.assertEqual(windows[player1].stats, [
+            "Shots fired: 0\nShots hit: 0 (0 %)\nShots missed: 0 (0 %)\n"
+            "Hits taken: 0\nShips left: 2\nShip parts left: 5"])
+
+        game.fire_shot(1, 0, player1)
+        game.fire_shot(3, 3, player2)
+        game.fire_shot(3, 3, player1)
+        self.assertEqual(windows[player1].stats[-1],
+                         "Shots fired: 2\nShots hit: 1 (50 %)\n"
+                         "Shots missed: 1 (50 %)\nHits taken: 0\n"
+                         "Ships left: 2\nShip parts left: 5")
+        self.assertEqual(windows[player2].stats[-1],
+                         "Shots fired: 1\nShots hit: 0 (0 %)\n"
+                         "Shots missed: 1 (100 %)\nHits taken: 1\n"
+                         "Ships left: 2\nShip parts left: 4")
+        # only statistics that changed are shown again
+        self.assertEqual([len(windows[player].stats)
+                          for player in (player1, player2)], [3, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests of the game logs
+"""
+
+import os
+import tempfile
+import unittest
+
+from gamelog import GameLog, LogHistory, SEPARATOR
+from helpers import tiny_game
+
+
+class GameLogTest(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        log = GameLog(3)
+        for index in range(5):
+            log.append(f"message {index}")
+
+        self.assertEqual(len(log), 3)
+        self.assertEqual(log.capacity(), 3)
+        self.assertEqual(log.total(), 5)
+        self.assertEqual(log.latest(2), ["message 3", "message 4"])
+        self.assertEqual(log.latest(10),
+                         ["message 2", "message 3", "message 4"])
+        self.assertEqual(log.latest(0), [])
+        self.assertEqual(log.get_text(),
+                         "message 2" + SEPARATOR + "message 3" + SEPARATOR
+                         + "message 4" + SEPARATOR)
+
+    def test_load(self):
+        log = GameLog(10)
+        for msg in ("first\nline", "second"):
+            log.append(msg)
+
+        loaded = GameLog(10)
+        loaded.append("replaced")
+        loaded.load(log.get_text())
+        self.assertEqual(loaded.latest(10), ["first\nline", "second"])
+        self.assertEqual(loaded.get_text(), log.get_text())
+        # views see the loaded messages as new ones
+        self.assertEqual(loaded.total(), 3)
+
+    def test_game_messages(self):
+        log = GameLog()
+        game, player1, _ = tiny_game()
+        game.set_log(log)
+        game.fire_shot(1, 0, player1)
+        game.fire_shot(2, 0, game.current_player())
+        game.fire_shot(2, 0, player1)
+
+        self.assertEqual(log.total(), 4)
+        self.assertIn("MISS", log.latest(3)[0])
+        self.assertIn("destroyed", log.latest(2)[0])
+        self.assertEqual(log.latest(1), ["A has won the game!"])
+
+    def test_history(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game_logs.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("older game" + SEPARATOR)
+
+            with LogHistory(path) as history:
+                log = GameLog(2, history)
+                for index in range(100):
+                    log.append(f"message {index}")
+
+            with open(path, encoding="utf-8") as file:
+                text = file.read()
+
+        # the history keeps what the ring buffer drops, after the file's
+        # contents
+        self.assertEqual(text, "older game" + SEPARATOR + "".join(
+            f"message {index}" + SEPARATOR for index in range(100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
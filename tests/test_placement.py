@@ -0,0 +1,144 @@
+"""
+Tests of the fleet feasibility search and the random fleet placement
+"""
+
+import collections
+import random
+import unittest
+from unittest import mock
+
+from placement import PlacementTable, find_fleet_placement, \
+    random_fleet_placement, block_capacity
+
+
+def is_legal(width, height, sizes, placement):
+    """
+    Returns whether a placement places exactly the fleet, legally
+    """
+
+    if sorted(size for _, _, size, _ in placement) != sorted(sizes):
+        return False
+
+    table = PlacementTable(width, height, sizes)
+    for x, y, size, vertical in placement:
+        if (x, y, vertical) not in set(table.legal_placements(size)):
+            return False
+        table.place(x, y, size, vertical)
+    return True
+
+
+def all_layouts(width, height, sizes):
+    """
+    Returns every legal layout of a fleet as frozensets of placements
+    """
+
+    layouts = set()
+
+    def place(table, placed, sizes_left):
+        if not sizes_left:
+            layouts.add(frozenset(placed))
+            return
+        size = sizes_left[0]
+        for x, y, vertical in list(table.legal_placements(size)):
+            copy = table.copy()
+            copy.place(x, y, size, vertical)
+            place(copy, placed + [(x, y, size, vertical)], sizes_left[1:])
+
+    place(PlacementTable(width, height, sizes), [],
+          sorted(sizes, reverse=True))
+    return layouts
+
+
+class FindFleetPlacementTest(unittest.TestCase):
+
+    def test_fleets_that_fit(self):
+        for width, height, sizes in ((10, 10, [5, 4, 3, 3, 2, 2, 1, 1]),
+                                     (10, 10, [5] * 10),
+                                     (10, 10, [3] * 15),
+                                     (10, 10, [3] * 14 + [2] * 2),
+                                     (10, 10, [2] * 25),
+                                     (10, 10, [1] * 50),
+                                     (7, 3, [7, 7]),
+                                     (1, 6, [6])):
+            placement = find_fleet_placement(width, height, sizes)
+            self.assertIsNotNone(placement, (width, height, sizes))
+            self.assertTrue(is_legal(width, height, sizes, placement))
+
+    def test_fleets_that_dont_fit(self):
+        for sizes in ([5] * 11, [5] * 12, [5] * 13, [4] * 13, [4] * 14,
+                      [3] * 16, [3] * 17, [3] * 20, [2] * 26, [2] * 30,
+                      [1] * 51, [11]):
+            self.assertIsNone(find_fleet_placement(10, 10, sizes), sizes)
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(5)
+        for _ in range(150):
+            width = rng.randint(1, 5)
+            height = rng.randint(1, 5)
+            sizes = [rng.randint(1, max(width, height))
+                     for _ in range(rng.randint(1, 5))]
+
+            placement = find_fleet_placement(width, height, sizes)
+            fits = bool(all_layouts(width, height, sizes))
+            self.assertEqual(placement is not None, fits,
+                             (width, height, sizes))
+            if fits:
+                self.assertTrue(is_legal(width, height, sizes, placement))
+
+    def test_block_capacity(self):
+        self.assertEqual(block_capacity(10, 10), 50)
+        self.assertEqual(block_capacity(9, 10), 50)
+        self.assertEqual(block_capacity(10, 9), 50)
+        self.assertEqual(block_capacity(7, 1), 7)
+        self.assertEqual(block_capacity(1, 7), 7)
+        self.assertEqual(block_capacity(5, 0), 0)
+
+    def test_empty_fleet(self):
+        self.assertEqual(find_fleet_placement(10, 10, []), [])
+
+
+class RandomFleetPlacementTest(unittest.TestCase):
+
+    def assert_uniform(self, width, height, sizes, samples):
+        rng = random.Random(11)
+        layouts = all_layouts(width, height, sizes)
+        counts = collections.Counter(
+            frozenset(random_fleet_placement(width, height, sizes, rng,
+                                             uniform=True))
+            for _ in range(samples))
+
+        self.assertEqual(set(counts), layouts)
+        expected = samples / len(layouts)
+        for count in counts.values():
+            # far beyond what chance allows
+            self.assertLess(abs(count - expected), 6 * expected ** 0.5)
+
+    def test_uniform_layouts(self):
+        self.assert_uniform(4, 3, [2, 2, 1], 20000)
+
+    def test_uniform_layouts_without_bitmasks(self):
+        with mock.patch("placement.MAX_MASKED_FIELDS", 0):
+            self.assert_uniform(4, 3, [2, 2, 1], 20000)
+
+    def test_placements_are_legal(self):
+        rng = random.Random(2)
+        # uniform layouts of dense fleets are rarely accepted
+        for width, height, sizes, uniform in (
+                (10, 10, [5, 4, 3, 3, 2, 2, 1, 1], False),
+                (10, 10, [5, 4, 3, 3, 2, 2, 1, 1], True),
+                (10, 10, [4] * 8, False),
+                (60, 50, [5, 4, 3, 2, 1] * 60, False),
+                (60, 50, [5, 4, 3, 2, 1] * 4, True)):
+            placement = random_fleet_placement(width, height, sizes, rng,
+                                               uniform)
+            self.assertTrue(is_legal(width, height, sizes, placement))
+
+    def test_fleet_that_doesnt_fit(self):
+        with self.assertRaises(RuntimeError):
+            random_fleet_placement(10, 10, [5] * 12, time_limit=0.05)
+        with self.assertRaises(RuntimeError):
+            random_fleet_placement(10, 10, [11])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests of the binary replay format
+"""
+
+import io
+import random
+import unittest
+
+from engine import Player, GameLogic, Fleet, SHOT_MISS, SHOT_SUNK
+from helpers import tiny_game
+from replay import ReplayWriter, read_replays, END_WON, END_FORFEIT, \
+    END_ABANDONED
+
+
+def random_game(recorder, width, height, rng):
+    """
+    Plays a game of random shots to the end
+    """
+
+    player1 = Player("Player 1", width, height)
+    player2 = Player("Player 2", width, height)
+    player1.place_fleet_randomly(rng)
+    player2.place_fleet_randomly(rng)
+
+    game = GameLogic(False, player1, player2, rng, recorder)
+    firer = game.start_game()
+    targets = {player: [(x, y) for y in range(height) for x in range(width)]
+               for player in (player1, player2)}
+    for targets_left in targets.values():
+        rng.shuffle(targets_left)
+    while not game.game_ended():
+        game.fire_shot(*targets[firer].pop(), firer)
+        firer = game.current_player()
+    return game
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_encoding(self):
+        file = io.BytesIO()
+        with ReplayWriter(file) as writer:
+            game, player1, player2 = tiny_game(writer)
+            game.fire_shot(1, 0, player1)
+            game.fire_shot(1, 0, player2)
+            game.fire_shot(2, 0, player1)
+
+        self.assertEqual(file.getvalue(), bytes.fromhex(
+            "42535250 01"           # magic and version
+            "0300 0100 00"          # 3x1, no flags
+            "0700") + b"Sub:1x1"    # fleet
+            + bytes.fromhex(
+            "0141 0142"             # names
+            "0100 0500"             # submarines at 0 and 2, vertical
+            "0400 0400 0a00"        # miss at 1, miss at 1, sunk at 2
+            "0300"))                # first player won
+
+    def test_round_trip(self):
+        rng = random.Random(7)
+        file = io.BytesIO()
+        with ReplayWriter(file, buffer_size=0) as writer:
+            games = [random_game(writer, 10, 10, rng) for _ in range(20)]
+
+        file.seek(0)
+        replays = list(read_replays(file, chunk_size=64))
+        self.assertEqual(len(replays), len(games))
+
+        for game, replay in zip(games, replays):
+            players = game.get_players()
+            self.assertEqual(replay.get_names(), ("Player 1", "Player 2"))
+            self.assertEqual(str(replay.get_fleet()),
+                             str(players[0].get_fleet()))
+            self.assertEqual(replay.end(), END_WON)
+            self.assertEqual(replay.winner(),
+                             game.player_index(game.winner()))
+            self.assertEqual(len(replay.shots()),
+                             sum(player.shots_fired() for player in players))
+
+            for index, player in enumerate(players):
+                battleships = player.get_battleships()
+                for ship_type, x, y, vertical in replay.get_layout(index):
+                    self.assertIn((x, y, vertical),
+                                  [(*ship.get_origin(), ship.is_vertical())
+                                   for ship in battleships[ship_type]])
+
+            # raises if a shot's result doesn't match the engine
+            replayed = replay.replay()
+            self.assertEqual(replayed.player_index(replayed.winner()),
+                             replay.winner())
+
+    def test_repeated_fleet_is_written_once(self):
+        file = io.BytesIO()
+        with ReplayWriter(file) as writer:
+            for _ in range(3):
+                game, player1, _ = tiny_game(writer)
+                game.fire_shot(2, 0, player1)
+
+        self.assertEqual(file.getvalue().count(b"Sub:1x1"), 1)
+        file.seek(0)
+        self.assertEqual([str(replay.get_fleet())
+                          for replay in read_replays(file)],
+                         ["Sub:1x1"] * 3)
+
+    def test_forfeited_and_abandoned_games(self):
+        file = io.BytesIO()
+        with ReplayWriter(file) as writer:
+            game, player1, player2 = tiny_game(writer, ("Ann", "Bea"))
+            game.fire_shot(1, 0, player1)
+            game.forfeit_game(player2)
+            # still running once the writer is closed
+            tiny_game(writer)
+
+        file.seek(0)
+        forfeited, abandoned = read_replays(file)
+        self.assertEqual(forfeited.end(), END_FORFEIT)
+        self.assertEqual(forfeited.winner(), 0)
+        self.assertEqual(forfeited.get_names(), ("Ann", "Bea"))
+        self.assertEqual(forfeited.shots(), [(0, 1, 0, SHOT_MISS)])
+        self.assertEqual(abandoned.end(), END_ABANDONED)
+        self.assertIsNone(abandoned.winner())
+
+    def test_wide_codes(self):
+        fleet = Fleet.parse("Sub:1x1")
+        player1 = Player("A", 200, 100, fleet)
+        player1.add_battleship("Sub", True, (150, 90))
+        player2 = Player("B", 200, 100, fleet)
+        player2.add_battleship("Sub", True, (199, 99))
+
+        file = io.BytesIO()
+        with ReplayWriter(file) as writer:
+            game = GameLogic(True, player1, player2, recorder=writer)
+            game.start_game(player1)
+            game.fire_shot(199, 99, player1)
+
+        file.seek(0)
+        replay, = read_replays(file)
+        self.assertTrue(replay.sink_from_one())
+        self.assertEqual(replay.get_layout(0), [("Sub", 150, 90, True)])
+        self.assertEqual(replay.shots(), [(0, 199, 99, SHOT_SUNK)])
+
+    def test_not_a_replay_file(self):
+        with self.assertRaises(ValueError):
+            list(read_replays(io.BytesIO(b"BSSN\x01")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Tests of the top scores store
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import scores
+from scores import ScoreStore, DAY_SECONDS
+
+
+def ranked(scores, count):
+    """
+    Returns the shots and accuracy of the best scores
+    """
+
+    return [(shots, accuracy) for _, shots, accuracy, _
+            in sorted(scores, key=lambda score: (score[1], -score[2]))[:count]]
+
+
+class ScoreStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "scores.db")
+
+        rng = random.Random(4)
+        start = 1700000000.0
+        self.scores = [(f"player {rng.randrange(20)}", rng.randrange(17, 60),
+                        rng.random(), start + rng.random() * 30 * DAY_SECONDS)
+                       for _ in range(3000)]
+        # the latest games are the worst
+        self.scores += [("late", 100, rng.random(),
+                         start + 30 * DAY_SECONDS + i)
+                        for i in range(500)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_queries(self, store):
+        self.assertEqual(store.count(), len(self.scores))
+        self.assertEqual(ranked(store.top_scores(10), 10),
+                         ranked(self.scores, 10))
+
+        latest = max(played for _, _, _, played in self.scores)
+        for days in (0.001, 0.5, 1, 1.5, 7, 29.99, 40):
+            since = latest - days * DAY_SECONDS
+            self.assertEqual(
+                ranked(store.top_scores(10, since), 10),
+                ranked([score for score in self.scores if score[3] >= since],
+                       10), days)
+
+        best = store.player_best("player 3")
+        self.assertEqual((best.shots, best.accuracy),
+                         ranked([score for score in self.scores
+                                 if score[0] == "player 3"], 1)[0])
+        self.assertIsNone(store.player_best("nobody"))
+
+    def test_queries(self):
+        with ScoreStore(self.path) as store:
+            for score in self.scores:
+                store.record(*score)
+            store.flush()
+            self.check_queries(store)
+
+    def test_scores_of_an_older_database(self):
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute("CREATE TABLE scores ("
+                               "id INTEGER PRIMARY KEY, "
+                               "player TEXT NOT NULL, "
+                               "shots INTEGER NOT NULL, "
+                               "accuracy REAL NOT NULL, "
+                               "played REAL NOT NULL)")
+            connection.executemany("INSERT INTO scores (player, shots, "
+                                   "accuracy, played) VALUES (?, ?, ?, ?)",
+                                   self.scores)
+        connection.close()
+
+        with ScoreStore(self.path) as store:
+            self.check_queries(store)
+
+
+class ScoreScalingTest(unittest.TestCase):
+    """
+    Counts the SQLite instructions the top scores since a time take
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "scores.db")
+
+        # the first connection is the one the queries run on
+        connect = sqlite3.connect
+        connections = []
+
+        def record_connection(*args, **kwargs):
+            connections.append(connect(*args, **kwargs))
+            return connections[-1]
+
+        with mock.patch("sqlite3.connect", side_effect=record_connection):
+            self.store = ScoreStore(path)
+        self.instructions = 0
+
+        def count_instructions():
+            self.instructions += 100
+            return 0
+
+        connections[0].set_progress_handler(count_instructions, 100)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def record(self, days, worst_days=0):
+        """
+        Records five scores a day, the last days get the worst scores
+        """
+
+        rng = random.Random(6)
+        self.scores = []
+        for day in range(days):
+            for _ in range(5):
+                shots = 100 if day >= days - worst_days \
+                    else rng.randrange(17, 60)
+                self.scores.append(("player", shots, rng.random(),
+                                    (day + rng.random()) * DAY_SECONDS))
+        for score in self.scores:
+            self.store.record(*score)
+        self.store.flush()
+        self.latest = days * DAY_SECONDS
+
+    def top_scores(self, days):
+        """
+        Returns the instructions of the top scores of the last days,
+        checked against a brute force ranking
+        """
+
+        since = self.latest - days * DAY_SECONDS
+        self.instructions = 0
+        top = self.store.top_scores(10, since)
+        instructions = self.instructions
+        self.assertEqual(ranked(top, 10),
+                         ranked([score for score in self.scores
+                                 if score[3] >= since], 10), days)
+        return instructions
+
+    def test_long_windows(self):
+        self.record(2000)
+        week = self.top_scores(7)
+        for days in (60, 365, 1000, 2000, 3000):
+            self.assertLess(self.top_scores(days), 4 * week, days)
+
+    def test_recent_scores_are_the_worst(self):
+        self.record(400, worst_days=60)
+        for days in (7, 30, 60, 100):
+            with mock.patch.object(scores, "WALKED_SCORES_PER_DAY", 0):
+                merged = self.top_scores(days)
+            # at most what the walk in rank order adds to the merge
+            self.assertLess(self.top_scores(days), 3 * merged, days)
+
+
+if __name__ == "__main__":
+    unittest.main()
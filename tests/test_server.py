@@ -0,0 +1,183 @@
+"""
+Tests of the game server and its client, played over localhost
+"""
+
+import asyncio
+import random
+import socket
+import threading
+import time
+import unittest
+
+from client import RemoteGame
+from engine import Player, Fleet
+from server import GameServer
+
+
+# seconds to wait for a message of the server
+TIMEOUT = 10
+
+FLEET = Fleet.parse("Destroyer:2x1, Submarine:1x1")
+
+
+class ServerTest(unittest.TestCase):
+    """
+    Runs a game server on an ephemeral port in a background thread
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(
+                GameServer(random.Random(1)).start("localhost", 0))
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        self.assertTrue(started.wait(TIMEOUT))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.clients = []
+
+        # messages polled but not looked at yet, by client
+        self.unread = {}
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+
+        async def stop():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result(TIMEOUT)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(TIMEOUT)
+        self.loop.close()
+
+    def connect(self):
+        client = RemoteGame("localhost", self.port)
+        self.clients.append(client)
+        return client
+
+    def wait_for(self, client, kind):
+        """
+        Returns the next message of a kind, skipping the others
+        """
+
+        unread = self.unread.setdefault(client, [])
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            unread += client.poll()
+            while unread:
+                message = unread.pop(0)
+                if message is not None and message[0] == kind:
+                    return message
+            time.sleep(0.01)
+        self.fail(f"No {kind} message")
+
+    def start_match(self, names=("Alice", "Bob")):
+        """
+        Matches two clients, returns them with their players
+        """
+
+        clients = []
+        players = []
+        for name in names:
+            client = self.connect()
+            player = Player(name, 4, 4, FLEET)
+            player.add_battleship("Destroyer", False, (0, 0))
+            player.add_battleship("Submarine", True, (3, 3))
+            client.request_match(player, False)
+            clients.append(client)
+            players.append(player)
+
+        for client, name in zip(clients, reversed(names)):
+            self.assertEqual(self.wait_for(client, "MATCHED")[2], name)
+        for client in clients:
+            self.wait_for(client, "START")
+        return clients, players
+
+    def test_match_is_played_to_the_end(self):
+        clients, _ = self.start_match()
+        self.assertEqual(sorted(client.get_index() for client in clients),
+                         [0, 1])
+
+        # the first client fires at the ships first, the second one at
+        # the water, so the first one wins whoever starts
+        ships = [(0, 0), (1, 0), (3, 3)]
+        water = [(x, y) for y in range(4) for x in range(4)
+                 if (x, y) not in ships]
+        targets = {clients[0]: ships + water, clients[1]: water + ships}
+
+        ends = []
+        deadline = time.monotonic() + TIMEOUT
+        while len(ends) < 2 and time.monotonic() < deadline:
+            for client in clients:
+                messages = self.unread.pop(client, []) + client.poll()
+                ends += [message for message in messages
+                         if message is not None and message[0] == "END"]
+                if client.my_turn():
+                    client.fire(*targets[client].pop(0))
+            time.sleep(0.01)
+
+        winner = str(clients[0].get_index())
+        self.assertEqual([end[1:] for end in ends], [[winner, "WON"]] * 2)
+        self.assertTrue(all(client.game_ended() for client in clients))
+
+    def test_shot_out_of_turn_is_refused(self):
+        clients, _ = self.start_match()
+        waiting = next(client for client in clients if not client.my_turn())
+
+        waiting.fire(0, 0)
+        self.assertIn("turn", self.wait_for(waiting, "ERROR")[1])
+        self.assertFalse(waiting.game_ended())
+
+    def test_shot_outside_the_field_is_refused(self):
+        clients, _ = self.start_match()
+        firer = next(client for client in clients if client.my_turn())
+
+        firer.fire(4, 0)
+        self.assertIn("outside", self.wait_for(firer, "ERROR")[1])
+        # a refused shot leaves the turn to the player
+        self.assertTrue(firer.my_turn())
+
+    def test_disconnect_forfeits_the_match(self):
+        clients, _ = self.start_match()
+
+        # drop the connection without sending FORFEIT
+        leaving = socket.create_connection(("localhost", self.port), TIMEOUT)
+        leaving.sendall(b"NAME Carol\nPLAY 5 5 0 Submarine:1x1\n"
+                        b"PLACE RANDOM\n")
+        other = self.connect()
+        player = Player("Dave", 5, 5, Fleet.parse("Submarine:1x1"))
+        player.add_battleship("Submarine", True, (0, 0))
+        other.request_match(player, False)
+        self.assertEqual(self.wait_for(other, "MATCHED")[2], "Carol")
+        leaving.close()
+
+        end = self.wait_for(other, "END")
+        self.assertEqual(end[1:], [str(other.get_index()), "DISCONNECT"])
+        self.assertTrue(other.game_ended())
+
+        # closing a client forfeits its match
+        clients[0].close()
+        end = self.wait_for(clients[1], "END")
+        self.assertEqual(end[1:], [str(clients[1].get_index()), "FORFEIT"])
+
+    def test_name_is_unescaped(self):
+        self.start_match(names=("Back\\slash", "Line\nbreak"))
+
+    def test_unplaceable_fleet_is_refused(self):
+        client = self.connect()
+        client.send("PLAY 10 10 0 Carrier:5x12")
+        self.assertIn("doesn't fit", self.wait_for(client, "ERROR")[1])
+        client.send("PLAY 10 10 0 Submarine:1x30000000")
+        self.assertIn("at most", self.wait_for(client, "ERROR")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests of the game snapshot format
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from engine import Player, GameLogic
+from helpers import tiny_game
+from snapshot import take_snapshot, restore_snapshot, save_snapshot, \
+    load_snapshot, LOG_TAIL_LENGTH
+
+
+def player_state(player):
+    """
+    Returns everything a snapshot keeps of a player
+    """
+
+    return (str(player), player.shots_fired(), player.shots_hit(),
+            player.hits_taken(), player.ships_left(), player.parts_left(),
+            player.hit_rows(), player.miss_rows(), player.ship_rows(),
+            sorted((ship_type, ship.get_origin(), ship.is_vertical(),
+                    ship.get_damage(), ship.hits_taken())
+                   for ship_type, ships in player.get_battleships().items()
+                   for ship in ships))
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_encoding(self):
+        game, player1, _ = tiny_game()
+        game.fire_shot(1, 0, player1)
+
+        self.assertEqual(take_snapshot(game, "log", ("", "density")),
+                         bytes.fromhex(
+            "4253534e 01"           # magic and version
+            "0300 0100 02"          # 3x1, second player's turn
+            "0700") + b"Sub:1x1"    # fleet
+            + bytes.fromhex(
+            "0141 00"               # first player, no controller
+            "01000000 00000000"     # one shot fired, none hit
+            "00 00"                 # no hit or missed fields
+            "01000000 0000 00"      # submarine at 0, vertical, undamaged
+            "0142 07") + b"density"
+            + bytes.fromhex(
+            "00000000 00000000"     # no shots fired
+            "00 02"                 # missed at 1
+            "05000000 0000 00"      # submarine at 2, vertical, undamaged
+            "03000000") + b"log")
+
+    def test_round_trip(self):
+        rng = random.Random(3)
+        player1 = Player("Player 1", 12, 9)
+        player2 = Player("Player 2", 12, 9)
+        player1.place_fleet_randomly(rng)
+        player2.place_fleet_randomly(rng)
+        game = GameLogic(False, player1, player2, rng)
+        firer = game.start_game()
+
+        targets = [(x, y) for y in range(9) for x in range(12)]
+        rng.shuffle(targets)
+        for x, y in targets[:40]:
+            game.fire_shot(x, y, firer)
+            firer = game.current_player()
+            game.fire_shot(x, y, firer)
+            firer = game.current_player()
+
+        restored, log, controllers = restore_snapshot(
+            take_snapshot(game, "the log", ("", "montecarlo")))
+        self.assertEqual(log, "the log")
+        self.assertEqual(controllers, ("", "montecarlo"))
+        self.assertFalse(restored.game_ended())
+        self.assertEqual(restored.player_index(restored.current_player()),
+                         game.player_index(game.current_player()))
+        for original, copy in zip(game.get_players(),
+                                  restored.get_players()):
+            self.assertEqual(player_state(copy), player_state(original))
+
+        # the restored game goes on like the original
+        x, y = targets[40]
+        self.assertEqual(
+            restored.fire_shot(x, y, restored.current_player()),
+            game.fire_shot(x, y, game.current_player()))
+
+    def test_ended_game(self):
+        game, player1, _ = tiny_game()
+        game.fire_shot(2, 0, player1)
+
+        restored, _, _ = restore_snapshot(take_snapshot(game))
+        self.assertTrue(restored.game_ended())
+        self.assertEqual(restored.player_index(restored.winner()), 0)
+
+    def test_log_tail(self):
+        game, _, _ = tiny_game()
+        log = "x" * LOG_TAIL_LENGTH + "end"
+
+        _, restored_log, _ = restore_snapshot(take_snapshot(game, log))
+        self.assertEqual(restored_log, log[-LOG_TAIL_LENGTH:])
+
+    def test_save_and_load(self):
+        game, player1, _ = tiny_game()
+        game.fire_shot(1, 0, player1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.bss")
+            save_snapshot(path, game, "log")
+            restored, log, _ = load_snapshot(path)
+
+        self.assertEqual(log, "log")
+        self.assertEqual([player_state(player)
+                          for player in restored.get_players()],
+                         [player_state(player)
+                          for player in game.get_players()])
+
+    def test_not_a_snapshot(self):
+        with self.assertRaises(ValueError):
+            restore_snapshot(b"BSRP\x01")
+
+    def test_game_not_started(self):
+        game = GameLogic(False, Player("A"), Player("B"))
+        with self.assertRaises(ValueError):
+            take_snapshot(game)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Tests of the bot tournaments
+"""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from engine import Fleet
+from tournament import run_tournament, main
+
+
+FLEET = Fleet.parse("Destroyer:2x1, Submarine:1x2")
+
+
+class TournamentTest(unittest.TestCase):
+
+    def test_results_dont_depend_on_the_processes(self):
+        results = [run_tournament(["random", "random", "montecarlo"], 12,
+                                  seed=3, width=5, height=5, fleet=FLEET,
+                                  batch_size=5, workers=workers)
+                   for workers in (1, 2)]
+        self.assertEqual(results[0], results[1])
+
+        for result in results[0].values():
+            self.assertEqual(result["games"], 12)
+        self.assertEqual(sum(result["wins"]
+                             for result in results[0].values()), 12)
+
+    def test_fleet_that_doesnt_fit(self):
+        with mock.patch("tournament.ProcessPoolExecutor") as executor:
+            with self.assertRaisesRegex(ValueError, "doesn't fit"):
+                run_tournament(["random", "montecarlo"], 10, width=3,
+                               height=3, fleet=Fleet.parse("Carrier:5x1"))
+            with self.assertRaisesRegex(ValueError, "doesn't fit"):
+                run_tournament(["random", "montecarlo"], 10, width=4,
+                               height=4, fleet=Fleet.parse("Sub:1x9"))
+            with self.assertRaisesRegex(ValueError, "at least 1x1"):
+                run_tournament(["random", "montecarlo"], 10, width=0,
+                               height=10, fleet=FLEET)
+        executor.assert_not_called()
+
+    def test_command_line_reports_the_fleet(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), \
+                self.assertRaises(SystemExit) as exit_:
+            main(["random", "montecarlo", "--width", "3", "--height", "3",
+                  "--fleet", "Carrier:5x1"])
+        self.assertEqual(exit_.exception.code, 2)
+        self.assertIn("doesn't fit", stderr.getvalue())
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            run_tournament(["random", "nobody"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,338 @@
+"""
+Battleships bot tournaments
+
+Runs round-robin tournaments between computer opponent strategies on the
+headless game engine, spread over a process pool. Every pair of
+strategies plays the same number of games, in batches so the processes
+only report back once per batch. Each batch is seeded from the tournament
+seed, the pair and the batch number alone, so a tournament gives the same
+results with any number of processes.
+
+Prints the win rate, average shots to win and Elo rating of each strategy:
+    python tournament.py --games 10000 random density
+    python battleships.py tournament --games 10000 random density
+
+With --replay every game is also recorded to a replay file, see replay.py.
+
+Strategies are registered by name with register_strategy. The processes
+look them up by name, so register them when a module is imported.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ai
+from replay import ReplayWriter
+from placement import find_fleet_placement
+from engine import Player, GameLogic, Fleet, DEFAULT_FLEET, \
+    DEFAULT_FIELD_WIDTH, DEFAULT_FIELD_HEIGHT
+
+
+# strategy name as key, function creating a bot for a player
+# from the player and a random number generator as value
+STRATEGIES = {}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def register_strategy(name, factory):
+    """
+    Registers a strategy for tournaments
+    :param name:    str,        name of the strategy
+    :param factory: function,   called with a Player and a random.Random,
+                                returns a bot with a play_turn method,
+                                see ai.py
+    """
+
+    STRATEGIES[name] = factory
+
+
+register_strategy("random", ai.RandomBot)
+# a fixed sample count instead of a time budget keeps games reproducible,
+# and the tournament processes already keep every core busy
+register_strategy("montecarlo",
+                  lambda player, rng: ai.MonteCarloBot(player, workers=0,
+                                                       rng=rng, samples=200))
+if ai.numpy is not None:
+    register_strategy("density", ai.ProbabilityBot)
+
+
+def play_batch(strategy1, strategy2, games, seed, width, height, fleet,
+               sink_from_one, record=False):
+    """
+    Plays a batch of games between two strategies, run in the processes
+    of the tournament
+    :param strategy1:       str,    name of the first strategy
+    :param strategy2:       str,    name of the second strategy
+    :param games:           int,    how many games to play
+    :param seed:            str,    random seed of the batch
+    :param width:           int,    playing field width
+    :param height:          int,    playing field height
+    :param fleet:           str,    fleet of both players, see Fleet.parse
+    :param sink_from_one:   bool,   True = ships sink from one hit
+    :param record:          bool,   True = record the games
+    :return:                dict,   wins of and shots fired by the winning
+                                    strategy, keyed by strategy name, and
+                                    the recorded games as replay file
+                                    contents without the file header
+    """
+
+    rng = random.Random(seed)
+    fleet = Fleet.parse(fleet)
+    wins = {strategy1: 0, strategy2: 0}
+    shots = {strategy1: 0, strategy2: 0}
+
+    replays = io.BytesIO()
+    recorder = ReplayWriter(replays, header=False) if record else None
+
+    for _ in range(games):
+        player1 = Player("Player 1", width, height, fleet)
+        player2 = Player("Player 2", width, height, fleet)
+        player1.place_fleet_randomly(rng)
+        player2.place_fleet_randomly(rng)
+
+        bots = {player1: STRATEGIES[strategy1](player1, rng),
+                player2: STRATEGIES[strategy2](player2, rng)}
+        game = GameLogic(sink_from_one, player1, player2, rng, recorder)
+        game.start_game()
+        winner = ai.play_game(game, bots)
+        for bot in bots.values():
+            bot.shutdown()
+
+        strategy = strategy1 if winner is player1 else strategy2
+        wins[strategy] += 1
+        shots[strategy] += winner.shots_fired()
+
+    if recorder is not None:
+        recorder.close()
+    return {"wins": wins, "shots": shots, "replays": replays.getvalue()}
+
+
+def run_tournament(strategies, games, seed=0, width=DEFAULT_FIELD_WIDTH,
+                   height=DEFAULT_FIELD_HEIGHT, fleet=DEFAULT_FLEET,
+                   sink_from_one=False, batch_size=DEFAULT_BATCH_SIZE,
+                   workers=None, replay_file=None):
+    """
+    Runs a round-robin tournament, every strategy plays every other one
+    :param strategies:      list,   names of the strategies
+    :param games:           int,    games played by each pair
+    :param seed:            int,    tournament seed
+    :param width:           int,    playing field width
+    :param height:          int,    playing field height
+    :param fleet:           Fleet,  fleet of every player
+    :param sink_from_one:   bool,   True = ships sink from one hit
+    :param batch_size:      int,    games played per process task
+    :param workers:         int,    processes to play in,
+                                    defaults to the cpu count
+    :param replay_file:     str,    replay file to append every game to,
+                                    in the order the batches finish,
+                                    defaults to None
+    :return:                dict,   results, see tournament_results
+    """
+
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'")
+    if len(set(strategies)) < 2:
+        raise ValueError("A tournament needs at least two strategies")
+
+    # every game places the fleet at random in the processes, check that
+    # it can be placed at all before handing out any batch
+    if width <= 0 or height <= 0:
+        raise ValueError("The playing field must be at least 1x1")
+    sizes = [fleet.get_sizes()[ship_type]
+             for ship_type in fleet.get_place_order()]
+    try:
+        fits = find_fleet_placement(width, height, sizes) is not None
+    except RuntimeError:
+        raise ValueError("Couldn't tell if the fleet fits on the playing "
+                         "field, try a smaller fleet") from None
+    if not fits:
+        raise ValueError("The fleet doesn't fit on the playing field")
+
+    strategies = list(dict.fromkeys(strategies))
+    pairs = [(strategy1, strategy2)
+             for i, strategy1 in enumerate(strategies)
+             for strategy2 in strategies[i + 1:]]
+
+    # wins of the first strategy of each pair against the second
+    wins = {pair: [0, 0] for pair in pairs}
+    shots = {strategy: 0 for strategy in strategies}
+
+    replays = None if replay_file is None else ReplayWriter(replay_file)
+
+    with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+        batches = {}
+        for pair in pairs:
+            for batch, first_game in enumerate(range(0, games, batch_size)):
+                batch_games = min(batch_size, games - first_game)
+                batches[executor.submit(play_batch, *pair, batch_games,
+                                        f"{seed}:{pair[0]}:{pair[1]}:{batch}",
+                                        width, height, str(fleet),
+                                        sink_from_one,
+                                        replays is not None)] = pair
+
+        for done in as_completed(batches):
+            pair = batches[done]
+            result = done.result()
+            wins[pair][0] += result["wins"][pair[0]]
+            wins[pair][1] += result["wins"][pair[1]]
+            for strategy in pair:
+                shots[strategy] += result["shots"][strategy]
+            if replays is not None:
+                replays.append_games(result["replays"])
+
+    if replays is not None:
+        replays.close()
+
+    return tournament_results(strategies, wins, shots)
+
+
+def tournament_results(strategies, wins, shots):
+    """
+    Produces the results of a tournament
+    :param strategies:  list,   names of the strategies
+    :param wins:        dict,   (strategy, strategy) pair as key, list of
+                                wins of each strategy of the pair as value
+    :param shots:       dict,   total shots fired in the games each
+                                strategy won
+    :return:            dict,   strategy name as key, dict of its games,
+                                wins, win_rate, average_shots_to_win and
+                                elo as value
+    """
+
+    results = {}
+    for strategy in strategies:
+        games = sum(pair_wins[0] + pair_wins[1]
+                    for pair, pair_wins in wins.items() if strategy in pair)
+        strategy_wins = sum(pair_wins[pair.index(strategy)]
+                            for pair, pair_wins in wins.items()
+                            if strategy in pair)
+        results[strategy] = {
+            "games": games,
+            "wins": strategy_wins,
+            "win_rate": strategy_wins / games if games else 0.0,
+            "average_shots_to_win": shots[strategy] / strategy_wins
+            if strategy_wins else None
+        }
+
+    for strategy, elo in elo_ratings(strategies, wins).items():
+        results[strategy]["elo"] = elo
+
+    return results
+
+
+def elo_ratings(strategies, wins, iterations=1000):
+    """
+    Fits Elo ratings to the wins between strategies. The ratings are the
+    maximum likelihood Bradley-Terry strengths on the Elo scale, so they
+    don't depend on the order the games finished in. Every strategy gets
+    half a win and a loss against an average opponent so that unbeaten
+    strategies get a finite rating.
+    :param strategies:  list,   names of the strategies
+    :param wins:        dict,   see tournament_results
+    :param iterations:  int,    how many fitting iterations to run at most
+    :return:            dict,   strategy name as key, rating as value,
+                                the average rating is 1500
+    """
+
+    strengths = {strategy: 1.0 for strategy in strategies}
+
+    for _ in range(iterations):
+        updated = {}
+        for strategy in strategies:
+            strategy_wins = 0.5
+            games_per_strength = 1.0 / (strengths[strategy] + 1.0)
+            for pair, pair_wins in wins.items():
+                if strategy not in pair:
+                    continue
+                opponent = pair[1 - pair.index(strategy)]
+                strategy_wins += pair_wins[pair.index(strategy)]
+                games_per_strength += sum(pair_wins) \
+                    / (strengths[strategy] + strengths[opponent])
+            updated[strategy] = strategy_wins / games_per_strength
+
+        # keep the average opponent at strength 1
+        scale = math.exp(sum(math.log(strength)
+                             for strength in updated.values())
+                         / len(updated))
+        updated = {strategy: strength / scale
+                   for strategy, strength in updated.items()}
+
+        converged = all(abs(updated[strategy] - strengths[strategy])
+                        < 1e-9 * strengths[strategy]
+                        for strategy in strategies)
+        strengths = updated
+        if converged:
+            break
+
+    return {strategy: 1500.0 + 400.0 * math.log10(strength)
+            for strategy, strength in strengths.items()}
+
+
+def main(argv=None):
+    """
+    Entrypoint of the tournament command line
+    :param argv:    list,   command line arguments, defaults to sys.argv
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Runs a round-robin tournament between Battleships "
+                    "bot strategies")
+    parser.add_argument("strategies", nargs="*",
+                        help="strategies to play, defaults to all of: "
+                             + ", ".join(sorted(STRATEGIES)))
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games played by each pair of strategies")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="tournament seed, same seed same results")
+    parser.add_argument("--width", type=int, default=DEFAULT_FIELD_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_FIELD_HEIGHT)
+    parser.add_argument("--fleet", default=str(DEFAULT_FLEET),
+                        help="fleet of every player, e.g. "
+                             "\"Carrier:5x1, Cruiser:3x2\"")
+    parser.add_argument("--sink-from-one", action="store_true",
+                        help="ships sink from one hit")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="games played per process task")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to play in, defaults to the cpu "
+                             "count")
+    parser.add_argument("--replay",
+                        help="replay file to record every game to")
+    parser.add_argument("--output",
+                        help="file to write the results to as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        fleet = Fleet.parse(args.fleet)
+        results = run_tournament(args.strategies or sorted(STRATEGIES),
+                                 args.games, args.seed, args.width,
+                                 args.height, fleet, args.sink_from_one,
+                                 args.batch_size, args.workers, args.replay)
+    except ValueError as error:
+        parser.error(str(error))
+
+    print(f"{'Strategy':<12} {'Games':>8} {'Win rate':>9} "
+          f"{'Shots to win':>13} {'Elo':>7}")
+    for strategy, result in sorted(results.items(),
+                                   key=lambda item: -item[1]["elo"]):
+        shots = result["average_shots_to_win"]
+        print(f"{strategy:<12} {result['games']:>8} "
+              f"{result['win_rate']:>8.1%} "
+              f"{'-' if shots is None else f'{shots:.2f}':>13} "
+              f"{result['elo']:>7.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])